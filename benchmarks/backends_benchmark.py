@@ -0,0 +1,117 @@
+"""Benchmark of the HashMap storage backends.
+
+Measures lookups, inserts and deletes per key, and the memory used
+per entry by the map's own structures (keys and values excluded).
+
+Run from the repository root with:
+
+    python -m benchmarks.backends_benchmark
+"""
+
+import tracemalloc
+from random import shuffle
+from timeit import timeit
+
+from src.algoandds.hashmap import (
+    CompactHashMap,
+    HashMap,
+    KeyedHasher,
+    RobinHoodHashMap,
+    SwissHashMap,
+)
+from src.algoandds.hashmap import swisstable
+
+
+BACKENDS = {
+    "chained": HashMap,
+    "robinhood": RobinHoodHashMap,
+    "swiss": SwissHashMap,
+    "compact": CompactHashMap,
+}
+NUMBER_OF_KEYS = 50_000
+
+
+def _keys():
+    keys = [f"key-{i}" for i in range(NUMBER_OF_KEYS)]
+    shuffle(keys)
+    return keys
+
+
+def _per_key_ns(seconds: float) -> float:
+    return seconds / NUMBER_OF_KEYS * 1e9
+
+
+def memory_per_entry(backend, items: dict, hasher) -> float:
+    tracemalloc.start()
+    hm = backend(items, hasher=hasher)
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del hm
+    return used / len(items)
+
+
+def bench_backend(backend, keys: list) -> dict:
+    hasher = KeyedHasher()
+    hm = backend(hasher=hasher)
+
+    def insert():
+        for key in keys:
+            hm.update((key, key))
+
+    def lookup():
+        for key in keys:
+            hm[key]
+
+    def delete():
+        for key in keys:
+            del hm[key]
+
+    # The order matters: lookups and deletes run on the filled map.
+    return {
+        "insert": _per_key_ns(timeit(insert, number=1)),
+        "lookup": _per_key_ns(timeit(lookup, number=1)),
+        "delete": _per_key_ns(timeit(delete, number=1)),
+        "bytes/entry": memory_per_entry(
+            backend, {key: key for key in keys}, hasher
+        ),
+    }
+
+
+def bench_swiss_get_many(keys: list):
+    hm = SwissHashMap({key: key for key in keys}, hasher=KeyedHasher())
+    # Half of the requested keys are misses.
+    requested = keys[: len(keys) // 2] + [f"miss-{i}" for i in keys[::2]]
+    numpy_ns = (
+        _per_key_ns(timeit(lambda: hm.get_many(requested), number=1))
+        if swisstable.np is not None
+        else float("nan")
+    )
+    numpy, swisstable.np = swisstable.np, None
+    try:
+        scalar_ns = _per_key_ns(
+            timeit(lambda: hm.get_many(requested), number=1)
+        )
+    finally:
+        swisstable.np = numpy
+    print(
+        f"swiss get_many: {numpy_ns:.0f} ns/key with NumPy, "
+        f"{scalar_ns:.0f} ns/key without"
+    )
+
+
+def main():
+    keys = _keys()
+    columns = ("insert", "lookup", "delete", "bytes/entry")
+    print(f"{'backend':<12}" + "".join(f"{c:>14}" for c in columns))
+    for name, backend in BACKENDS.items():
+        result = bench_backend(backend, keys)
+        print(
+            f"{name:<12}"
+            + "".join(f"{result[c]:>11.0f} ns" for c in columns[:3])
+            + f"{result['bytes/entry']:>14.1f}"
+        )
+    bench_swiss_get_many(keys)
+
+
+if __name__ == "__main__":
+    main()
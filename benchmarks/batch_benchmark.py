@@ -0,0 +1,100 @@
+"""Benchmark of the HashMap batch methods against per-key loops.
+
+Loads a batch of rows the way an ETL job would: one update call per
+row, or a single set_many call for the whole batch. Lookups and
+deletions are compared the same way.
+
+Run from the repository root with:
+
+    python -m benchmarks.batch_benchmark
+"""
+
+from timeit import timeit
+
+from src.algoandds.hashmap import (
+    HashMap,
+    RobinHoodHashMap,
+    SwissHashMap,
+    CompactHashMap,
+)
+
+
+BATCH_SIZE = 100_000
+REPEAT = 3
+BACKENDS = {
+    "chained": HashMap,
+    "robinhood": RobinHoodHashMap,
+    "swiss": SwissHashMap,
+    "compact": CompactHashMap,
+}
+
+
+def _per_key_ns(seconds: float) -> float:
+    return seconds / (REPEAT * BATCH_SIZE) * 1e9
+
+
+def bench_backend(backend) -> dict:
+    rows = [(f"row:{i}", i) for i in range(BATCH_SIZE)]
+    keys = [key for key, _ in rows]
+    loaded = backend(hasher="keyed")
+    loaded.set_many(rows)
+
+    def set_loop():
+        hm = backend(hasher="keyed")
+        for row in rows:
+            hm.update(row)
+
+    def set_batch():
+        backend(hasher="keyed").set_many(rows)
+
+    def get_loop():
+        get = loaded.get
+        for key in keys:
+            get(key)
+
+    def get_batch():
+        loaded.get_many(keys)
+
+    def delete_loop():
+        hm = backend(hasher="keyed")
+        hm.set_many(rows)
+        for key in keys:
+            del hm[key]
+
+    def delete_batch():
+        hm = backend(hasher="keyed")
+        hm.set_many(rows)
+        hm.delete_many(keys)
+
+    set_batch_time = timeit(set_batch, number=REPEAT)
+    return {
+        "set loop": _per_key_ns(timeit(set_loop, number=REPEAT)),
+        "set_many": _per_key_ns(set_batch_time),
+        "get loop": _per_key_ns(timeit(get_loop, number=REPEAT)),
+        "get_many": _per_key_ns(timeit(get_batch, number=REPEAT)),
+        # Deletions are timed without the load that precedes them.
+        "del loop": _per_key_ns(
+            timeit(delete_loop, number=REPEAT) - set_batch_time
+        ),
+        "delete_many": _per_key_ns(
+            timeit(delete_batch, number=REPEAT) - set_batch_time
+        ),
+    }
+
+
+def main():
+    columns = (
+        "set loop", "set_many", "get loop", "get_many",
+        "del loop", "delete_many",
+    )
+    print(f"{'backend':<11}" + "".join(f"{c:>13}" for c in columns))
+    for name, backend in BACKENDS.items():
+        result = bench_backend(backend)
+        print(
+            f"{name:<11}"
+            + "".join(f"{result[c]:>10.0f} ns" for c in columns)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark of the BoundedCache eviction policies.
+
+Replays a skewed key stream, where a few keys are requested far more
+often than the rest, mixed with one-off scans. Reports the hit rate of
+each policy and the cost of a memoized call, with functools.lru_cache
+as the reference.
+
+Run from the repository root with:
+
+    python -m benchmarks.cache_benchmark
+"""
+
+from functools import lru_cache
+from random import Random
+from timeit import timeit
+
+from src.algoandds.hashmap import BoundedCache, memoize
+
+
+MAXSIZE = 1_000
+NUMBER_OF_REQUESTS = 200_000
+POLICIES = ("lru", "lfu", "slru")
+
+
+def _requests() -> list:
+    random = Random(0)
+    requests = []
+    for i in range(NUMBER_OF_REQUESTS):
+        if i % 10 == 0:
+            # A scan of keys that are never requested again.
+            requests.append(f"scan:{i}")
+        else:
+            key = int(random.paretovariate(1.0)) % (MAXSIZE * 20)
+            requests.append(f"key:{key}")
+    return requests
+
+
+def bench_policy(policy: str, requests: list) -> dict:
+    cache = BoundedCache(MAXSIZE, policy, hasher="keyed")
+    for key in requests:
+        if cache.get(key) is None:
+            cache[key] = key
+
+    @memoize(maxsize=MAXSIZE, policy=policy, hasher="keyed")
+    def identity(key):
+        return key
+
+    seconds = timeit(lambda: [identity(key) for key in requests], number=1)
+    return {
+        "hit rate": cache.hits / len(requests) * 100,
+        "call": seconds / len(requests) * 1e9,
+    }
+
+
+def main():
+    requests = _requests()
+    print(f"{'policy':<14}{'hit rate':>10}{'memoized call':>16}")
+    for policy in POLICIES:
+        result = bench_policy(policy, requests)
+        print(
+            f"{policy:<14}{result['hit rate']:>9.1f}%"
+            f"{result['call']:>13.0f} ns"
+        )
+    identity = lru_cache(maxsize=MAXSIZE)(lambda key: key)
+    seconds = timeit(lambda: [identity(key) for key in requests], number=1)
+    hits = identity.cache_info().hits / len(requests) * 100
+    print(
+        f"{'lru_cache':<14}{hits:>9.1f}%"
+        f"{seconds / len(requests) * 1e9:>13.0f} ns"
+    )
+
+
+if __name__ == "__main__":
+    main()
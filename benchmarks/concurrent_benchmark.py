@@ -0,0 +1,93 @@
+"""Thread-pool benchmark of ConcurrentHashMap.
+
+Measures read and write throughput as the number of threads goes up,
+for a HashMap behind one global lock and for ConcurrentHashMap, with
+locked reads and with lock-free reads on shard snapshots. Each task
+runs a batch of operations on random keys.
+
+With lock-free reads, every write copies its shard, so those maps get
+more, smaller shards, and fewer write tasks are run for every map.
+
+Run from the repository root with:
+
+    python -m benchmarks.concurrent_benchmark
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from random import Random
+from threading import Lock
+from time import perf_counter
+
+from src.algoandds.hashmap import ConcurrentHashMap, HashMap
+
+
+NUMBER_OF_KEYS = 10_000
+OPERATIONS_PER_TASK = 2_000
+NUMBER_OF_TASKS = 64
+NUMBER_OF_WRITE_TASKS = 8
+THREAD_COUNTS = (1, 2, 4, 8, 16)
+
+
+class GlobalLockHashMap:
+    """A HashMap behind a single lock, as used before sharding."""
+
+    def __init__(self, items: dict):
+        self._map = HashMap(items, hasher="keyed")
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self._map.get(key)
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._map[key] = value
+
+
+MAPS = {
+    "global lock": GlobalLockHashMap,
+    "sharded": lambda items: ConcurrentHashMap(items, hasher="keyed"),
+    "lock-free reads": lambda items: ConcurrentHashMap(
+        items, number_of_shards=64, hasher="keyed", lock_free_reads=True
+    ),
+}
+
+
+def _task_keys(seed: int) -> list:
+    rng = Random(seed)
+    return [rng.randrange(NUMBER_OF_KEYS) for _ in range(OPERATIONS_PER_TASK)]
+
+
+def throughput(make_map, threads: int, write: bool) -> float:
+    """Returns the number of operations per second."""
+    hm = make_map({i: i for i in range(NUMBER_OF_KEYS)})
+    number_of_tasks = NUMBER_OF_WRITE_TASKS if write else NUMBER_OF_TASKS
+    tasks = [_task_keys(seed) for seed in range(number_of_tasks)]
+
+    def read_task(keys: list):
+        get = hm.get
+        for key in keys:
+            get(key)
+
+    def write_task(keys: list):
+        for key in keys:
+            hm[key] = key
+
+    start = perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(write_task if write else read_task, tasks))
+    elapsed = perf_counter() - start
+    return number_of_tasks * OPERATIONS_PER_TASK / elapsed
+
+
+def main():
+    print(f"{'map':<17}{'threads':>8}{'reads/s':>14}{'writes/s':>14}")
+    for name, make_map in MAPS.items():
+        for threads in THREAD_COUNTS:
+            reads = throughput(make_map, threads, write=False)
+            writes = throughput(make_map, threads, write=True)
+            print(f"{name:<17}{threads:>8}{reads:>14,.0f}{writes:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
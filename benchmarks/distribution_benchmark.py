@@ -0,0 +1,88 @@
+"""Benchmark of how evenly keys are spread over the buckets.
+
+Compares even capacities (modulo), power of two capacities without
+the final mixing step (plain bit mask) and power of two capacities
+as HashMap uses them (mixed, then masked). For each case, it prints
+the share of used buckets, the longest chain and the average number
+of entries visited by a successful lookup, next to the value expected
+from a uniformly random hash.
+
+Run from the repository root with:
+
+    python -m benchmarks.distribution_benchmark
+"""
+
+from collections import Counter
+
+from src.algoandds.hashmap import HashMap, Hasher
+from src.algoandds.hashmap.hashers import MASK_64
+
+
+NUMBER_OF_KEYS = 2**14
+KEY_SETS = {
+    "sequential int": list(range(1, NUMBER_OF_KEYS + 1)),
+    "int * 1024": [i * 1024 for i in range(1, NUMBER_OF_KEYS + 1)],
+    "str": [f"user:{i}" for i in range(NUMBER_OF_KEYS)],
+}
+
+
+class BuiltinHasher(Hasher):
+    """Python's own hash, as used by dict, without any salt."""
+
+    mode = "builtin"
+
+    def prehash(self, key) -> int:
+        return hash(key) & MASK_64
+
+
+def spread(hash_codes: list, capacity: int) -> dict:
+    chains = Counter(hash_codes)
+    visited = sum(c * (c + 1) / 2 for c in chains.values())
+    return {
+        "used": len(chains) / capacity,
+        "longest": max(chains.values()),
+        "probes": visited / len(hash_codes),
+    }
+
+
+def cases(hasher, keys: list) -> dict:
+    items = {key: key for key in keys}
+    even = HashMap(items, hasher=hasher)
+    pow2 = HashMap(items, hasher=hasher, capacity_policy="pow2")
+    mask = pow2._capacity - 1
+    raw_prehashes = [pow2.hasher.prehash(key) for key in keys]
+    return {
+        "even": (
+            [h % even._capacity for _, _, h in even._iter_entries()],
+            even._capacity,
+        ),
+        "pow2 unmixed": ([h & mask for h in raw_prehashes], mask + 1),
+        "pow2 mixed": (
+            [h & mask for _, _, h in pow2._iter_entries()],
+            mask + 1,
+        ),
+    }
+
+
+def main():
+    print(
+        f"{'hasher':<9}{'keys':<16}{'capacity':<14}"
+        f"{'used':>8}{'longest':>9}{'probes':>8}{'ideal':>8}"
+    )
+    # The SHA-256 mode is left out: it turns ints into bytes(key),
+    # which allocates key bytes for every int key.
+    for hasher in (BuiltinHasher(), "keyed"):
+        for name, keys in KEY_SETS.items():
+            for policy, (codes, capacity) in cases(hasher, keys).items():
+                result = spread(codes, capacity)
+                mode = getattr(hasher, "mode", hasher)
+                ideal = 1 + len(keys) / capacity / 2
+                print(
+                    f"{mode:<9}{name:<16}{policy:<14}"
+                    f"{result['used']:>8.1%}{result['longest']:>9}"
+                    f"{result['probes']:>8.2f}{ideal:>8.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
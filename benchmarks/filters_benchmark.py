@@ -0,0 +1,83 @@
+"""Benchmark of the probabilistic filters.
+
+Fills each filter to capacity and reports its size in bits per key,
+its configured, estimated and measured false positive rates, and the
+cost of a negative check, one key at a time and batched, against that
+of a missed HashMap lookup.
+
+Run from the repository root with:
+
+    python -m benchmarks.filters_benchmark
+"""
+
+from timeit import timeit
+
+from src.algoandds.hashmap import (
+    BloomFilter,
+    CountingBloomFilter,
+    CuckooFilter,
+    HashMap,
+)
+
+
+CAPACITY = 100_000
+ERROR_RATES = (0.01, 0.001)
+FILTERS = (BloomFilter, CountingBloomFilter, CuckooFilter)
+
+
+def filter_bits(bf) -> int:
+    if isinstance(bf, CountingBloomFilter):
+        return 8 * len(bf._counters)
+    if isinstance(bf, BloomFilter):
+        return 8 * len(bf._bits)
+    return 8 * len(bf._data)
+
+
+def bench_filter(filter_class, error_rate: float, keys, absent) -> dict:
+    bf = filter_class(CAPACITY, error_rate, hasher="keyed")
+    bf.add_many(keys)
+
+    def single():
+        for key in absent:
+            key in bf
+
+    return {
+        "bits/key": filter_bits(bf) / CAPACITY,
+        "estimated": bf.measured_error_rate,
+        "measured": bf.measure_error_rate(absent),
+        "contains": timeit(single, number=1) / len(absent) * 1e9,
+        "contains_many": timeit(
+            lambda: bf.contains_many(absent), number=1
+        ) / len(absent) * 1e9,
+    }
+
+
+def main():
+    keys = [f"key:{i}" for i in range(CAPACITY)]
+    absent = [f"absent:{i}" for i in range(CAPACITY)]
+    hm = HashMap(hasher="keyed")
+    hm.set_many((key, None) for key in keys)
+
+    def misses():
+        for key in absent:
+            key in hm
+
+    miss = timeit(misses, number=1) / len(absent) * 1e9
+    print(f"HashMap miss: {miss:.0f} ns")
+    print(
+        f"{'filter':>20}{'rate':>8}{'bits/key':>10}{'estimated':>11}"
+        f"{'measured':>10}{'contains':>11}{'batched':>11}"
+    )
+    for error_rate in ERROR_RATES:
+        for filter_class in FILTERS:
+            result = bench_filter(filter_class, error_rate, keys, absent)
+            print(
+                f"{filter_class.__name__:>20}{error_rate:>8g}"
+                f"{result['bits/key']:>10.1f}{result['estimated']:>11.5f}"
+                f"{result['measured']:>10.5f}{result['contains']:>8.0f} ns"
+                f"{result['contains_many']:>8.0f} ns"
+            )
+
+
+if __name__ == "__main__":
+    main()
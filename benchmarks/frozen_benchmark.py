@@ -0,0 +1,65 @@
+"""Benchmark of FrozenHashMap against the HashMap it is frozen from.
+
+Reports the build time and size of the perfect hash, the memory taken
+by each map (keys and values aside, as both maps share them) and the
+cost of a lookup.
+
+Run from the repository root with:
+
+    python -m benchmarks.frozen_benchmark
+"""
+
+import tracemalloc
+from timeit import timeit
+
+from src.algoandds.hashmap import HashMap
+
+
+SIZES = (1_000, 10_000, 100_000)
+
+
+def bench_size(size: int) -> dict:
+    keys = [f"key:{i}" for i in range(size)]
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    hm = HashMap(hasher="keyed")
+    hm.set_many((key, None) for key in keys)
+    hashmap_memory = tracemalloc.get_traced_memory()[0] - start
+    fm = hm.freeze()
+    frozen_memory = (
+        tracemalloc.get_traced_memory()[0] - start - hashmap_memory
+    )
+    tracemalloc.stop()
+    # Tracing allocations slows the build down, so it is timed again.
+    fm = hm.freeze()
+
+    def lookups(mapping):
+        for key in keys:
+            mapping[key]
+
+    return {
+        "build": fm.build_time * 1e3,
+        "bits/key": fm.bits_per_key,
+        "HashMap": hashmap_memory / 2**20,
+        "FrozenHashMap": frozen_memory / 2**20,
+        "HashMap get": timeit(lambda: lookups(hm), number=1) / size * 1e9,
+        "Frozen get": timeit(lambda: lookups(fm), number=1) / size * 1e9,
+    }
+
+
+def main():
+    print(
+        f"{'keys':>8}{'build':>12}{'bits/key':>10}{'HashMap':>12}"
+        f"{'Frozen':>12}{'HashMap get':>13}{'Frozen get':>12}"
+    )
+    for size in SIZES:
+        result = bench_size(size)
+        print(
+            f"{size:>8}{result['build']:>9.1f} ms{result['bits/key']:>10.2f}"
+            f"{result['HashMap']:>8.2f} MiB{result['FrozenHashMap']:>8.2f} MiB"
+            f"{result['HashMap get']:>10.0f} ns{result['Frozen get']:>9.0f} ns"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Micro-benchmark of the HashMap hasher modes.
+
+Run from the repository root with:
+
+    python -m benchmarks.hashers_benchmark
+"""
+
+from timeit import timeit
+
+from src.algoandds.hashmap import HashMap
+from src.algoandds.hashmap.hashers import HASHERS
+
+
+NUMBER_OF_KEYS = 10_000
+REPEAT = 5
+
+
+def _keys():
+    return {
+        "int": list(range(1, NUMBER_OF_KEYS + 1)),
+        "str": [f"key-{i}" for i in range(NUMBER_OF_KEYS)],
+    }
+
+
+def _per_key_ns(seconds: float) -> float:
+    return seconds / (REPEAT * NUMBER_OF_KEYS) * 1e9
+
+
+def bench_mode(mode: str, keys: list) -> dict:
+    hasher = HASHERS[mode]()
+    hm = HashMap({key: key for key in keys}, hasher=hasher)
+
+    def prehash():
+        for key in keys:
+            hasher.prehash(key)
+
+    def lookup():
+        for key in keys:
+            hm[key]
+
+    def insert():
+        new_hm = HashMap(hasher=hasher)
+        for key in keys:
+            new_hm.update((key, key))
+
+    return {
+        "prehash": _per_key_ns(timeit(prehash, number=REPEAT)),
+        "lookup": _per_key_ns(timeit(lookup, number=REPEAT)),
+        "insert": _per_key_ns(timeit(insert, number=REPEAT)),
+    }
+
+
+def main():
+    print(
+        f"{'mode':<15}{'keys':<6}"
+        f"{'prehash':>12}{'lookup':>12}{'insert':>12}"
+    )
+    for mode in HASHERS:
+        for key_type, keys in _keys().items():
+            result = bench_mode(mode, keys)
+            print(
+                f"{mode:<15}{key_type:<6}"
+                + "".join(f"{result[op]:>9.0f} ns" for op in result)
+            )
+
+
+if __name__ == "__main__":
+    main()
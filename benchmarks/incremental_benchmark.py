@@ -0,0 +1,57 @@
+"""Benchmark of single insert latency while a HashMap grows.
+
+Compares the stop-the-world resize of HashMap with the incremental
+resize of IncrementalHashMap. The garbage collector is disabled while
+measuring, so that its pauses are not mistaken for resizes.
+
+Run from the repository root with:
+
+    python -m benchmarks.incremental_benchmark
+"""
+
+import gc
+from time import perf_counter_ns
+
+from src.algoandds.hashmap import HashMap, IncrementalHashMap, KeyedHasher
+
+
+NUMBER_OF_KEYS = 200_000
+PERCENTILES = (50, 99, 99.9, 100)
+
+
+def insert_latencies(backend) -> list:
+    hm = backend(hasher=KeyedHasher())
+    latencies = []
+    gc.disable()
+    try:
+        for key in range(NUMBER_OF_KEYS):
+            start = perf_counter_ns()
+            hm.update((key, key))
+            latencies.append(perf_counter_ns() - start)
+    finally:
+        gc.enable()
+    return sorted(latencies)
+
+
+def percentile(sorted_values: list, p: float) -> int:
+    index = min(int(len(sorted_values) * p / 100), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def main():
+    print(
+        f"{'backend':<20}" + "".join(f"{f'p{p}':>14}" for p in PERCENTILES)
+    )
+    for backend in (HashMap, IncrementalHashMap):
+        latencies = insert_latencies(backend)
+        print(
+            f"{backend.__name__:<20}"
+            + "".join(
+                f"{percentile(latencies, p) / 1000:>11.1f} us"
+                for p in PERCENTILES
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
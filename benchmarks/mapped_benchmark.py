@@ -0,0 +1,66 @@
+"""Benchmark of MappedHashMap startup against rebuilding a HashMap.
+
+Compares the time it takes a process to get a usable map: rebuilding
+it with update calls, or opening a file written by HashMap.dump. Also
+reports the cost of a lookup in each.
+
+Run from the repository root with:
+
+    python -m benchmarks.mapped_benchmark
+"""
+
+import os
+import tempfile
+from time import perf_counter
+
+from src.algoandds.hashmap import HashMap, MappedHashMap
+
+
+NUMBER_OF_ENTRIES = 200_000
+NUMBER_OF_LOOKUPS = 50_000
+
+
+def main():
+    rows = [
+        (f"user:{i}", {"id": i, "name": f"name{i}"})
+        for i in range(NUMBER_OF_ENTRIES)
+    ]
+    keys = [key for key, _ in rows[:NUMBER_OF_LOOKUPS]]
+
+    start = perf_counter()
+    hm = HashMap(hasher="keyed")
+    for row in rows:
+        hm.update(row)
+    rebuild_time = perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "users.map")
+        start = perf_counter()
+        hm.dump(path)
+        dump_time = perf_counter() - start
+
+        start = perf_counter()
+        mm = MappedHashMap(path)
+        open_time = perf_counter() - start
+
+        start = perf_counter()
+        for key in keys:
+            hm[key]
+        hashmap_lookup = (perf_counter() - start) / len(keys) * 1e9
+        start = perf_counter()
+        for key in keys:
+            mm[key]
+        mapped_lookup = (perf_counter() - start) / len(keys) * 1e9
+        size = os.path.getsize(path) / 2**20
+        mm.close()
+
+    print(f"{NUMBER_OF_ENTRIES} entries, file of {size:.1f} MiB")
+    print(f"rebuild with update: {rebuild_time * 1e3:>10.1f} ms")
+    print(f"dump:                {dump_time * 1e3:>10.1f} ms")
+    print(f"open mapped file:    {open_time * 1e3:>10.3f} ms")
+    print(f"HashMap lookup:      {hashmap_lookup:>10.0f} ns")
+    print(f"MappedHashMap lookup:{mapped_lookup:>10.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
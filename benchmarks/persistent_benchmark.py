@@ -0,0 +1,87 @@
+"""Benchmark of PersistentHashMap snapshots against HashMap copies.
+
+Keeping a version of the map after every change takes a full copy with
+a HashMap, while a PersistentHashMap shares all but the O(log32 n)
+nodes the change goes through. Reports the cost of a change that keeps
+the previous version, the memory taken by the versions and the cost
+of a lookup.
+
+Run from the repository root with:
+
+    python -m benchmarks.persistent_benchmark
+"""
+
+import tracemalloc
+from timeit import timeit
+
+from src.algoandds.hashmap import HashMap, PersistentHashMap
+
+
+SIZES = (1_000, 10_000, 100_000)
+VERSIONS = 100
+
+
+def bench_size(size: int) -> dict:
+    keys = [f"key:{i}" for i in range(size)]
+    hm = HashMap(hasher="keyed")
+    hm.set_many((key, None) for key in keys)
+    pm = PersistentHashMap(hm.items(), hasher="keyed")
+
+    def copy_and_set():
+        versions, current = [], hm
+        for i in range(VERSIONS):
+            current = current.copy()
+            current[keys[i]] = i
+            versions.append(current)
+        return versions
+
+    def persistent_set():
+        versions, current = [], pm
+        for i in range(VERSIONS):
+            current = current.set(keys[i], i)
+            versions.append(current)
+        return versions
+
+    def memory(make_versions) -> float:
+        tracemalloc.start()
+        start = tracemalloc.get_traced_memory()[0]
+        versions = make_versions()
+        used = tracemalloc.get_traced_memory()[0] - start
+        tracemalloc.stop()
+        del versions
+        return used / 2**20
+
+    def lookups(mapping):
+        for key in keys:
+            mapping[key]
+
+    return {
+        "HashMap set": timeit(copy_and_set, number=1) / VERSIONS * 1e6,
+        "Persistent set": timeit(persistent_set, number=1) / VERSIONS * 1e6,
+        "HashMap memory": memory(copy_and_set),
+        "Persistent memory": memory(persistent_set),
+        "HashMap get": timeit(lambda: lookups(hm), number=1) / size * 1e9,
+        "Persistent get": timeit(lambda: lookups(pm), number=1) / size * 1e9,
+    }
+
+
+def main():
+    print(f"{VERSIONS} versions, each one change away from the previous one")
+    print(
+        f"{'keys':>8}{'copy+set':>12}{'set':>12}{'copies':>13}"
+        f"{'versions':>13}{'HashMap get':>13}{'HAMT get':>11}"
+    )
+    for size in SIZES:
+        result = bench_size(size)
+        print(
+            f"{size:>8}{result['HashMap set']:>9.1f} us"
+            f"{result['Persistent set']:>9.1f} us"
+            f"{result['HashMap memory']:>9.2f} MiB"
+            f"{result['Persistent memory']:>9.2f} MiB"
+            f"{result['HashMap get']:>10.0f} ns"
+            f"{result['Persistent get']:>8.0f} ns"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Benchmark of SharedHashMap against pickling a HashMap to each worker.
+
+Starts a pool of worker processes that each look up keys in the same
+map, which is either pickled to every worker, or published once into
+shared memory and attached to by name. Reports how long the pool takes
+to get ready, the private (anonymous) memory of each worker, and the
+lookup throughput.
+
+Memory figures come from /proc, so they are only shown on Linux.
+
+Run from the repository root with:
+
+    python -m benchmarks.shared_benchmark
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+from src.algoandds.hashmap import HashMap, SharedHashMap
+
+
+NUMBER_OF_ENTRIES = 200_000
+NUMBER_OF_WORKERS = 4
+LOOKUPS_PER_WORKER = 100_000
+
+_worker_map = None
+
+
+def _private_memory_mib():
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("RssAnon:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _initialize(shared_map):
+    global _worker_map
+    _worker_map = shared_map
+
+
+def _lookup(keys: list) -> tuple:
+    start = perf_counter()
+    for key in keys:
+        _worker_map[key]
+    return perf_counter() - start, _private_memory_mib()
+
+
+def bench(shared_map, keys: list) -> dict:
+    # Workers are spawned, so the map is pickled to each of them,
+    # as with any start method other than fork.
+    context = multiprocessing.get_context("spawn")
+    start = perf_counter()
+    with ProcessPoolExecutor(
+        NUMBER_OF_WORKERS, context, _initialize, (shared_map,)
+    ) as executor:
+        # A first round of tasks makes every worker start.
+        list(executor.map(_lookup, [keys[:1]] * NUMBER_OF_WORKERS))
+        ready_time = perf_counter() - start
+        results = list(executor.map(_lookup, [keys] * NUMBER_OF_WORKERS))
+    seconds = sum(result[0] for result in results) / len(results)
+    memory = [result[1] for result in results]
+    return {
+        "ready": ready_time * 1e3,
+        "memory": None if None in memory else sum(memory) / len(memory),
+        "lookups": len(keys) / seconds,
+    }
+
+
+def main():
+    # Str hashes change between processes, so a HashMap pickled to
+    # another process needs deterministic prehashes to stay usable.
+    hm = HashMap(hasher="deterministic")
+    hm.set_many(
+        (f"user:{i}", {"id": i, "name": f"name{i}"})
+        for i in range(NUMBER_OF_ENTRIES)
+    )
+    keys = [f"user:{i}" for i in range(0, NUMBER_OF_ENTRIES, 2)]
+    keys = keys[:LOOKUPS_PER_WORKER]
+    shared_map = hm.share()
+    try:
+        results = {
+            "pickled HashMap": bench(hm, keys),
+            "SharedHashMap": bench(shared_map, keys),
+        }
+    finally:
+        shared_map.close()
+        shared_map.unlink()
+
+    print(
+        f"{NUMBER_OF_ENTRIES} entries, {NUMBER_OF_WORKERS} workers\n"
+        f"{'':<17}{'pool ready':>12}{'memory/worker':>16}{'lookups/s':>12}"
+    )
+    for name, result in results.items():
+        memory = (
+            "n/a" if result["memory"] is None
+            else f"{result['memory']:.1f} MiB"
+        )
+        print(
+            f"{name:<17}{result['ready']:>9.0f} ms{memory:>16}"
+            f"{result['lookups']:>12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Benchmark of the streaming sketches.
+
+Feeds a skewed stream of ints to a HyperLogLog, a Count-Min sketch
+and a heavy hitters tracker, one key at a time, from a list and from
+a NumPy array, and reports the cost per key of each, the size of the
+sketches against that of a HashMap counting the same keys, and the
+error of their estimates: the relative error of the distinct count,
+and the mean overestimate of the count of each key.
+
+Run from the repository root with:
+
+    python -m benchmarks.sketches_benchmark
+"""
+
+import random
+import sys
+from collections import Counter
+from time import perf_counter
+
+from src.algoandds.hashmap import (
+    CountMinSketch,
+    HashMap,
+    HeavyHitters,
+    HyperLogLog,
+)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+STREAM_SIZE = 500_000
+TOP_KEYS = 10
+
+
+def per_key(function, stream) -> float:
+    start = perf_counter()
+    function(stream)
+    return (perf_counter() - start) / len(stream) * 1e9
+
+
+def one_at_a_time(add):
+    def add_all(stream):
+        for key in stream:
+            add(key)
+
+    return add_all
+
+
+def hashmap_bytes(hm: HashMap) -> int:
+    return sys.getsizeof(hm._list) + sum(
+        sys.getsizeof(entry) for entry in hm._list if entry is not None
+    )
+
+
+def main():
+    rng = random.Random(0)
+    stream = [int(rng.paretovariate(0.5)) for _ in range(STREAM_SIZE)]
+    counts = Counter(stream)
+    hm = HashMap(hasher="deterministic")
+    start = perf_counter()
+    for key in stream:
+        hm[key] = hm.get(key, 0) + 1
+    hm_time = (perf_counter() - start) / STREAM_SIZE * 1e9
+    print(
+        f"{STREAM_SIZE} keys, {len(counts)} distinct, HashMap counts: "
+        f"{hm_time:.0f} ns/key, {hashmap_bytes(hm) / 2**20:.1f} MiB"
+    )
+    inputs = [("add", None), ("add_many list", stream)]
+    if np is not None:
+        inputs.append(("add_many array", np.array(stream, dtype=np.int64)))
+    print(f"{'sketch':>14}{'input':>16}{'ns/key':>9}{'KiB':>8}{'error':>9}")
+    for name, factory in (
+        ("HyperLogLog", HyperLogLog),
+        ("CountMinSketch", lambda: CountMinSketch(4096, 5)),
+        ("HeavyHitters", lambda: HeavyHitters(TOP_KEYS, 4096, 5)),
+    ):
+        for input_name, keys in inputs:
+            sketch = factory()
+            if keys is None:
+                cost = per_key(one_at_a_time(sketch.add), stream)
+            else:
+                cost = per_key(sketch.add_many, keys)
+            if isinstance(sketch, HyperLogLog):
+                size = len(sketch._registers)
+                error = f"{sketch.count() / len(counts) - 1:.2%}"
+            else:
+                cms = getattr(sketch, "sketch", sketch)
+                size = cms._counters.itemsize * len(cms._counters)
+                # The mean overestimate of the counts of distinct keys.
+                overestimate = sum(
+                    estimate - counts[key]
+                    for key, estimate in zip(
+                        counts, cms.estimate_many(list(counts))
+                    )
+                ) / len(counts)
+                error = f"+{overestimate:.2f}"
+            print(
+                f"{name:>14}{input_name:>16}{cost:>9.0f}"
+                f"{size / 1024:>8.0f}{error:>9}"
+            )
+    hh = HeavyHitters(TOP_KEYS, 4096, 5)
+    hh.add_many(stream)
+    found = {key for key, _ in hh.top()}
+    true_top = {key for key, _ in counts.most_common(TOP_KEYS)}
+    print(f"Top {TOP_KEYS} keys found: {len(found & true_top)}")
+
+
+if __name__ == "__main__":
+    main()
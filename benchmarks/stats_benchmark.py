@@ -0,0 +1,80 @@
+"""Benchmark of the cost of HashMap stats.
+
+Times lookups and inserts on maps that never enabled stats, that count
+their operations, and that disabled stats again, to check that stats
+cost nothing once disabled.
+
+Run from the repository root with:
+
+    python -m benchmarks.stats_benchmark
+"""
+
+from timeit import timeit
+
+from src.algoandds.hashmap import (
+    HashMap,
+    RobinHoodHashMap,
+    SwissHashMap,
+    CompactHashMap,
+    IncrementalHashMap,
+)
+
+
+BACKENDS = (
+    HashMap,
+    RobinHoodHashMap,
+    SwissHashMap,
+    CompactHashMap,
+    IncrementalHashMap,
+)
+SIZE = 100_000
+REPEAT = 3
+
+
+def bench_backend(backend, keys: list) -> dict:
+    def run(switch) -> tuple:
+        hm = backend(hasher="keyed")
+        switch(hm)
+
+        def inserts():
+            for key in keys:
+                hm[key] = None
+
+        def lookups():
+            for key in keys:
+                hm[key]
+
+        set_time = timeit(inserts, number=1)
+        get_time = min(timeit(lookups, number=1) for _ in range(REPEAT))
+        return set_time / SIZE * 1e9, get_time / SIZE * 1e9
+
+    def enable_then_disable(hm):
+        hm.enable_stats()
+        hm.disable_stats()
+
+    return {
+        "off": run(lambda hm: None),
+        "on": run(lambda hm: hm.enable_stats()),
+        "disabled": run(enable_then_disable),
+    }
+
+
+def main():
+    keys = [f"key:{i}" for i in range(SIZE)]
+    print(
+        f"{'backend':>20}{'set off':>10}{'set on':>10}{'set disabled':>14}"
+        f"{'get off':>10}{'get on':>10}{'get disabled':>14}"
+    )
+    for backend in BACKENDS:
+        result = bench_backend(backend, keys)
+        print(
+            f"{backend.__name__:>20}"
+            f"{result['off'][0]:>7.0f} ns{result['on'][0]:>7.0f} ns"
+            f"{result['disabled'][0]:>11.0f} ns"
+            f"{result['off'][1]:>7.0f} ns{result['on'][1]:>7.0f} ns"
+            f"{result['disabled'][1]:>11.0f} ns"
+        )
+
+
+if __name__ == "__main__":
+    main()
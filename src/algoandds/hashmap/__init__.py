@@ -1 +1,21 @@
 ﻿from .hashmap import HashMap
+from .robinhood import RobinHoodHashMap
+from .swisstable import SwissHashMap
+from .compact import CompactHashMap
+from .incremental import IncrementalHashMap
+from .concurrent import ConcurrentHashMap
+from .cache import BoundedCache, memoize
+from .expiring import ExpiringHashMap
+from .mapped import MappedHashMap
+from .shared import SharedHashMap
+from .frozen import FrozenHashMap
+from .persistent import PersistentHashMap, TransientHashMap
+from .filters import BloomFilter, CountingBloomFilter, CuckooFilter
+from .sketches import CountMinSketch, HeavyHitters, HyperLogLog
+from .views import HashMapKeysView, HashMapValuesView, HashMapItemsView
+from .hashers import (
+    Hasher,
+    SaltedSHA256Hasher,
+    KeyedHasher,
+    DeterministicHasher,
+)
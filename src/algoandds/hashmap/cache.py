@@ -0,0 +1,550 @@
+"""Bounded caches built on HashMap, with pluggable eviction policies."""
+
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Iterator, Type, Union
+
+from .hashers import Hasher
+from .hashmap import HashMap, _MISSING
+from ..tools.tools import get_class_name
+
+
+CacheInfo = namedtuple(
+    "CacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize"]
+)
+
+
+class _CacheNode:
+    __slots__ = ("key", "value", "prehash", "prev", "next", "owner")
+
+    def __init__(self, key=None, value=None, prehash: int = 0):
+        self.key = key
+        self.value = value
+        self.prehash = prehash
+        self.prev: "_CacheNode" = self
+        self.next: "_CacheNode" = self
+        self.owner: Union["_NodeList", None] = None
+
+
+class _NodeList:
+    """Circular doubly linked list of cache nodes, around a sentinel.
+
+    The front holds the most recently used node, the back the least
+    recently used one. Every operation is O(1).
+    """
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self):
+        self._root = _CacheNode()
+        self._size = 0
+
+    def push_front(self, node: _CacheNode):
+        root = self._root
+        node.prev, node.next = root, root.next
+        root.next.prev = node
+        root.next = node
+        node.owner = self
+        self._size += 1
+
+    def remove(self, node: _CacheNode):
+        node.prev.next = node.next
+        node.next.prev = node.prev
+        node.prev = node.next = node
+        node.owner = None
+        self._size -= 1
+
+    def move_to_front(self, node: _CacheNode):
+        self.remove(node)
+        self.push_front(node)
+
+    def pop_back(self) -> _CacheNode:
+        node = self._root.prev
+        self.remove(node)
+        return node
+
+    def __iter__(self) -> Iterator[_CacheNode]:
+        node = self._root.next
+        while node is not self._root:
+            yield node
+            node = node.next
+
+    def __reversed__(self) -> Iterator[_CacheNode]:
+        node = self._root.prev
+        while node is not self._root:
+            yield node
+            node = node.prev
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class EvictionPolicy(ABC):
+    """Strategy that decides which cache entry is evicted next.
+
+    The policy keeps track of the cache nodes, and is told when a node
+    is inserted, used (touched) or removed. All of it in O(1).
+    """
+
+    name: str
+
+    def __init__(self, maxsize: Union[int, None]):
+        self._maxsize = maxsize
+
+    @abstractmethod
+    def insert(self, node: _CacheNode):
+        ...
+
+    @abstractmethod
+    def touch(self, node: _CacheNode):
+        ...
+
+    @abstractmethod
+    def remove(self, node: _CacheNode):
+        ...
+
+    @abstractmethod
+    def evict(self) -> _CacheNode:
+        """Removes and returns the node to evict."""
+        ...
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[_CacheNode]:
+        """Iterates over the nodes, from the last one to be evicted."""
+        ...
+
+
+class LRUPolicy(EvictionPolicy):
+    """Evicts the least recently used entry."""
+
+    name = "lru"
+
+    def __init__(self, maxsize: int):
+        super().__init__(maxsize)
+        self._nodes = _NodeList()
+
+    def insert(self, node: _CacheNode):
+        self._nodes.push_front(node)
+
+    def touch(self, node: _CacheNode):
+        self._nodes.move_to_front(node)
+
+    def remove(self, node: _CacheNode):
+        node.owner.remove(node)
+
+    def evict(self) -> _CacheNode:
+        return self._nodes.pop_back()
+
+    def __iter__(self) -> Iterator[_CacheNode]:
+        return reversed(self._nodes)
+
+
+class _FrequencyList(_NodeList):
+    """Nodes used the same number of times, linked to the lists of the
+    nearest lower and higher use counts.
+    """
+
+    __slots__ = ("frequency", "lower", "higher")
+
+    def __init__(self, frequency: int):
+        super().__init__()
+        self.frequency = frequency
+        self.lower = self.higher = self
+
+
+class LFUPolicy(EvictionPolicy):
+    """Evicts the least frequently used entry, and the least recently
+    used one among entries used as often.
+
+    Nodes are kept in one list per use count, and the lists are linked
+    in increasing order of use count. A use moves a node to the next
+    list, and the lowest count is always the first list, so no count is
+    ever hashed or searched for.
+    """
+
+    name = "lfu"
+
+    def __init__(self, maxsize: int):
+        super().__init__(maxsize)
+        self._head = _FrequencyList(0)
+
+    def _list_after(
+        self, nodes: _FrequencyList, frequency: int
+    ) -> _FrequencyList:
+        # Returns the list following nodes if it holds frequency,
+        # otherwise links a new list for it there.
+        higher = nodes.higher
+        if higher is not self._head and higher.frequency == frequency:
+            return higher
+        new_list = _FrequencyList(frequency)
+        new_list.lower, new_list.higher = nodes, higher
+        nodes.higher = higher.lower = new_list
+        return new_list
+
+    def _pull(self, node: _CacheNode):
+        nodes = node.owner
+        nodes.remove(node)
+        if not len(nodes):
+            nodes.lower.higher = nodes.higher
+            nodes.higher.lower = nodes.lower
+
+    def insert(self, node: _CacheNode):
+        self._list_after(self._head, 1).push_front(node)
+
+    def touch(self, node: _CacheNode):
+        nodes = node.owner
+        higher = self._list_after(nodes, nodes.frequency + 1)
+        self._pull(node)
+        higher.push_front(node)
+
+    def remove(self, node: _CacheNode):
+        self._pull(node)
+
+    def evict(self) -> _CacheNode:
+        node = next(reversed(self._head.higher))
+        self._pull(node)
+        return node
+
+    def __iter__(self) -> Iterator[_CacheNode]:
+        nodes = self._head.higher
+        while nodes is not self._head:
+            yield from reversed(nodes)
+            nodes = nodes.higher
+
+
+class SegmentedLRUPolicy(EvictionPolicy):
+    """Segmented LRU: new entries go to a probationary segment, and
+    move to a protected one when they are used again.
+
+    Entries are evicted from the probationary segment, so that a burst
+    of entries used only once cannot flush the protected ones. When the
+    protected segment is full, its least recently used entry goes back
+    to the probationary segment.
+    """
+
+    name = "slru"
+    _PROTECTED_RATIO = 0.8
+
+    def __init__(self, maxsize: int):
+        super().__init__(maxsize)
+        self._probation = _NodeList()
+        self._protected = _NodeList()
+        self._protected_size = (
+            None
+            if maxsize is None
+            else max(1, int(maxsize * self._PROTECTED_RATIO))
+        )
+
+    def insert(self, node: _CacheNode):
+        self._probation.push_front(node)
+
+    def touch(self, node: _CacheNode):
+        if node.owner is self._protected:
+            self._protected.move_to_front(node)
+            return
+        self._probation.remove(node)
+        self._protected.push_front(node)
+        if (
+            self._protected_size is not None
+            and len(self._protected) > self._protected_size
+        ):
+            self._probation.push_front(self._protected.pop_back())
+
+    def remove(self, node: _CacheNode):
+        node.owner.remove(node)
+
+    def evict(self) -> _CacheNode:
+        if len(self._probation):
+            return self._probation.pop_back()
+        return self._protected.pop_back()
+
+    def __iter__(self) -> Iterator[_CacheNode]:
+        yield from reversed(self._probation)
+        yield from reversed(self._protected)
+
+
+EVICTION_POLICIES: Dict[str, Type[EvictionPolicy]] = {
+    policy.name: policy
+    for policy in (LRUPolicy, LFUPolicy, SegmentedLRUPolicy)
+}
+DEFAULT_EVICTION_POLICY = LRUPolicy.name
+
+
+class BoundedCache:
+    """Cache holding at most maxsize entries, backed by a HashMap.
+    With maxsize None, the cache is unbounded and nothing is evicted.
+
+    The HashMap maps each key to a node that the eviction policy keeps
+    in doubly linked lists, so lookups, insertions and evictions are
+    all O(1). Policies: 'lru', 'lfu' and 'slru' (segmented LRU).
+
+    get and __getitem__ count hits and misses and mark the entry as
+    used; __contains__ does neither.
+    """
+
+    def __init__(
+        self,
+        maxsize: Union[int, None] = 128,
+        policy: str = DEFAULT_EVICTION_POLICY,
+        hasher: Union[str, Hasher] = None,
+    ):
+        self._set_maxsize(maxsize)
+        self._set_policy(policy)
+        self._map = HashMap(hasher=hasher, auto_shrink=False)
+        self._reserve()
+        self._hits = self._misses = self._evictions = 0
+        # Counts the insertions and deletions, so that get_or_compute
+        # can tell whether its factory changed the cache.
+        self._version = 0
+
+    def _set_maxsize(self, maxsize: Union[int, None]):
+        if maxsize is None:
+            self._maxsize = None
+            return
+        if not isinstance(maxsize, int) or isinstance(maxsize, bool):
+            raise TypeError(
+                f"Inappropriate type '{get_class_name(maxsize)}' "
+                "for maxsize. Should be 'int' or 'NoneType'."
+            )
+        if maxsize < 1:
+            raise ValueError("Maxsize should be >= 1.")
+        self._maxsize = maxsize
+
+    def _set_policy(self, policy: str):
+        if not isinstance(policy, str):
+            raise TypeError(
+                f"Inappropriate type '{get_class_name(policy)}' "
+                "for eviction policy. Should be 'str'."
+            )
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(
+                f"Unknown eviction policy '{policy}'. "
+                f"Available policies: {', '.join(EVICTION_POLICIES)}."
+            )
+        self._policy = EVICTION_POLICIES[policy](self._maxsize)
+
+    def _reserve(self):
+        # A new entry is written to the map before one is evicted, so
+        # a bounded map never holds more than maxsize + 1 entries: it is
+        # sized once and never shrunk.
+        if self._maxsize is not None:
+            self._map.reserve(self._maxsize + 1)
+
+    @property
+    def maxsize(self) -> Union[int, None]:
+        """The maximum number of entries, None if unbounded."""
+        return self._maxsize
+
+    @property
+    def policy(self) -> str:
+        """The name of the eviction policy."""
+        return self._policy.name
+
+    @property
+    def hasher(self) -> Hasher:
+        """The hasher used to compute the prehash of the keys."""
+        return self._map.hasher
+
+    @property
+    def hits(self) -> int:
+        """The number of lookups that found their key."""
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """The number of lookups that did not find their key."""
+        return self._misses
+
+    @property
+    def evictions(self) -> int:
+        """The number of entries evicted to make room for new ones."""
+        return self._evictions
+
+    def cache_info(self) -> CacheInfo:
+        """Returns the statistics of the cache, like functools' caches."""
+        return CacheInfo(
+            self._hits, self._misses, self._evictions, self._maxsize, len(self)
+        )
+
+    def _find_node(self, key, prehash: int) -> Union[_CacheNode, None]:
+        entry = self._map._find_entry(key, prehash)
+        return None if entry is None else entry[1]
+
+    def get(self, key, default=None):
+        """Returns the value for key if the latter is in the cache,
+        else default.
+        """
+        node = self._find_node(key, self._map._key_hash(key))
+        if node is None:
+            self._misses += 1
+            return default
+        self._hits += 1
+        self._policy.touch(node)
+        return node.value
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError("Mapping key not found.")
+        return value
+
+    def _add_node(self, node: _CacheNode):
+        # Hands the node of a new entry, already written to the map, to
+        # the policy, after evicting an entry if the map went over
+        # maxsize. The new node is not a candidate for eviction.
+        if self._maxsize is not None and len(self._map) > self._maxsize:
+            evicted = self._policy.evict()
+            self._map._delete_entry(evicted.key, evicted.prehash)
+            self._evictions += 1
+        self._policy.insert(node)
+        self._version += 1
+
+    def get_or_compute(self, key, factory: Callable[[], Any]):
+        """Returns the value for key if the latter is in the cache.
+
+        Otherwise, calls factory with no arguments, inserts key with
+        the value it returns and returns that value. Counts a hit or a
+        miss, like get. The key is hashed and looked up once, unless
+        factory changes the cache.
+        """
+        prehash = self._map._key_hash(key)
+        new_nodes = []
+
+        def compute(found: bool, node: _CacheNode) -> _CacheNode:
+            if found:
+                self._hits += 1
+                self._policy.touch(node)
+                return node
+            self._misses += 1
+            version = self._version
+            value = factory()
+            if self._version != version:
+                # The factory may have inserted the key itself.
+                node = self._find_node(key, prehash)
+                if node is not None:
+                    node.value = value
+                    self._policy.touch(node)
+                    return node
+            node = _CacheNode(key, value, prehash)
+            new_nodes.append(node)
+            return node
+
+        node = self._map._compute_entry(key, prehash, compute)
+        if new_nodes:
+            self._add_node(node)
+        return node.value
+
+    def __setitem__(self, key, value):
+        prehash = self._map._key_hash(key)
+        new_nodes = []
+
+        def compute(found: bool, node: _CacheNode) -> _CacheNode:
+            if found:
+                node.value = value
+                self._policy.touch(node)
+                return node
+            node = _CacheNode(key, value, prehash)
+            new_nodes.append(node)
+            return node
+
+        node = self._map._compute_entry(key, prehash, compute)
+        if new_nodes:
+            self._add_node(node)
+
+    def __delitem__(self, key):
+        prehash = self._map._key_hash(key)
+        node = self._map._delete_entry(key, prehash)[1]
+        self._policy.remove(node)
+        self._version += 1
+
+    def __contains__(self, key) -> bool:
+        return key in self._map
+
+    def __len__(self) -> int:
+        return len(self._map)
+
+    def __iter__(self) -> Iterator:
+        """Iterates over the keys, from the next one to be evicted."""
+        for node in self._policy:
+            yield node.key
+
+    def clear(self):
+        """Removes all the entries and resets the statistics."""
+        self._map.clear()
+        self._reserve()
+        self._set_policy(self._policy.name)
+        self._hits = self._misses = self._evictions = 0
+        self._version += 1
+
+    def __repr__(self) -> str:
+        return (
+            f"<{get_class_name(self)}: policy={self.policy}, "
+            f"maxsize={self._maxsize}, size={len(self)}>"
+        )
+
+
+class _MemoKey(list):
+    # Key made of the arguments of a memoized call. HashMap does not
+    # take tuples as keys, so the arguments are held in a list whose
+    # hash, computed once from the arguments tuple, is stored.
+
+    __slots__ = ("_hash",)
+
+    def __init__(self, values: tuple):
+        super().__init__(values)
+        self._hash = hash(values)
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __bytes__(self) -> bytes:
+        # The SHA-256 hasher digests bytes(key). Equal keys have equal
+        # hashes, so the hash is all that needs to be digested.
+        return self._hash.to_bytes(8, "little", signed=True)
+
+
+_KWARGS_MARK = object()
+
+
+def _make_memo_key(args: tuple, kwargs: dict) -> Hashable:
+    if not kwargs and len(args) == 1 and type(args[0]) is str:
+        return args[0]
+    values = args
+    if kwargs:
+        values += (_KWARGS_MARK,) + tuple(kwargs.items())
+    return _MemoKey(values)
+
+
+def memoize(
+    maxsize: Union[int, Callable, None] = 128,
+    policy: str = DEFAULT_EVICTION_POLICY,
+    hasher: Union[str, Hasher] = None,
+):
+    """Decorator that caches the results of a function in a
+    BoundedCache, like functools.lru_cache.
+
+    The arguments of the calls must be hashable. The wrapper exposes
+    the cache itself as cache, along with cache_info and cache_clear.
+    With maxsize None, the results are never evicted. Can also be used
+    without arguments, as @memoize.
+    """
+    if callable(maxsize):
+        return memoize()(maxsize)
+
+    def decorator(func: Callable) -> Callable:
+        # Each decorated function gets a cache of its own.
+        cache = BoundedCache(maxsize, policy, hasher)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return cache.get_or_compute(
+                _make_memo_key(args, kwargs), lambda: func(*args, **kwargs)
+            )
+
+        wrapper.cache = cache
+        wrapper.cache_info = cache.cache_info
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
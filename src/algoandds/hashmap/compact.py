@@ -0,0 +1,195 @@
+"""The CompactHashMap class module."""
+
+from array import array
+from typing import Callable, Dict, Iterator, List, Tuple, Union
+
+from .hashmap import HashMap
+from ..tools.tools import get_class_name
+
+
+EMPTY = -1
+DUMMY = -2
+
+
+def get_index_typecode(map_size: int) -> str:
+    """Returns the smallest array typecode able to hold the indexes
+    of the entries of a map with the given size.
+    """
+    for typecode in ("b", "h", "i"):
+        if map_size <= 2 ** (array(typecode).itemsize * 8 - 1):
+            return typecode
+    return "q"
+
+
+class CompactHashMap(HashMap):
+    """HashMap backend with the layout of CPython's dict.
+
+    Entries are appended, in insertion order, to dense lists of keys,
+    values and prehashes. The hash table itself is an array of small
+    integers pointing into those lists, using the smallest integer type
+    that fits the map size. Iteration walks the dense lists, so it
+    follows insertion order and never visits empty table slots.
+
+    Deleting an entry leaves a hole in the dense lists and a dummy in
+    the index table; both are dropped at the next resize.
+    """
+
+    _HAS_SPLITTABLE_BUCKETS = False
+
+    def _allocate_buckets(self, map_size: int):
+        typecode = get_index_typecode(map_size)
+        self._indices = array(typecode, [EMPTY]) * map_size
+        self._keys: List = []
+        self._values: List = []
+        self._hashes: List = []
+
+    @property
+    def _capacity(self) -> int:
+        return len(self._indices)
+
+    def _find_slot(self, key, prehash: int) -> int:
+        """Returns the index table slot pointing to key's entry,
+        or -1 if key is not found.
+        """
+        indices, keys, hashes = self._indices, self._keys, self._hashes
+        capacity = len(indices)
+        slot = prehash % capacity
+        while True:
+            index = indices[slot]
+            if index == EMPTY:
+                return -1
+            if index >= 0 and hashes[index] == prehash:
+                existing_key = keys[index]
+                if existing_key is key or existing_key == key:
+                    return slot
+            slot += 1
+            if slot == capacity:
+                slot = 0
+
+    def _find_free_slot(self, prehash: int) -> int:
+        indices = self._indices
+        capacity = len(indices)
+        slot = prehash % capacity
+        while indices[slot] >= 0:
+            slot += 1
+            if slot == capacity:
+                slot = 0
+        return slot
+
+    def _append_entry(self, key, value, prehash: int):
+        self._indices[self._find_free_slot(prehash)] = len(self._keys)
+        self._keys.append(key)
+        self._values.append(value)
+        self._hashes.append(prehash)
+
+    def _is_insert_overloading(self) -> bool:
+        # Holes left by deletes still take room in the dense lists,
+        # and resizing is what compacts them.
+        new_load = (len(self._keys) + 1) / len(self._indices)
+        return self._is_load_high(new_load)
+
+    def __getitem__(self, key):
+        slot = self._find_slot(key, self._key_hash(key))
+        if slot < 0:
+            raise KeyError("Mapping key not found.")
+        return self._values[self._indices[slot]]
+
+    def _set_entry(self, key, value, prehash: int):
+        slot = self._find_slot(key, prehash)
+        if slot >= 0:
+            self._values[self._indices[slot]] = value
+            return
+        self._add_entry(key, value, prehash)
+
+    def _add_entry(self, key, value, prehash: int):
+        if self._is_insert_overloading():
+            self._resize_list(1)
+        self._append_entry(key, value, prehash)
+        self._number_of_entries += 1
+        self._number_of_occupied_buckets += 1
+
+    def _key_at_slot(self, slot: int):
+        return self._keys[self._indices[slot]]
+
+    def _value_at_slot(self, slot: int):
+        return self._values[self._indices[slot]]
+
+    def _set_value_at_slot(self, slot: int, value):
+        self._values[self._indices[slot]] = value
+
+    _compute_entry = HashMap._compute_in_slot
+
+    def _delete_entry(self, key, prehash: int) -> Tuple:
+        slot = self._find_slot(key, prehash)
+        if slot < 0:
+            raise KeyError("Mapping key not found.")
+        index = self._indices[slot]
+        entry = (self._keys[index], self._values[index], prehash)
+        self._indices[slot] = DUMMY
+        self._keys[index] = self._values[index] = None
+        self._hashes[index] = None
+        self._number_of_entries -= 1
+        self._number_of_deletions += 1
+        self._number_of_occupied_buckets -= 1
+        return entry
+
+    def __contains__(self, key) -> bool:
+        try:
+            prehash = self._key_hash(key)
+        except (TypeError, ValueError):
+            return False
+        return self._find_slot(key, prehash) >= 0
+
+    def _find_entry(self, key, prehash: int) -> Union[Tuple, None]:
+        slot = self._find_slot(key, prehash)
+        if slot < 0:
+            return None
+        index = self._indices[slot]
+        return (self._keys[index], self._values[index], prehash)
+
+    def _iter_entries(self) -> Iterator[Tuple]:
+        for entry in zip(self._keys, self._values, self._hashes):
+            if entry[0] is not None:
+                yield entry
+
+    def _bucket_lists(self) -> List[List]:
+        return []
+
+    def _length_histogram(self) -> Dict[int, int]:
+        # The number of entries per probe length, from 1 for entries
+        # in their home slot.
+        histogram: Dict[int, int] = {}
+        capacity = len(self._indices)
+        for slot, index in enumerate(self._indices):
+            if index >= 0:
+                length = (slot - self._hashes[index]) % capacity + 1
+                histogram[length] = histogram.get(length, 0) + 1
+        return dict(sorted(histogram.items()))
+
+    def _scan_tables(self) -> List[Tuple[int, Callable]]:
+        indices, keys, hashes = self._indices, self._keys, self._hashes
+        values = self._values
+        capacity = len(indices)
+
+        def home_entries(home: int) -> Iterator[Tuple]:
+            # The entries of home are spread over the probe sequence
+            # that starts there and ends at the first empty slot.
+            slot = home
+            for _ in range(capacity):
+                index = indices[slot]
+                if index == EMPTY:
+                    return
+                if index >= 0 and hashes[index] % capacity == home:
+                    yield (keys[index], values[index], hashes[index])
+                slot = slot + 1 if slot + 1 < capacity else 0
+
+        return [(capacity, home_entries)]
+
+    def _place_entry(self, entry: Tuple):
+        self._append_entry(*entry)
+        self._number_of_entries += 1
+        self._number_of_occupied_buckets += 1
+
+    def __repr__(self) -> str:
+        entries = [(key, value) for key, value, _ in self._iter_entries()]
+        return f"<{get_class_name(self)}: {entries}>"
@@ -0,0 +1,336 @@
+"""The ConcurrentHashMap class module."""
+
+from threading import Lock
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Tuple,
+    Type,
+    Union,
+)
+
+from .hashers import Hasher, mix64
+from .hashmap import HashMap, _MISSING
+from .incremental import IncrementalHashMap
+from ..tools.tools import get_class_name
+
+
+class ConcurrentHashMap:
+    """Thread-safe map that splits its keys across HashMap shards.
+
+    Every key is hashed once, with the hasher shared by all the
+    shards, and its prehash picks the shard. Each shard has its own
+    lock, so threads working on different shards do not wait for each
+    other, and every operation on a single key, compound ones included
+    (setdefault, pop, get_or_compute, merge, increment), is atomic.
+
+    With lock_free_reads, shards are treated as immutable snapshots:
+    a write copies its shard, changes the copy and publishes it with
+    a single reference assignment, while reads use whatever shard is
+    published, without taking any lock. This suits read-mostly maps,
+    since every write pays for a copy of its shard. Reads cannot skip
+    the lock on shards that are changed in place, as open addressing
+    backends move entries around (Robin Hood shifts, resizes) while
+    a reader may be probing them.
+
+    Functions passed to the compound operations run while the shard
+    is locked, and must not use the map themselves.
+    """
+
+    _DEFAULT_NUMBER_OF_SHARDS = 16
+
+    def __init__(
+        self,
+        _iter: Union[Tuple, Dict, List] = None,
+        number_of_shards: int = _DEFAULT_NUMBER_OF_SHARDS,
+        backend: Type[HashMap] = HashMap,
+        hasher: Union[str, Hasher] = None,
+        lock_free_reads: bool = False,
+    ):
+        self._set_backend(backend, lock_free_reads)
+        self._set_number_of_shards(number_of_shards)
+        first_shard = backend(hasher=hasher)
+        self._shards: List[HashMap] = [first_shard] + [
+            backend(hasher=first_shard.hasher)
+            for _ in range(number_of_shards - 1)
+        ]
+        self._locks = [Lock() for _ in range(number_of_shards)]
+        if _iter is not None:
+            self.update(_iter)
+
+    def _set_backend(self, backend: Type[HashMap], lock_free_reads: bool):
+        if not isinstance(backend, type) or not issubclass(backend, HashMap):
+            raise TypeError("Backend must be a HashMap subclass.")
+        if not isinstance(lock_free_reads, bool):
+            raise TypeError(
+                f"Inappropriate type '{get_class_name(lock_free_reads)}' "
+                "for lock free reads. Should be 'bool'."
+            )
+        # Lookups in an IncrementalHashMap move its migration forward,
+        # so its shards are never left alone by readers.
+        if lock_free_reads and issubclass(backend, IncrementalHashMap):
+            raise ValueError(
+                "Lock free reads are not supported by "
+                f"{backend.__name__} shards."
+            )
+        self._backend = backend
+        self._lock_free_reads = lock_free_reads
+
+    def _set_number_of_shards(self, number_of_shards: int):
+        if not isinstance(number_of_shards, int) or isinstance(
+            number_of_shards, bool
+        ):
+            raise TypeError(
+                f"Inappropriate type '{get_class_name(number_of_shards)}' "
+                "for number of shards. Should be 'int'."
+            )
+        if number_of_shards < 1:
+            raise ValueError("Number of shards should be >= 1.")
+        self._number_of_shards = number_of_shards
+
+    @property
+    def number_of_shards(self) -> int:
+        """The number of shards the keys are split across."""
+        return self._number_of_shards
+
+    @property
+    def lock_free_reads(self) -> bool:
+        """Whether reads go without locking, on shard snapshots."""
+        return self._lock_free_reads
+
+    @property
+    def hasher(self) -> Hasher:
+        """The hasher shared by all the shards."""
+        return self._shards[0].hasher
+
+    def _key_hash(self, key) -> int:
+        # Every shard shares the hasher and the capacity policy,
+        # so any of them computes the same prehash.
+        return self._shards[0]._key_hash(key)
+
+    def _shard_index(self, prehash: int) -> int:
+        # The shard comes from the highest bits of the mixed prehash,
+        # while each shard picks buckets from its lowest bits, so keys
+        # still spread over all the buckets of their shard.
+        return (mix64(prehash) * self._number_of_shards) >> 64
+
+    def _read(self, index: int, read: Callable[[HashMap], Any]) -> Any:
+        if self._lock_free_reads:
+            return read(self._shards[index])
+        with self._locks[index]:
+            return read(self._shards[index])
+
+    def _write(self, index: int, write: Callable[[HashMap], Any]) -> Any:
+        with self._locks[index]:
+            if not self._lock_free_reads:
+                return write(self._shards[index])
+            shard = self._shards[index].copy()
+            result = write(shard)
+            self._shards[index] = shard
+            return result
+
+    def _find_entry(self, key, prehash: int) -> Union[Tuple, None]:
+        # The most frequent operation, so it does not go through _read.
+        index = self._shard_index(prehash)
+        if self._lock_free_reads:
+            return self._shards[index]._find_entry(key, prehash)
+        with self._locks[index]:
+            return self._shards[index]._find_entry(key, prehash)
+
+    def __getitem__(self, key):
+        entry = self._find_entry(key, self._key_hash(key))
+        if entry is None:
+            raise KeyError("Mapping key not found.")
+        return entry[1]
+
+    def get(self, key, default=None):
+        """Returns the value for key if the latter exists in the map,
+        else default.
+        """
+        entry = self._find_entry(key, self._key_hash(key))
+        return default if entry is None else entry[1]
+
+    def __contains__(self, key) -> bool:
+        try:
+            prehash = self._key_hash(key)
+        except (TypeError, ValueError):
+            return False
+        return self._find_entry(key, prehash) is not None
+
+    def __setitem__(self, key, value):
+        prehash = self._key_hash(key)
+        self._write(
+            self._shard_index(prehash),
+            lambda shard: shard._set_entry(key, value, prehash),
+        )
+
+    def __delitem__(self, key):
+        self.pop(key)
+
+    def pop(self, key, default=_MISSING):
+        """Removes the specified key from the map
+        and returns the associated value.
+
+        If key does not exists in the map,
+        returns default value if one was given,
+        otherwise raises KeyError.
+        """
+        prehash = self._key_hash(key)
+
+        def pop_from(shard: HashMap):
+            entry = shard._delete_entry(key, prehash)
+            shard._manage_current_load()
+            return entry[1]
+
+        try:
+            return self._write(self._shard_index(prehash), pop_from)
+        except KeyError:
+            if default is _MISSING:
+                raise
+            return default
+
+    def _compute(self, key, compute: Callable[[bool, Any], Any]) -> Any:
+        prehash = self._key_hash(key)
+        return self._write(
+            self._shard_index(prehash),
+            lambda shard: shard._compute_entry(key, prehash, compute),
+        )
+
+    def setdefault(self, key, default=None):
+        """Atomically inserts key with the value of default if the key
+        is not in the map.
+
+        Returns the value for key.
+        """
+        return self._compute(
+            key, lambda found, value: value if found else default
+        )
+
+    def get_or_compute(self, key, factory: Callable[[], Any]):
+        """Returns the value for key, after atomically inserting key with
+        the value returned by factory if the key was not in the map.
+        """
+        return self._compute(
+            key, lambda found, value: value if found else factory()
+        )
+
+    def merge(self, key, value, fn: Callable[[Any, Any], Any]):
+        """Atomically inserts key with value if the key is not in the map,
+        otherwise sets it to fn(current value, value).
+
+        Returns the new value for key.
+        """
+        return self._compute(
+            key,
+            lambda found, current: fn(current, value) if found else value,
+        )
+
+    def increment(self, key, delta=1):
+        """Atomically adds delta to the value for key, which starts
+        from 0 if the key is not in the map.
+
+        Returns the new value for key.
+        """
+        return self._compute(
+            key, lambda found, value: value + delta if found else 0 + delta
+        )
+
+    def _group_by_shard(
+        self, keys: List
+    ) -> Tuple[Dict[int, List[int]], List[int]]:
+        # Hashes the keys and maps each shard index to the positions
+        # of its keys, so that every shard is visited once per batch.
+        prehashes = [self._key_hash(key) for key in keys]
+        groups: Dict[int, List[int]] = {}
+        for position, prehash in enumerate(prehashes):
+            index = self._shard_index(prehash)
+            groups.setdefault(index, []).append(position)
+        return groups, prehashes
+
+    def get_many(self, keys: Iterable, default: Any = None) -> List:
+        """Returns a list with the value of each of the keys, in the same
+        order, or default for the keys that are not in the map.
+
+        Each shard is visited once for the whole batch.
+        """
+        HashMap._enforce_iterable(keys)
+        keys = list(keys)
+        groups, prehashes = self._group_by_shard(keys)
+        results = [default] * len(keys)
+
+        def read_group(shard: HashMap):
+            for position in positions:
+                entry = shard._find_entry(keys[position], prehashes[position])
+                if entry is not None:
+                    results[position] = entry[1]
+
+        for index, positions in groups.items():
+            self._read(index, read_group)
+        return results
+
+    def set_many(self, pairs: Iterable):
+        """Sets all the key-value pairs of an iterable (or of a dict).
+
+        Each shard is locked once for its share of the batch, so the
+        batch is atomic per shard, but not across shards.
+        """
+        HashMap._enforce_iterable(pairs)
+        if isinstance(pairs, Dict):
+            pairs = pairs.items()
+        try:
+            pairs = [(key, value) for (key, value) in pairs]
+        except (TypeError, ValueError):
+            raise ValueError("List items should be key-value pair iterables.")
+        groups, prehashes = self._group_by_shard([key for key, _ in pairs])
+
+        def write_group(shard: HashMap):
+            shard.reserve(len(positions))
+            for position in positions:
+                key, value = pairs[position]
+                shard._set_entry(key, value, prehashes[position])
+
+        for index, positions in groups.items():
+            self._write(index, write_group)
+
+    def update(self, _iterable: Union[Tuple, Dict, List]):
+        """Updates the map from a key-value pair tuple, a list of
+        key-value pairs, a dict or an items view.
+        """
+        if isinstance(_iterable, tuple):
+            _iterable = [_iterable]
+        self.set_many(_iterable)
+
+    def snapshot(self) -> HashMap:
+        """Returns a HashMap with a copy of all the entries.
+
+        Shards are copied one at a time, so the result is consistent
+        within each shard, but not across shards.
+        """
+        snapshot = self._backend(hasher=self.hasher)
+        for index in range(self._number_of_shards):
+            entries = self._read(
+                index, lambda shard: tuple(shard._iter_entries())
+            )
+            snapshot.reserve(len(entries))
+            for entry in entries:
+                snapshot._place_entry(entry)
+        return snapshot
+
+    def __iter__(self) -> Iterator:
+        # Each shard's keys are copied while it is locked, so that
+        # iteration never runs over a shard being changed.
+        for index in range(self._number_of_shards):
+            yield from self._read(index, lambda shard: tuple(shard))
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def __repr__(self) -> str:
+        return (
+            f"<{get_class_name(self)}: {len(self)} entries in "
+            f"{self._number_of_shards} {self._backend.__name__} shards>"
+        )
@@ -0,0 +1,335 @@
+"""The ExpiringHashMap class module."""
+
+from time import monotonic
+from typing import Callable, Iterator, Union
+
+from .cache import _CacheNode, _NodeList
+from .hashers import Hasher
+from .hashmap import HashMap, _MISSING
+from ..tools.tools import get_class_name
+
+
+class _TimerNode(_CacheNode):
+    __slots__ = ("deadline",)
+
+
+class ExpiringHashMap:
+    """Map whose entries expire once their time to live has passed.
+
+    Every entry carries a deadline and sits in a slot of a hierarchical
+    timer wheel. Each level of the wheel has 64 slots, and each slot of
+    a level spans all the slots of the level below, so the wheel covers
+    64 ** 4 ticks with 256 slots. Entries far from their deadline sit in
+    the coarse levels, and move down (cascade) as their deadline nears,
+    so scheduling, cancelling and expiring an entry are O(1) amortized.
+    Deadlines beyond the range of the wheel wait in an overflow list,
+    which is checked again every time the wheel completes a turn.
+
+    Expired entries are removed lazily, when they are accessed, and by
+    sweeps of the wheel. Every write runs a sweep that removes at most
+    sweep_limit entries, and expire runs one on demand. Sweeps jump
+    over the ticks whose slots are empty, so the time a map sat idle
+    does not add to the cost of the next write. Until they are
+    removed, expired entries still count in len, but are never returned.
+
+    The clock is any callable returning the current time in seconds,
+    time.monotonic by default, and resolution is the duration of a tick.
+    Sweeps only remove entries whose tick has fully passed, so an entry
+    that is not accessed may outlive its deadline by up to a tick.
+    """
+
+    _SLOT_BITS = 6
+    _NUMBER_OF_SLOTS = 1 << _SLOT_BITS
+    _NUMBER_OF_LEVELS = 4
+    _DEFAULT_SWEEP_LIMIT = 16
+
+    def __init__(
+        self,
+        ttl: float,
+        resolution: float = 1.0,
+        clock: Callable[[], float] = monotonic,
+        sweep_limit: int = _DEFAULT_SWEEP_LIMIT,
+        hasher: Union[str, Hasher] = None,
+    ):
+        self._ttl = self._enforce_valid_duration(ttl, "ttl")
+        self._resolution = self._enforce_valid_duration(
+            resolution, "resolution"
+        )
+        self._set_clock(clock)
+        self._sweep_limit = self._enforce_valid_limit(
+            sweep_limit, "sweep limit"
+        )
+        self._map = HashMap(hasher=hasher)
+        self._create_wheel()
+        self._expired = 0
+
+    @staticmethod
+    def _enforce_valid_duration(duration: float, name: str) -> float:
+        if not isinstance(duration, (int, float)) or isinstance(
+            duration, bool
+        ):
+            raise TypeError(
+                f"Inappropriate type '{get_class_name(duration)}' "
+                f"for {name}. Should be 'float'."
+            )
+        if not duration > 0:
+            raise ValueError(f"{name.capitalize()} should be > 0.")
+        return duration
+
+    def _set_clock(self, clock: Callable[[], float]):
+        if not callable(clock):
+            raise TypeError(
+                f"Inappropriate type '{get_class_name(clock)}' "
+                "for clock. Should be a callable."
+            )
+        self._clock = clock
+
+    @staticmethod
+    def _enforce_valid_limit(limit: int, name: str) -> int:
+        if not isinstance(limit, int) or isinstance(limit, bool):
+            raise TypeError(
+                f"Inappropriate type '{get_class_name(limit)}' "
+                f"for {name}. Should be 'int'."
+            )
+        if limit < 0:
+            raise ValueError(f"{name.capitalize()} should be >= 0.")
+        return limit
+
+    def _create_wheel(self):
+        self._wheel = [
+            [_NodeList() for _ in range(self._NUMBER_OF_SLOTS)]
+            for _ in range(self._NUMBER_OF_LEVELS)
+        ]
+        self._overflow = _NodeList()
+        # Every tick before the current one has been swept.
+        self._current_tick = self._tick_of(self._clock())
+        self._cascaded_tick = None
+
+    @property
+    def ttl(self) -> float:
+        """The time to live of the entries set without one."""
+        return self._ttl
+
+    @property
+    def resolution(self) -> float:
+        """The duration of a tick of the timer wheel, in seconds."""
+        return self._resolution
+
+    @property
+    def expired(self) -> int:
+        """The number of entries removed because they expired."""
+        return self._expired
+
+    @property
+    def hasher(self) -> Hasher:
+        """The hasher used to compute the prehash of the keys."""
+        return self._map.hasher
+
+    def _tick_of(self, time: float) -> int:
+        return int(time // self._resolution)
+
+    def _schedule(self, node: _TimerNode):
+        tick = self._tick_of(node.deadline)
+        delta = tick - self._current_tick
+        if delta < self._NUMBER_OF_SLOTS:
+            # Deadlines in ticks already swept go to the next slot.
+            level, tick = 0, max(tick, self._current_tick)
+        else:
+            level = (delta.bit_length() - 1) // self._SLOT_BITS
+            if level >= self._NUMBER_OF_LEVELS:
+                # Beyond the range of the wheel: checked again once
+                # the wheel has made a whole turn.
+                self._overflow.push_front(node)
+                return
+        slot = (tick >> (level * self._SLOT_BITS)) % self._NUMBER_OF_SLOTS
+        self._wheel[level][slot].push_front(node)
+
+    def _reschedule_all(self, nodes: _NodeList):
+        # The list is detached from the wheel before it is drained, so
+        # nodes scheduled back into the same slot are not drained again.
+        while len(nodes):
+            self._schedule(nodes.pop_back())
+
+    def _cascade(self, tick: int):
+        # When a level completes a turn, the next slot of the level
+        # above is spread over the levels below.
+        for level in range(1, self._NUMBER_OF_LEVELS):
+            shift = (level - 1) * self._SLOT_BITS
+            if (tick >> shift) % self._NUMBER_OF_SLOTS:
+                return
+            slots = self._wheel[level]
+            index = (tick >> (shift + self._SLOT_BITS)) % self._NUMBER_OF_SLOTS
+            slot, slots[index] = slots[index], _NodeList()
+            self._reschedule_all(slot)
+        shift = (self._NUMBER_OF_LEVELS - 1) * self._SLOT_BITS
+        if not (tick >> shift) % self._NUMBER_OF_SLOTS:
+            overflow, self._overflow = self._overflow, _NodeList()
+            self._reschedule_all(overflow)
+
+    def _next_busy_tick(self, tick: int, target: int) -> int:
+        """Returns the first tick, from tick and before target, whose
+        slot or the slots it cascades hold entries, else target.
+        """
+        slots, bits = self._NUMBER_OF_SLOTS, self._SLOT_BITS
+        for next_tick in range(tick, min(tick + slots, target)):
+            if len(self._wheel[0][next_tick % slots]):
+                target = next_tick
+                break
+        # The slots of a level above are cascaded, in turn, whenever
+        # the ticks reach a multiple of their span.
+        for level in range(1, self._NUMBER_OF_LEVELS):
+            span = 1 << (level * bits)
+            next_tick = -(-tick // span) * span
+            while next_tick < target:
+                if len(self._wheel[level][(next_tick // span) % slots]):
+                    target = next_tick
+                    break
+                next_tick += span
+                if next_tick - tick > span * slots:
+                    break
+        if len(self._overflow):
+            span = 1 << (self._NUMBER_OF_LEVELS * bits)
+            target = min(target, -(-tick // span) * span)
+        return target
+
+    def _sweep(self, now: float, limit: Union[int, None]) -> int:
+        target = self._tick_of(now)
+        if not len(self._map):
+            self._current_tick = max(self._current_tick, target)
+            return 0
+        removed = 0
+        while self._current_tick < target:
+            # Ticks whose slots are all empty are skipped at once.
+            tick = self._next_busy_tick(self._current_tick, target)
+            self._current_tick = tick
+            if tick == target:
+                break
+            if self._cascaded_tick != tick:
+                self._cascade(tick)
+                self._cascaded_tick = tick
+            slot = self._wheel[0][tick % self._NUMBER_OF_SLOTS]
+            while len(slot):
+                if limit is not None and removed >= limit:
+                    break
+                node = slot.pop_back()
+                self._map._delete_entry(node.key, node.prehash)
+                removed += 1
+            if len(slot):
+                break
+            self._current_tick = tick + 1
+        if removed:
+            self._expired += removed
+            self._map._manage_current_load()
+        return removed
+
+    def expire(self, limit: int = None) -> int:
+        """Removes the entries whose deadline has passed, at most limit
+        of them if a limit is given.
+
+        Returns the number of entries removed.
+        """
+        if limit is not None:
+            self._enforce_valid_limit(limit, "limit")
+        return self._sweep(self._clock(), limit)
+
+    def _remove(self, node: _TimerNode):
+        node.owner.remove(node)
+        self._map._delete_entry(node.key, node.prehash)
+        self._map._manage_current_load()
+
+    def _find_node(self, key) -> Union[_TimerNode, None]:
+        entry = self._map._find_entry(key, self._map._key_hash(key))
+        if entry is None:
+            return None
+        node = entry[1]
+        if node.deadline <= self._clock():
+            self._remove(node)
+            self._expired += 1
+            return None
+        return node
+
+    def set(self, key, value, ttl: float = None):
+        """Sets key to value, for ttl seconds if a ttl is given,
+        otherwise for the ttl of the map.
+
+        Setting an existing key also renews its deadline.
+        """
+        ttl = (
+            self._ttl
+            if ttl is None
+            else self._enforce_valid_duration(ttl, "ttl")
+        )
+        prehash = self._map._key_hash(key)
+        now = self._clock()
+        self._sweep(now, self._sweep_limit)
+        entry = self._map._find_entry(key, prehash)
+        if entry is None:
+            node = _TimerNode(key, value, prehash)
+            self._map._set_entry(key, node, prehash)
+        else:
+            node = entry[1]
+            node.owner.remove(node)
+            node.value = value
+        node.deadline = now + ttl
+        self._schedule(node)
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __getitem__(self, key):
+        node = self._find_node(key)
+        if node is None:
+            raise KeyError("Mapping key not found.")
+        return node.value
+
+    def get(self, key, default=None):
+        """Returns the value for key if the latter exists in the map
+        and has not expired, else default.
+        """
+        node = self._find_node(key)
+        return default if node is None else node.value
+
+    def __contains__(self, key) -> bool:
+        try:
+            return self._find_node(key) is not None
+        except (TypeError, ValueError):
+            return False
+
+    def pop(self, key, default=_MISSING):
+        """Removes the specified key from the map
+        and returns the associated value.
+
+        If key does not exists in the map, or has expired,
+        returns default value if one was given,
+        otherwise raises KeyError.
+        """
+        node = self._find_node(key)
+        if node is None:
+            if default is _MISSING:
+                raise KeyError("Mapping key not found.")
+            return default
+        self._remove(node)
+        return node.value
+
+    def __delitem__(self, key):
+        self.pop(key)
+
+    def __iter__(self) -> Iterator:
+        now = self._clock()
+        for key, node, _ in self._map._iter_entries():
+            if node.deadline > now:
+                yield key
+
+    def __len__(self) -> int:
+        return len(self._map)
+
+    def clear(self):
+        """Removes all the entries."""
+        self._map.clear()
+        self._create_wheel()
+
+    def __repr__(self) -> str:
+        return (
+            f"<{get_class_name(self)}: {len(self)} entries, "
+            f"ttl={self._ttl}>"
+        )
@@ -0,0 +1,521 @@
+"""Probabilistic membership filters built on HashMap's hashers."""
+
+from abc import ABC, abstractmethod
+from array import array
+from math import ceil, log
+from random import Random
+from typing import Hashable, Iterable, Iterator, List, Union
+
+from .hashers import MASK_64, Hasher, _MULTIPLIER, get_hasher, mix64
+from .hashmap import HashMap
+from ..tools.tools import get_class_name, popcount
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+def _mix64_array(values: "np.ndarray") -> "np.ndarray":
+    # mix64 over an array of uint64, whose products wrap around 2**64.
+    values = values * np.uint64(_MULTIPLIER)
+    return values ^ (values >> np.uint64(32))
+
+
+class ProbabilisticFilter(ABC):
+    """Set membership test that may report keys that were never added
+    (false positives), but never misses a key that was.
+
+    Keys go through the same validation and hashers as HashMap keys,
+    and the prehash is mixed into the 64-bit hash every index of the
+    filter is derived from. Filters are sized for a capacity, the
+    number of keys they are meant to hold, and an error rate, the false
+    positive rate they are configured for at that capacity.
+
+    When NumPy is available, add_many and contains_many derive the
+    indexes of all the keys in a few vectorized passes.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        error_rate: float,
+        hasher: Union[str, Hasher],
+    ):
+        self._enforce_valid_capacity(capacity)
+        self._enforce_valid_error_rate(error_rate)
+        self._capacity = capacity
+        self._error_rate = error_rate
+        self._hasher = get_hasher(hasher)
+
+    @staticmethod
+    def _enforce_valid_capacity(capacity: int):
+        if not isinstance(capacity, int) or isinstance(capacity, bool):
+            raise TypeError(
+                f"Inappropriate type '{get_class_name(capacity)}' "
+                "for capacity. Should be 'int'."
+            )
+        if capacity < 1:
+            raise ValueError("Capacity should be >= 1.")
+
+    @staticmethod
+    def _enforce_valid_error_rate(error_rate: float):
+        if not isinstance(error_rate, float):
+            raise TypeError(
+                f"Inappropriate type '{get_class_name(error_rate)}' "
+                "for error rate. Should be 'float'."
+            )
+        if not 0.0 < error_rate < 1.0:
+            raise ValueError(
+                "Error rate value should be between 0.0 and 1.0 "
+                "(both ends excluded)."
+            )
+
+    @property
+    def capacity(self) -> int:
+        """The number of keys the filter is sized for."""
+        return self._capacity
+
+    @property
+    def error_rate(self) -> float:
+        """The false positive rate the filter is configured for, once
+        it holds capacity keys.
+        """
+        return self._error_rate
+
+    @property
+    @abstractmethod
+    def measured_error_rate(self) -> float:
+        """The false positive rate of the filter in its current state,
+        worked out from how full it actually is.
+        """
+
+    @property
+    def hasher(self) -> Hasher:
+        """The hasher used to compute the prehash of the keys."""
+        return self._hasher
+
+    def _key_hash(self, key: Hashable) -> int:
+        HashMap._enforce_valid_key(key)
+        return mix64(self._hasher.prehash(key))
+
+    def _key_hashes(self, keys: Iterable) -> List[int]:
+        HashMap._enforce_iterable(keys)
+        key_hash = self._key_hash
+        return [key_hash(key) for key in keys]
+
+    @abstractmethod
+    def add(self, key: Hashable):
+        """Adds key to the filter."""
+
+    @abstractmethod
+    def __contains__(self, key: Hashable) -> bool:
+        ...
+
+    def add_many(self, keys: Iterable):
+        """Adds all the keys of an iterable to the filter.
+
+        Every key is validated and hashed before any of them is added.
+        """
+        for key_hash in self._key_hashes(keys):
+            self._add_hash(key_hash)
+
+    def contains_many(self, keys: Iterable) -> List[bool]:
+        """Returns a list telling, for each of the keys and in the same
+        order, whether it may be in the filter.
+        """
+        contains_hash = self._contains_hash
+        return [contains_hash(h) for h in self._key_hashes(keys)]
+
+    @abstractmethod
+    def _add_hash(self, key_hash: int):
+        ...
+
+    @abstractmethod
+    def _contains_hash(self, key_hash: int) -> bool:
+        ...
+
+    def measure_error_rate(self, absent_keys: Iterable) -> float:
+        """Returns the fraction of absent_keys, keys known not to have
+        been added, that the filter reports as present.
+        """
+        results = self.contains_many(absent_keys)
+        if not results:
+            raise ValueError("At least one absent key is needed.")
+        return sum(results) / len(results)
+
+    def __repr__(self) -> str:
+        return (
+            f"<{get_class_name(self)}: {len(self)} of {self._capacity} "
+            f"keys, error rate {self._error_rate:g}>"
+        )
+
+
+class BloomFilter(ProbabilisticFilter):
+    """Bloom filter over a bytearray of bits.
+
+    Every key sets k bits, and a key may be in the filter only if all
+    of its k bits are set. The number of bits and k are the smallest
+    ones giving the configured error rate at full capacity. The k
+    indexes come from a single 64-bit hash by double hashing, as
+    h1 + i * h2, with h2 mixed from h1.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        error_rate: float = 0.01,
+        hasher: Union[str, Hasher] = None,
+    ):
+        super().__init__(capacity, error_rate, hasher)
+        self._size = max(ceil(-capacity * log(error_rate) / log(2) ** 2), 8)
+        self._number_of_hashes = max(round(self._size / capacity * log(2)), 1)
+        self._allocate(self._size)
+        self._number_of_keys = 0
+
+    def _allocate(self, size: int):
+        self._bits = bytearray((size + 7) >> 3)
+
+    @property
+    def size(self) -> int:
+        """The number of bits (or counters) of the filter."""
+        return self._size
+
+    @property
+    def number_of_hashes(self) -> int:
+        """The number of bits (or counters) each key sets."""
+        return self._number_of_hashes
+
+    def _indexes(self, key_hash: int) -> Iterator[int]:
+        step = mix64(key_hash) | 1
+        size = self._size
+        for i in range(self._number_of_hashes):
+            yield ((key_hash + i * step) & MASK_64) % size
+
+    def _indexes_array(self, key_hashes: List[int]) -> "np.ndarray":
+        first = np.array(key_hashes, dtype=np.uint64)
+        step = _mix64_array(first) | np.uint64(1)
+        i = np.arange(self._number_of_hashes, dtype=np.uint64)
+        indexes = first[:, None] + i * step[:, None]
+        return (indexes % np.uint64(self._size)).astype(np.int64)
+
+    def _filled(self) -> int:
+        return popcount(int.from_bytes(self._bits, "little"))
+
+    @property
+    def measured_error_rate(self) -> float:
+        """The false positive rate of the filter in its current state:
+        the chance that k random bits are all set.
+        """
+        return (self._filled() / self._size) ** self._number_of_hashes
+
+    def _add_hash(self, key_hash: int):
+        bits = self._bits
+        for index in self._indexes(key_hash):
+            bits[index >> 3] |= 1 << (index & 7)
+        self._number_of_keys += 1
+
+    def _contains_hash(self, key_hash: int) -> bool:
+        # Most absent keys are told apart by their first bits, so the
+        # indexes are computed one at a time.
+        bits = self._bits
+        for index in self._indexes(key_hash):
+            if not bits[index >> 3] >> (index & 7) & 1:
+                return False
+        return True
+
+    def add(self, key: Hashable):
+        """Adds key to the filter."""
+        self._add_hash(self._key_hash(key))
+
+    def __contains__(self, key: Hashable) -> bool:
+        try:
+            key_hash = self._key_hash(key)
+        except (TypeError, ValueError):
+            return False
+        return self._contains_hash(key_hash)
+
+    def add_many(self, keys: Iterable):
+        """Adds all the keys of an iterable to the filter.
+
+        Every key is validated and hashed before any of them is added.
+        """
+        if np is None:
+            return super().add_many(keys)
+        key_hashes = self._key_hashes(keys)
+        if not key_hashes:
+            return
+        indexes = self._indexes_array(key_hashes)
+        self._add_indexes_array(indexes)
+        self._number_of_keys += len(key_hashes)
+
+    def _add_indexes_array(self, indexes: "np.ndarray"):
+        bits = np.frombuffer(self._bits, dtype=np.uint8)
+        masks = np.left_shift(1, indexes & 7).astype(np.uint8)
+        np.bitwise_or.at(bits, indexes >> 3, masks)
+
+    def contains_many(self, keys: Iterable) -> List[bool]:
+        """Returns a list telling, for each of the keys and in the same
+        order, whether it may be in the filter.
+        """
+        if np is None:
+            return super().contains_many(keys)
+        key_hashes = self._key_hashes(keys)
+        if not key_hashes:
+            return []
+        indexes = self._indexes_array(key_hashes)
+        return self._contains_indexes_array(indexes).tolist()
+
+    def _contains_indexes_array(self, indexes: "np.ndarray") -> "np.ndarray":
+        bits = np.frombuffer(self._bits, dtype=np.uint8)
+        return ((bits[indexes >> 3] >> (indexes & 7)) & 1).all(axis=1)
+
+    def __len__(self) -> int:
+        return self._number_of_keys
+
+
+class CountingBloomFilter(BloomFilter):
+    """Bloom filter with a 4-bit counter instead of each bit, so that
+    keys can be removed. Counters are packed two per byte.
+
+    Counters saturate at 15, and then stay there, as their true count
+    is lost. Removing a key that was never added may remove others.
+    """
+
+    _MAXIMUM_COUNT = 15
+    # The number of non-zero counters in each possible byte.
+    _NON_ZERO_COUNTS = bytes(
+        (byte & 15 > 0) + (byte >> 4 > 0) for byte in range(256)
+    )
+
+    def _allocate(self, size: int):
+        self._counters = bytearray((size + 1) >> 1)
+
+    def _count(self, index: int) -> int:
+        return self._counters[index >> 1] >> ((index & 1) << 2) & 15
+
+    def _filled(self) -> int:
+        return sum(self._counters.translate(self._NON_ZERO_COUNTS))
+
+    def _add_hash(self, key_hash: int):
+        counters = self._counters
+        for index in self._indexes(key_hash):
+            if self._count(index) < self._MAXIMUM_COUNT:
+                counters[index >> 1] += 1 << ((index & 1) << 2)
+        self._number_of_keys += 1
+
+    def _contains_hash(self, key_hash: int) -> bool:
+        counters = self._counters
+        for index in self._indexes(key_hash):
+            if not counters[index >> 1] >> ((index & 1) << 2) & 15:
+                return False
+        return True
+
+    def remove(self, key: Hashable):
+        """Removes key from the filter.
+
+        Raises KeyError if key is not in the filter.
+        """
+        key_hash = self._key_hash(key)
+        if not self._contains_hash(key_hash):
+            raise KeyError("Filter key not found.")
+        counters = self._counters
+        for index in self._indexes(key_hash):
+            if self._count(index) < self._MAXIMUM_COUNT:
+                counters[index >> 1] -= 1 << ((index & 1) << 2)
+        self._number_of_keys -= 1
+
+    def _counts_array(self) -> "np.ndarray":
+        counters = np.frombuffer(self._counters, dtype=np.uint8)
+        counts = np.empty(2 * len(counters), dtype=np.uint8)
+        counts[0::2] = counters & 15
+        counts[1::2] = counters >> 4
+        return counts[: self._size]
+
+    def _add_indexes_array(self, indexes: "np.ndarray"):
+        increments = np.bincount(indexes.ravel(), minlength=self._size)
+        counts = np.minimum(
+            self._counts_array() + increments, self._MAXIMUM_COUNT
+        ).astype(np.uint8)
+        if self._size & 1:
+            counts = np.append(counts, np.uint8(0))
+        counters = np.frombuffer(self._counters, dtype=np.uint8)
+        counters[:] = counts[0::2] | (counts[1::2] << 4)
+
+    def _contains_indexes_array(self, indexes: "np.ndarray") -> "np.ndarray":
+        return (self._counts_array()[indexes] > 0).all(axis=1)
+
+
+class CuckooFilter(ProbabilisticFilter):
+    """Cuckoo filter: a cuckoo hash table of short key fingerprints.
+
+    Each key has two candidate buckets of four slots, the second one
+    derived from the first and the fingerprint alone, so entries can be
+    moved to their other bucket without their key. Adding a key to two
+    full buckets kicks fingerprints out to their other bucket until one
+    finds a free slot. Keys can be removed, and lookups read at most
+    two buckets. Fingerprints are long enough for the configured error
+    rate at a 95% load, and live in a bytearray.
+
+    Adding the same key more than twice may fill its buckets, and
+    adding to a filter that is too full raises RuntimeError.
+    """
+
+    _BUCKET_SIZE = 4
+    _MAXIMUM_LOAD = 0.95
+    _MAXIMUM_KICKS = 500
+
+    def __init__(
+        self,
+        capacity: int,
+        error_rate: float = 0.01,
+        hasher: Union[str, Hasher] = None,
+    ):
+        super().__init__(capacity, error_rate, hasher)
+        bucket_size = self._BUCKET_SIZE
+        self._fingerprint_bits = max(
+            ceil(log(2 * bucket_size / error_rate, 2)), 4
+        )
+        if self._fingerprint_bits > 32:
+            raise ValueError("Error rate is too low for a cuckoo filter.")
+        typecode = "H" if self._fingerprint_bits <= 16 else "I"
+        # Bucket indexes are the lowest bits of the hash, so the number
+        # of buckets is a power of two.
+        minimum_buckets = ceil(capacity / bucket_size / self._MAXIMUM_LOAD)
+        self._number_of_buckets = 1 << max(minimum_buckets - 1, 1).bit_length()
+        number_of_slots = self._number_of_buckets * bucket_size
+        self._data = bytearray(number_of_slots * array(typecode).itemsize)
+        self._slots = memoryview(self._data).cast(typecode)
+        self._number_of_keys = 0
+        # Only picks the fingerprints to kick out, so it may as well be
+        # reproducible.
+        self._random = Random(0)
+
+    @property
+    def fingerprint_bits(self) -> int:
+        """The number of bits of the key fingerprints."""
+        return self._fingerprint_bits
+
+    @property
+    def measured_error_rate(self) -> float:
+        """The false positive rate of the filter in its current state:
+        the chance that one of the fingerprints stored in two buckets
+        matches that of a random key.
+        """
+        number_of_values = (1 << self._fingerprint_bits) - 1
+        stored_per_lookup = 2 * self._number_of_keys / self._number_of_buckets
+        return 1 - (1 - 1 / number_of_values) ** stored_per_lookup
+
+    def _fingerprint(self, key_hash: int) -> int:
+        # Fingerprints are never 0, which marks an empty slot.
+        return (key_hash >> 32) % ((1 << self._fingerprint_bits) - 1) + 1
+
+    def _other_bucket(self, bucket: int, fingerprint: int) -> int:
+        return (bucket ^ mix64(fingerprint)) & (self._number_of_buckets - 1)
+
+    def _place(self, bucket: int, fingerprint: int) -> bool:
+        slots = self._slots
+        start = bucket * self._BUCKET_SIZE
+        for slot in range(start, start + self._BUCKET_SIZE):
+            if not slots[slot]:
+                slots[slot] = fingerprint
+                return True
+        return False
+
+    def _find(self, bucket: int, fingerprint: int) -> int:
+        slots = self._slots
+        start = bucket * self._BUCKET_SIZE
+        for slot in range(start, start + self._BUCKET_SIZE):
+            if slots[slot] == fingerprint:
+                return slot
+        return -1
+
+    def _add_hash(self, key_hash: int):
+        fingerprint = self._fingerprint(key_hash)
+        first = key_hash & (self._number_of_buckets - 1)
+        second = self._other_bucket(first, fingerprint)
+        if self._place(first, fingerprint) or self._place(second, fingerprint):
+            self._number_of_keys += 1
+            return
+        slots = self._slots
+        bucket = self._random.choice((first, second))
+        kicked = []
+        for _ in range(self._MAXIMUM_KICKS):
+            slot = bucket * self._BUCKET_SIZE + self._random.randrange(
+                self._BUCKET_SIZE
+            )
+            kicked.append((slot, slots[slot]))
+            fingerprint, slots[slot] = slots[slot], fingerprint
+            bucket = self._other_bucket(bucket, fingerprint)
+            if self._place(bucket, fingerprint):
+                self._number_of_keys += 1
+                return
+        # Puts the kicked fingerprints back, so that no key is lost.
+        for slot, previous in reversed(kicked):
+            slots[slot] = previous
+        raise RuntimeError("Cuckoo filter is full.")
+
+    def _contains_hash(self, key_hash: int) -> bool:
+        fingerprint = self._fingerprint(key_hash)
+        first = key_hash & (self._number_of_buckets - 1)
+        if self._find(first, fingerprint) >= 0:
+            return True
+        second = self._other_bucket(first, fingerprint)
+        return self._find(second, fingerprint) >= 0
+
+    def add(self, key: Hashable):
+        """Adds key to the filter.
+
+        Raises RuntimeError if the filter is too full to add it.
+        """
+        self._add_hash(self._key_hash(key))
+
+    def __contains__(self, key: Hashable) -> bool:
+        try:
+            key_hash = self._key_hash(key)
+        except (TypeError, ValueError):
+            return False
+        return self._contains_hash(key_hash)
+
+    def remove(self, key: Hashable):
+        """Removes key from the filter.
+
+        Raises KeyError if key is not in the filter.
+        """
+        key_hash = self._key_hash(key)
+        fingerprint = self._fingerprint(key_hash)
+        first = key_hash & (self._number_of_buckets - 1)
+        slot = self._find(first, fingerprint)
+        if slot < 0:
+            second = self._other_bucket(first, fingerprint)
+            slot = self._find(second, fingerprint)
+            if slot < 0:
+                raise KeyError("Filter key not found.")
+        self._slots[slot] = 0
+        self._number_of_keys -= 1
+
+    def contains_many(self, keys: Iterable) -> List[bool]:
+        """Returns a list telling, for each of the keys and in the same
+        order, whether it may be in the filter.
+        """
+        if np is None:
+            return super().contains_many(keys)
+        key_hashes = self._key_hashes(keys)
+        if not key_hashes:
+            return []
+        hashes = np.array(key_hashes, dtype=np.uint64)
+        number_of_values = np.uint64((1 << self._fingerprint_bits) - 1)
+        fingerprints = (hashes >> np.uint64(32)) % number_of_values + 1
+        mask = np.uint64(self._number_of_buckets - 1)
+        first = hashes & mask
+        second = (first ^ _mix64_array(fingerprints)) & mask
+        table = np.frombuffer(self._data, dtype=self._slots.format).reshape(
+            self._number_of_buckets, self._BUCKET_SIZE
+        )
+        fingerprints = fingerprints.astype(table.dtype)[:, None]
+        found = (table[first.astype(np.int64)] == fingerprints).any(axis=1)
+        found |= (table[second.astype(np.int64)] == fingerprints).any(axis=1)
+        return found.tolist()
+
+    def __len__(self) -> int:
+        return self._number_of_keys
@@ -0,0 +1,290 @@
+"""The FrozenHashMap class module."""
+
+from array import array
+from math import ceil
+from time import perf_counter
+from typing import Dict, Iterator, List, Tuple, Union
+
+from .hashers import Hasher, MASK_64, _MULTIPLIER, mix64
+from .hashmap import HashMap
+from .views import HashMapItemsView, HashMapKeysView, HashMapValuesView
+from ..tools.tools import get_class_name, popcount
+
+
+_MASK_32 = (1 << 32) - 1
+
+
+class FrozenHashMap:
+    """Immutable map over a minimal perfect hash of its keys.
+
+    Built with the BDZ method: each key becomes an edge joining three
+    vertices, one in each third of a graph with about 1.23 vertices
+    per key. Peeling the graph, by repeatedly removing an edge that is
+    the only one left on one of its vertices, gives every key a vertex
+    of its own, and a 2-bit value per vertex records which of its three
+    vertices each key owns. Ranking the owned vertices turns them into
+    slots 0 to n - 1, so a lookup costs one prehash and a single probe,
+    with no collision to resolve. Besides the keys and the values, the
+    map only stores about 4.3 bits per key.
+
+    Prehashes come from the hasher of the source HashMap, whose stored
+    prehashes are reused, so building does not hash the keys again.
+    Keys whose prehash is identical to another key's cannot be told
+    apart by the graph, and go to a small overflow HashMap.
+
+    Frozen maps are hashable when their values are, and only compare
+    with other frozen maps.
+    """
+
+    _VERTICES_PER_KEY = 1.23
+    # Small graphs need some slack over that ratio to be peelable.
+    _EXTRA_VERTICES_PER_THIRD = 4
+    _MAXIMUM_ATTEMPTS = 32
+
+    def __init__(
+        self,
+        _iter: Union[HashMap, Tuple, Dict, List] = None,
+        hasher: Union[str, Hasher] = None,
+    ):
+        start = perf_counter()
+        # The hasher is only used when the map is built from something
+        # else than a HashMap, which keeps its own.
+        source = _iter if isinstance(_iter, HashMap) else HashMap(
+            _iter, hasher=hasher
+        )
+        self._hasher = source.hasher
+        self._mixes_prehash = source._mixes_prehash
+        self._build(list(source._iter_entries()))
+        self._hash = None
+        self._build_time = perf_counter() - start
+
+    @property
+    def hasher(self) -> Hasher:
+        """The hasher used to compute the prehash of the keys."""
+        return self._hasher
+
+    @property
+    def build_time(self) -> float:
+        """The time it took to build the map, in seconds."""
+        return self._build_time
+
+    @property
+    def bits_per_key(self) -> float:
+        """The size of the perfect hash function, in bits per key."""
+        if not self._number_of_entries:
+            return 0.0
+        bits = 8 * (
+            len(self._g)
+            + len(self._used) * self._used.itemsize
+            + len(self._ranks) * self._ranks.itemsize
+        )
+        return bits / self._number_of_entries
+
+    def _key_hash(self, key) -> int:
+        HashMap._enforce_valid_key(key)
+        if self._mixes_prehash:
+            return mix64(self._hasher.prehash(key))
+        return self._hasher.prehash(key)
+
+    def _vertices(self, prehash: int) -> Tuple[int, int, int]:
+        size = self._third
+        first = mix64(prehash ^ self._seed)
+        second = mix64(first)
+        return (
+            (first & _MASK_32) % size,
+            size + (first >> 32) % size,
+            2 * size + second % size,
+        )
+
+    def _build(self, entries: List[Tuple]):
+        self._overflow = HashMap(hasher=self._hasher)
+        seen_prehashes = set()
+        table_entries = []
+        for entry in entries:
+            if entry[2] in seen_prehashes:
+                self._overflow._set_entry(*entry)
+            else:
+                seen_prehashes.add(entry[2])
+                table_entries.append(entry)
+        self._number_of_entries = len(entries)
+        self._third = (
+            ceil(len(table_entries) * self._VERTICES_PER_KEY / 3)
+            + self._EXTRA_VERTICES_PER_THIRD
+        )
+        for attempt in range(self._MAXIMUM_ATTEMPTS):
+            self._seed = mix64(attempt + 1)
+            edges = [self._vertices(entry[2]) for entry in table_entries]
+            order = self._peel(edges)
+            if len(order) == len(edges):
+                break
+        else:
+            raise RuntimeError("Could not build a perfect hash of the keys.")
+        self._assign(edges, order)
+        self._keys: List = [None] * len(table_entries)
+        self._values: List = [None] * len(table_entries)
+        for edge, vertex in order:
+            slot = self._rank(vertex)
+            self._keys[slot], self._values[slot], _ = table_entries[edge]
+
+    def _peel(self, edges: List[Tuple[int, int, int]]) -> List[Tuple]:
+        # Returns the (edge, vertex) pairs in the order they were peeled.
+        # Each vertex keeps the xor of its edges, which is the last one
+        # left once its degree is down to 1.
+        number_of_vertices = 3 * self._third
+        degrees = [0] * number_of_vertices
+        xors = [0] * number_of_vertices
+        for edge, vertices in enumerate(edges):
+            for vertex in vertices:
+                degrees[vertex] += 1
+                xors[vertex] ^= edge
+        stack = [v for v in range(number_of_vertices) if degrees[v] == 1]
+        order = []
+        while stack:
+            vertex = stack.pop()
+            if degrees[vertex] != 1:
+                continue
+            edge = xors[vertex]
+            order.append((edge, vertex))
+            for other in edges[edge]:
+                degrees[other] -= 1
+                xors[other] ^= edge
+                if degrees[other] == 1:
+                    stack.append(other)
+        return order
+
+    def _assign(self, edges: List[Tuple], order: List[Tuple]):
+        # In reverse peeling order, the other vertices of an edge are
+        # final when it is reached, so the value of its own vertex can
+        # make the sum of the three point to it.
+        number_of_vertices = 3 * self._third
+        g = bytearray(number_of_vertices)
+        used = array("Q", [0]) * ((number_of_vertices >> 6) + 1)
+        for edge, vertex in reversed(order):
+            vertices = edges[edge]
+            g[vertex] = (vertices.index(vertex) - sum(
+                g[other] for other in vertices
+            )) % 3
+            used[vertex >> 6] |= 1 << (vertex & 63)
+        # The values take 2 bits, so four of them are packed per byte.
+        self._g = bytearray((number_of_vertices + 3) >> 2)
+        for vertex, value in enumerate(g):
+            self._g[vertex >> 2] |= value << ((vertex & 3) << 1)
+        self._used = used
+        self._ranks = array("I", [0]) * len(used)
+        count = 0
+        for word_index, word in enumerate(used):
+            self._ranks[word_index] = count
+            count += popcount(word)
+
+    def _rank(self, vertex: int) -> int:
+        below = self._used[vertex >> 6] & ((1 << (vertex & 63)) - 1)
+        return self._ranks[vertex >> 6] + popcount(below)
+
+    def _find_entry(self, key, prehash: int) -> Union[Tuple, None]:
+        # Same as _vertices and _rank, with mix64 inlined, as this runs
+        # on every lookup.
+        size, g, used = self._third, self._g, self._used
+        first = ((prehash ^ self._seed) * _MULTIPLIER) & MASK_64
+        first ^= first >> 32
+        second = (first * _MULTIPLIER) & MASK_64
+        a = (first & _MASK_32) % size
+        b = size + (first >> 32) % size
+        c = 2 * size + (second ^ (second >> 32)) % size
+        choice = (
+            (g[a >> 2] >> ((a & 3) << 1) & 3)
+            + (g[b >> 2] >> ((b & 3) << 1) & 3)
+            + (g[c >> 2] >> ((c & 3) << 1) & 3)
+        )
+        vertex = (a, b, c)[choice % 3]
+        word = used[vertex >> 6]
+        bit = vertex & 63
+        if (word >> bit) & 1:
+            slot = self._ranks[vertex >> 6] + popcount(
+                word & ((1 << bit) - 1)
+            )
+            stored_key = self._keys[slot]
+            if stored_key is key or stored_key == key:
+                return (stored_key, self._values[slot], prehash)
+        if len(self._overflow):
+            return self._overflow._find_entry(key, prehash)
+        return None
+
+    def _iter_entries(self) -> Iterator[Tuple]:
+        for key, value in zip(self._keys, self._values):
+            yield (key, value, None)
+        yield from self._overflow._iter_entries()
+
+    def __getitem__(self, key):
+        entry = self._find_entry(key, self._key_hash(key))
+        if entry is None:
+            raise KeyError("Mapping key not found.")
+        return entry[1]
+
+    def get(self, key, default=None):
+        """Returns the value for key if the latter exists in the map,
+        else default.
+        """
+        entry = self._find_entry(key, self._key_hash(key))
+        return default if entry is None else entry[1]
+
+    def __contains__(self, key) -> bool:
+        try:
+            prehash = self._key_hash(key)
+        except (TypeError, ValueError):
+            return False
+        return self._find_entry(key, prehash) is not None
+
+    def keys(self) -> HashMapKeysView:
+        """Returns a set-like view of the keys of the map."""
+        return HashMapKeysView(self)
+
+    def values(self) -> HashMapValuesView:
+        """Returns a view of the values of the map."""
+        return HashMapValuesView(self)
+
+    def items(self) -> HashMapItemsView:
+        """Returns a set-like view of the (key, value) pairs of the map."""
+        return HashMapItemsView(self)
+
+    def thaw(self) -> HashMap:
+        """Returns a mutable HashMap with the entries of the map."""
+        hm = HashMap(hasher=self._hasher)
+        hm.set_many(self.items())
+        return hm
+
+    def copy(self) -> "FrozenHashMap":
+        """Returns the map itself, as it cannot change."""
+        return self
+
+    def __iter__(self) -> Iterator:
+        for entry in self._iter_entries():
+            yield entry[0]
+
+    def __len__(self) -> int:
+        return self._number_of_entries
+
+    def __eq__(self, other: "FrozenHashMap") -> bool:
+        if not isinstance(other, FrozenHashMap):
+            raise TypeError(
+                "Cannot compare FrozenHashMap with object of another type "
+                f"({get_class_name(other)})."
+            )
+        return self.items() == other.items()
+
+    def __ne__(self, other: "FrozenHashMap") -> bool:
+        return not self == other
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(frozenset(self.items()))
+        return self._hash
+
+    def __repr__(self) -> str:
+        return (
+            f"<{get_class_name(self)}: {self._number_of_entries} entries, "
+            f"{self.bits_per_key:.1f} bits per key>"
+        )
+
+    def __str__(self) -> str:
+        pairs = (f"{key!r}: {value!r}" for key, value in self.items())
+        return f"{{{', '.join(pairs)}}}"
@@ -0,0 +1,149 @@
+"""Hashing strategies used by HashMap to turn keys into prehashes."""
+
+from abc import ABC, abstractmethod
+from hashlib import blake2b, sha256
+from secrets import randbits, token_urlsafe
+from typing import Dict, Hashable, Type, Union
+
+from ..tools.tools import get_class_name
+
+
+MASK_64 = (1 << 64) - 1
+# Odd 64-bit multiplier (2**64 divided by the golden ratio),
+# used to spread the bits of Python's hash values.
+_MULTIPLIER = 0x9E3779B97F4A7C15
+
+
+def mix64(value: int) -> int:
+    """Scrambles the bits of value into a 64-bit unsigned int."""
+    value = (value * _MULTIPLIER) & MASK_64
+    return value ^ (value >> 32)
+
+
+class Hasher(ABC):
+    """Strategy that computes the prehash of HashMap keys.
+
+    A hasher instance must always return the same prehash for the
+    same key, and equal keys must have equal prehashes.
+    """
+
+    mode: str
+
+    @abstractmethod
+    def prehash(self, key: Hashable) -> int:
+        ...
+
+    def __repr__(self) -> str:
+        return f"{get_class_name(self)}()"
+
+
+class SaltedSHA256Hasher(Hasher):
+    """Salts Python's hash with the SHA-256 digest of the key and
+    a per-instance random secret.
+
+    The slowest mode, meant for maps fed with untrusted keys.
+    """
+
+    mode = "sha256"
+
+    def __init__(self):
+        self._ss = token_urlsafe(16)
+        # The secret never changes, so its hash is only computed once.
+        self._ss_hash = hash(self._ss)
+
+    def _salt(self, key) -> int:
+        encoded_key = key.encode() if isinstance(key, str) else bytes(key)
+        hash_key_sum = sum(sha256(encoded_key, usedforsecurity=True).digest())
+        return hash_key_sum + self._ss_hash
+
+    def prehash(self, key: Hashable) -> int:
+        return abs(hash(key) + self._salt(key))
+
+
+class KeyedHasher(Hasher):
+    """Mixes Python's hash with a per-instance random seed.
+
+    Much cheaper than the SHA-256 mode while still making bucket
+    placement unpredictable across instances.
+    """
+
+    mode = "keyed"
+
+    def __init__(self, seed: int = None):
+        self._seed = randbits(64) if seed is None else seed & MASK_64
+
+    @property
+    def seed(self) -> int:
+        """The seed mixed into the prehashes."""
+        return self._seed
+
+    def prehash(self, key: Hashable) -> int:
+        return mix64(hash(key) ^ self._seed)
+
+    def __repr__(self) -> str:
+        return f"{get_class_name(self)}(seed={self._seed})"
+
+
+class DeterministicHasher(Hasher):
+    """Produces the same prehashes on every run for a given seed.
+
+    Python randomizes the hash of str and bytes objects per process,
+    so those are hashed with a keyed BLAKE2b digest instead. Numeric
+    hashes are already stable, so they are only mixed with the seed.
+    Other key types keep whatever stability their __hash__ provides.
+    """
+
+    mode = "deterministic"
+
+    def __init__(self, seed: int = 0):
+        self._seed = seed & MASK_64
+        self._digest_key = self._seed.to_bytes(8, "little")
+
+    @property
+    def seed(self) -> int:
+        """The seed mixed into the prehashes."""
+        return self._seed
+
+    def _digest(self, data: bytes) -> int:
+        digest = blake2b(data, digest_size=8, key=self._digest_key).digest()
+        return int.from_bytes(digest, "little")
+
+    def prehash(self, key: Hashable) -> int:
+        if isinstance(key, str):
+            return self._digest(key.encode("utf-8", "surrogatepass"))
+        if isinstance(key, (bytes, bytearray, memoryview)):
+            return self._digest(bytes(key))
+        return mix64(hash(key) ^ self._seed)
+
+    def __repr__(self) -> str:
+        return f"{get_class_name(self)}(seed={self._seed})"
+
+
+HASHERS: Dict[str, Type[Hasher]] = {
+    hasher.mode: hasher
+    for hasher in (SaltedSHA256Hasher, KeyedHasher, DeterministicHasher)
+}
+DEFAULT_HASHER_MODE = SaltedSHA256Hasher.mode
+
+
+def get_hasher(hasher: Union[str, Hasher, None] = None) -> Hasher:
+    """Returns a hasher instance for the given mode name.
+
+    Hasher instances are returned as they are. If hasher is None,
+    a hasher of the default mode is created.
+    """
+    if hasher is None:
+        hasher = DEFAULT_HASHER_MODE
+    if isinstance(hasher, Hasher):
+        return hasher
+    if not isinstance(hasher, str):
+        raise TypeError(
+            f"Inappropriate type '{get_class_name(hasher)}' "
+            "for hasher. Should be 'str' or 'Hasher'."
+        )
+    if hasher not in HASHERS:
+        raise ValueError(
+            f"Unknown hasher mode '{hasher}'. "
+            f"Available modes: {', '.join(HASHERS)}."
+        )
+    return HASHERS[hasher]()
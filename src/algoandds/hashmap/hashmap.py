@@ -1,19 +1,86 @@
-from typing import Any, Callable, Hashable, Union, Iterable, Tuple, Dict, List
-from hashlib import sha256
-from secrets import token_urlsafe
+from collections.abc import ItemsView
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Hashable,
+    Union,
+    Iterable,
+    Iterator,
+    Tuple,
+    Dict,
+    List,
+)
 
+from .hashers import MASK_64, Hasher, get_hasher, mix64
+from .mapped import MappedHashMap
+from .shared import SharedHashMap
+from .treebucket import TreeBucket
+from .views import HashMapItemsView, HashMapKeysView, HashMapValuesView
 from ..linkedlist import LinkedList
 from ..tools.tools import get_class_name
 
+if TYPE_CHECKING:
+    from .stats import _StatsCounters
+
+
+EVEN_CAPACITY = "even"
+POWER_OF_TWO_CAPACITY = "pow2"
+CAPACITY_POLICIES = (EVEN_CAPACITY, POWER_OF_TWO_CAPACITY)
+# Default value of the arguments for which None is a valid value.
+_MISSING = object()
+
+
+def _reverse_bits(value: int) -> int:
+    return int(f"{value:064b}"[::-1], 2)
+
+
+def _next_cursor(cursor: int, mask: int) -> int:
+    # Increments the bits of cursor selected by mask starting from the
+    # highest one, so that doubling the number of buckets splits every
+    # bucket into two that come one right after the other, and halving
+    # it merges them back.
+    cursor = _reverse_bits(cursor | (~mask & MASK_64)) + 1
+    return _reverse_bits(cursor & MASK_64)
+
 
 class HashMap:
     _MINIMUM_MAP_SIZE = 10
+    _MINIMUM_POWER_OF_TWO_MAP_SIZE = 16
     _DEFAULT_LOAD_FACTOR = 0.75
+    _MAXIMUM_SHRINK_LOAD_FACTOR = 0.25
+    # Whether a power of two capacity can be doubled by splitting
+    # the chained buckets in place.
+    _HAS_SPLITTABLE_BUCKETS = True
+    # Chains longer than the treeify threshold become TreeBuckets, and
+    # go back to linked lists once they get down to the untreeify one.
+    # The gap between both keeps a bucket from converting back and
+    # forth when a key is added and removed over and over.
+    _TREEIFY_THRESHOLD = 8
+    _UNTREEIFY_THRESHOLD = 6
+    # Like Redis, a scan call visits at most this many buckets per
+    # requested pair, so that it returns quickly on a sparse hashmap.
+    _SCAN_VISITS_PER_ITEM = 10
+    # Operation counters, only kept while stats are enabled.
+    _stats_counters: Union["_StatsCounters", None] = None
+    # Entries removed so far, never reset: along with the number of
+    # entries, it tells _compute_entry whether compute changed the map.
+    _number_of_deletions = 0
 
     def __init__(
-        self, _iter: Union[Tuple, Dict, List] = None, load_factor: float = 0.75
+        self,
+        _iter: Union[Tuple, Dict, List] = None,
+        load_factor: float = 0.75,
+        hasher: Union[str, Hasher] = None,
+        capacity_policy: str = EVEN_CAPACITY,
+        shrink_load_factor: float = None,
+        auto_shrink: bool = True,
     ):
         self._set_load_factor(load_factor)
+        self._set_shrink_load_factor(shrink_load_factor)
+        self._set_auto_shrink(auto_shrink)
+        self._set_hasher(hasher)
+        self._set_capacity_policy(capacity_policy)
         if _iter is None:
             self._set_initial_map_size()
             self._create_new_list()
@@ -26,7 +93,7 @@ class HashMap:
 
     @property
     def _size(self) -> int:
-        return sum([1 for item in self._list if item is not None])
+        return self._number_of_occupied_buckets
 
     @property
     def _capacity(self) -> int:
@@ -67,6 +134,39 @@ class HashMap:
         self._enforce_valid_load_factor(load_factor)
         self._load_factor = load_factor
 
+    def _enforce_valid_shrink_load_factor(self, shrink_load_factor: float):
+        if not isinstance(shrink_load_factor, float):
+            raise TypeError(
+                f"Inappropriate type '{get_class_name(shrink_load_factor)}' "
+                "for shrink load factor. Should be 'float'."
+            )
+        MSLF = self._MAXIMUM_SHRINK_LOAD_FACTOR
+        if shrink_load_factor < 0.0 or shrink_load_factor > MSLF:
+            raise ValueError(
+                f"Shrink load factor value should be between 0.0 and {MSLF} "
+                "(both ends included)."
+            )
+
+    def _set_shrink_load_factor(self, shrink_load_factor: float = None):
+        # The map grows when its load reaches the load factor and
+        # shrinks when it falls below the shrink load factor. Both
+        # resizes leave the load at about 0.5, well inside the dead
+        # band between the two thresholds, so that a few inserts and
+        # deletes around a threshold cannot resize the map back and
+        # forth.
+        if shrink_load_factor is None:
+            shrink_load_factor = round(1 - self._load_factor, 2)
+        self._enforce_valid_shrink_load_factor(shrink_load_factor)
+        self._shrink_load_factor = shrink_load_factor
+
+    def _set_auto_shrink(self, auto_shrink: bool):
+        if not isinstance(auto_shrink, bool):
+            raise TypeError(
+                f"Inappropriate type '{get_class_name(auto_shrink)}' "
+                "for auto shrink. Should be 'bool'."
+            )
+        self._auto_shrink = auto_shrink
+
     @staticmethod
     def _enforce_valid_number_of_new_items(n: int):
         if not isinstance(n, int) or isinstance(n, bool):
@@ -77,9 +177,35 @@ class HashMap:
         if n < 0:
             raise ValueError("Number of new items should be >= 0.")
 
+    @staticmethod
+    def _enforce_valid_capacity_policy(capacity_policy: str):
+        if not isinstance(capacity_policy, str):
+            raise TypeError(
+                f"Inappropriate type '{get_class_name(capacity_policy)}' "
+                "for capacity policy. Should be 'str'."
+            )
+        if capacity_policy not in CAPACITY_POLICIES:
+            raise ValueError(
+                "Capacity policy should be one of: "
+                f"{', '.join(CAPACITY_POLICIES)}."
+            )
+
+    def _set_capacity_policy(self, capacity_policy: str):
+        # With power of two capacities, the bucket index is made of the
+        # lowest bits of the prehash, so prehashes are mixed first, to
+        # keep low entropy keys (e.g. multiples of 1024) spread out.
+        self._enforce_valid_capacity_policy(capacity_policy)
+        self._capacity_policy = capacity_policy
+        self._mixes_prehash = capacity_policy == POWER_OF_TWO_CAPACITY
+
     def _get_size_with_load_margin(self, n: int) -> int:
         self._enforce_valid_load_factor(self._load_factor)
         self._enforce_valid_number_of_new_items(n)
+        if self._capacity_policy == POWER_OF_TWO_CAPACITY:
+            return max(
+                1 << (n * 2 - 1).bit_length(),
+                self._MINIMUM_POWER_OF_TWO_MAP_SIZE,
+            )
         return n * 2
 
     def _enforce_valid_map_size(self, map_size: int):
@@ -93,13 +219,10 @@ class HashMap:
 
     def _set_initial_map_size(self, number_of_new_items: int = None):
         if number_of_new_items is None:
-            self._INITIAL_MAP_SIZE = self._MINIMUM_MAP_SIZE
-        else:
-            n = self._get_size_with_load_margin(number_of_new_items)
-            map_size = (
-                n if n > self._MINIMUM_MAP_SIZE else self._MINIMUM_MAP_SIZE
-            )
-            self._INITIAL_MAP_SIZE = map_size
+            number_of_new_items = 0
+        n = self._get_size_with_load_margin(number_of_new_items)
+        map_size = n if n > self._MINIMUM_MAP_SIZE else self._MINIMUM_MAP_SIZE
+        self._INITIAL_MAP_SIZE = map_size
 
     def _create_new_list(self, map_size: int = None):
         if map_size is not None:
@@ -107,9 +230,21 @@ class HashMap:
             n = map_size
         else:
             n = self._INITIAL_MAP_SIZE
-        self._list = [None for _ in range(n)]
-        self._set_hash_ceiling(n)
-        self._generate_salt_secret()
+        self._allocate_buckets(n)
+        self._reset_counters()
+        # Backends may round the requested size up to fit their layout.
+        self._set_hash_ceiling(self._capacity)
+
+    def _allocate_buckets(self, map_size: int):
+        self._list = [None] * map_size
+
+    def _reset_counters(self):
+        # Live counters kept up to date by every mutation,
+        # so that size and load queries never scan the buckets.
+        self._number_of_entries = 0
+        self._number_of_occupied_buckets = 0
+        self._number_of_chained_entries = 0
+        self._number_of_treeified_buckets = 0
 
     def _initialize_new_list(
         self,
@@ -128,15 +263,57 @@ class HashMap:
         return size_with_margin if size_with_margin > MMS else MMS
 
     def _resize_list(self, number_of_new_items: int):
-        new_map_size = self._calculate_new_map_size(number_of_new_items)
-        current_items = self.items() if self.items() else None
-        self._initialize_new_list(current_items, new_map_size)
+        self._resize_to(self._calculate_new_map_size(number_of_new_items))
+
+    def _resize_to(self, new_map_size: int):
+        if self._can_split_buckets(new_map_size):
+            while self._capacity < new_map_size:
+                self._split_buckets()
+            return
+        current_entries = tuple(self._iter_entries())
+        self._create_new_list(new_map_size)
+        for entry in current_entries:
+            self._place_entry(entry)
+
+    def _can_split_buckets(self, new_map_size: int) -> bool:
+        return (
+            self._HAS_SPLITTABLE_BUCKETS
+            and self._capacity_policy == POWER_OF_TWO_CAPACITY
+            and new_map_size > self._capacity
+        )
+
+    def _split_buckets(self):
+        # Doubles a power of two capacity in place. The entries of
+        # bucket i either stay there or move to bucket i + old capacity,
+        # depending on a single bit of their stored prehash.
+        old_capacity = self._capacity
+        buckets = self._list
+        buckets.extend([None] * old_capacity)
+        self._set_hash_ceiling(self._capacity)
+        for hash_code in range(old_capacity):
+            bucket = buckets[hash_code]
+            if bucket is None:
+                continue
+            if isinstance(bucket, tuple):
+                if bucket[2] & old_capacity:
+                    buckets[hash_code + old_capacity] = bucket
+                    buckets[hash_code] = None
+                continue
+            entries = self._iter_bucket(bucket)
+            if not any(entry[2] & old_capacity for entry in entries):
+                continue
+            entries = self._take_bucket(buckets, hash_code)
+            for entry in entries:
+                new_hash_code = hash_code + (entry[2] & old_capacity)
+                self._place_in_bucket(buckets, new_hash_code, entry)
 
     def _is_load_high(self, load: int) -> bool:
         return load >= self._load_factor
 
     def _is_load_low(self, load: int) -> bool:
-        load_is_low = load < 1 - self._load_factor
+        if not self._auto_shrink:
+            return False
+        load_is_low = load < self._shrink_load_factor
         map_is_not_on_initial_state = self._capacity != self._INITIAL_MAP_SIZE
         return load_is_low and map_is_not_on_initial_state
 
@@ -146,6 +323,28 @@ class HashMap:
         new_load = new_size / self._capacity
         return self._is_load_high(new_load) or self._is_load_low(new_load)
 
+    def reserve(self, number_of_new_items: int):
+        """Grows the hashmap, if needed, so that number_of_new_items
+        new keys can be added without resizing it.
+        """
+        n = number_of_new_items
+        self._enforce_valid_number_of_new_items(n)
+        new_load = (len(self) + n) / self._capacity
+        if self._is_load_high(new_load):
+            new_map_size = self._get_size_with_load_margin(len(self) + n)
+            self._resize_to(max(new_map_size, self._MINIMUM_MAP_SIZE))
+
+    def shrink_to_fit(self):
+        """Shrinks the hashmap to the smallest capacity that holds
+        its current entries with the usual load margin.
+        """
+        new_map_size = max(
+            self._get_size_with_load_margin(len(self)),
+            self._MINIMUM_MAP_SIZE,
+        )
+        if new_map_size < self._capacity:
+            self._resize_to(new_map_size)
+
     def _manage_current_load(self, number_of_new_items: int = 0):
         n = number_of_new_items
         self._enforce_valid_number_of_new_items(n)
@@ -162,9 +361,7 @@ class HashMap:
                 "Requested update from tuple with non-tuple type object."
             )
         if self._is_valid_tuple(t):
-            self._manage_current_load(number_of_new_items=1)
-            key, value = t
-            self[key] = value
+            self.set_many((t,))
         else:
             raise ValueError("Tuple should have a length of 2.")
 
@@ -173,36 +370,21 @@ class HashMap:
             raise TypeError(
                 "Requested update from dict with non-dict type object."
             )
-        self._manage_current_load(number_of_new_items=len(d))
-        for key in d:
-            self[key] = d[key]
-
-    @staticmethod
-    def _is_valid_list(_list: List) -> bool:
-        try:
-            [(key, value) for (key, value) in _list]
-            return True
-        except (TypeError, ValueError):
-            return False
+        self.set_many(d.items())
 
     def _add_from_list(self, _list: List):
         if not isinstance(_list, List):
             raise TypeError(
                 "Requested update from list with non-list type object."
             )
-        if self._is_valid_list(_list):
-            self._manage_current_load(number_of_new_items=len(_list))
-            for (key, value) in _list:
-                self[key] = value
-        else:
-            raise ValueError("List items should be key-value pair iterables.")
+        self.set_many(_list)
 
     def update(self, _iterable: Union[Tuple, Dict, List]):
         """Updates hashmap from dict/iterable.
 
         Item should be a tuple with a key-value pair,
-        a list of tuples with key-value pairs
-        or a dict.
+        a list of tuples with key-value pairs, a dict
+        or an items view (e.g. the items of another hashmap).
         """
         if not isinstance(_iterable, Iterable):
             raise TypeError(
@@ -216,12 +398,91 @@ class HashMap:
             self._add_from_dict(_iterable)
         elif isinstance(_iterable, List):
             self._add_from_list(_iterable)
+        elif isinstance(_iterable, ItemsView):
+            self.set_many(_iterable)
         else:
             raise TypeError(
                 f"Iterables of type {get_class_name(_iterable)} "
                 "are not supported."
             )
 
+    def _compute_entry(
+        self, key, prehash: int, compute: Callable[[bool, Any], Any]
+    ) -> Any:
+        # Sets key to compute(found, current value) and returns the new
+        # value. The key is hashed once, by the caller, and its bucket
+        # is searched once: the value is written where the entry was
+        # found, or a new entry is added to the bucket. compute is
+        # called before anything is written, and if it changed the map,
+        # the key is looked up again.
+        buckets, hash_code = self._locate(prehash)
+        bucket = buckets[hash_code]
+        entry, position = self._find_in_bucket_at(bucket, key, prehash)
+        number_of_entries, capacity = self._number_of_entries, self._capacity
+        number_of_deletions = self._number_of_deletions
+        if entry is None:
+            value = compute(False, None)
+        else:
+            value = compute(True, entry[1])
+        if (
+            buckets[hash_code] is not bucket
+            or self._number_of_entries != number_of_entries
+            or self._number_of_deletions != number_of_deletions
+            or self._capacity != capacity
+        ):
+            self._set_entry(key, value, prehash)
+        elif entry is None:
+            self._add_to_bucket(buckets, hash_code, (key, value, prehash))
+        elif value is not entry[1]:
+            self._set_value_at(buckets, hash_code, position, entry, value)
+        return value
+
+    def _compute_in_slot(
+        self, key, prehash: int, compute: Callable[[bool, Any], Any]
+    ) -> Any:
+        # _compute_entry of the open addressing backends, which find
+        # the slot of a key with _find_slot and read and write it with
+        # the slot hooks below.
+        slot = self._find_slot(key, prehash)
+        number_of_entries, capacity = self._number_of_entries, self._capacity
+        number_of_deletions = self._number_of_deletions
+        stored_key = None
+        if slot >= 0:
+            stored_key = self._key_at_slot(slot)
+            value = compute(True, self._value_at_slot(slot))
+        else:
+            value = compute(False, None)
+        if (
+            self._number_of_entries != number_of_entries
+            or self._number_of_deletions != number_of_deletions
+            or self._capacity != capacity
+            or (slot >= 0 and self._key_at_slot(slot) is not stored_key)
+        ):
+            self._set_entry(key, value, prehash)
+        elif slot >= 0:
+            self._set_value_at_slot(slot, value)
+        else:
+            self._add_entry(key, value, prehash)
+        return value
+
+    def _find_slot(self, key, prehash: int) -> int:
+        """Returns the slot holding key, or -1 if key is not found.
+        Open addressing backends only.
+        """
+        raise NotImplementedError("Only open addressing maps have slots.")
+
+    def _key_at_slot(self, slot: int):
+        raise NotImplementedError("Only open addressing maps have slots.")
+
+    def _value_at_slot(self, slot: int):
+        raise NotImplementedError("Only open addressing maps have slots.")
+
+    def _set_value_at_slot(self, slot: int, value):
+        raise NotImplementedError("Only open addressing maps have slots.")
+
+    def _add_entry(self, key, value, prehash: int):
+        raise NotImplementedError("Only open addressing maps have slots.")
+
     def setdefault(self, key, default=None):
         """Insert key with the value of default if
         the key is not in the hashmap.
@@ -229,23 +490,61 @@ class HashMap:
         Returns the value for key if the latter exists
         in the hashmap.
         """
-        if key not in self.keys():
-            self.update((key, default))
-            return default
-        else:
-            return self[key]
+        return self._compute_entry(
+            key,
+            self._key_hash(key),
+            lambda found, value: value if found else default,
+        )
 
-    def items(self) -> Dict:
-        """Returns a dictionary with all the key-value pairs of the hashmap."""
-        return {key: self[key] for key in self}
+    def get_or_compute(self, key, factory: Callable[[], Any]):
+        """Returns the value for key if the latter exists in the hashmap.
 
-    def keys(self) -> Tuple:
-        """Returns a tuple with all the keys of the hashmap."""
-        return tuple((key for key in self))
+        Otherwise, calls factory with no arguments, inserts key with
+        the value it returns and returns that value.
+        """
+        return self._compute_entry(
+            key,
+            self._key_hash(key),
+            lambda found, value: value if found else factory(),
+        )
 
-    def values(self) -> Tuple:
-        """Returns a tuple with all the values of the hashmap."""
-        return tuple((self[key] for key in self))
+    def merge(self, key, value, fn: Callable[[Any, Any], Any]):
+        """Inserts key with value if the key is not in the hashmap,
+        otherwise sets it to fn(current value, value).
+
+        Returns the new value for key.
+        """
+        return self._compute_entry(
+            key,
+            self._key_hash(key),
+            lambda found, current: fn(current, value) if found else value,
+        )
+
+    def increment(self, key, delta=1):
+        """Adds delta to the value for key, which starts from 0 if the
+        key is not in the hashmap.
+
+        Returns the new value for key.
+        """
+        return self._compute_entry(
+            key,
+            self._key_hash(key),
+            lambda found, value: value + delta if found else 0 + delta,
+        )
+
+    def items(self) -> HashMapItemsView:
+        """Returns a live, set-like view of the key-value pairs
+        of the hashmap.
+        """
+        return HashMapItemsView(self)
+
+    def keys(self) -> HashMapKeysView:
+        """Returns a live, set-like view of the keys of the hashmap."""
+        return HashMapKeysView(self)
+
+    def values(self) -> HashMapValuesView:
+        """Returns a live view of the values of the hashmap."""
+        return HashMapValuesView(self)
 
     def get(self, key, default=None):
         """Returns the value for key if the latter exists in the hashmap,
@@ -256,7 +555,7 @@ class HashMap:
         except KeyError:
             return default
 
-    def pop(self, key, default=None):
+    def pop(self, key, default=_MISSING):
         """Removes the specified key from the hashmap
         and returns the associated value.
 
@@ -264,37 +563,170 @@ class HashMap:
         returns default value if one was given,
         otherwise raises KeyError.
         """
-        item_to_pop = self.get(key)
-        if item_to_pop is not None:
-            del self[key]
-            return item_to_pop
-        else:
-            if default is not None:
-                return default
-            else:
-                raise KeyError("Mapping key not found.")
+        try:
+            entry = self._delete_entry(key, self._key_hash(key))
+        except KeyError:
+            if default is _MISSING:
+                raise
+            return default
+        self._manage_current_load()
+        return entry[1]
 
     def clear(self):
         """Removes all items from the hashmap."""
-        del self._list
+        self._number_of_deletions += len(self)
         self._create_new_list()
 
+    def dump(self, path: str):
+        """Writes the hashmap to a file at path, which MappedHashMap
+        serves lookups from without loading it.
+        """
+        MappedHashMap.write(path, self)
+
+    def share(self, name: str = None) -> SharedHashMap:
+        """Publishes the hashmap into a shared memory block, named name
+        if a name is given, that other processes attach to by name.
+        """
+        return SharedHashMap.publish(self, name)
+
+    def freeze(self):
+        """Returns an immutable FrozenHashMap with the entries of the
+        hashmap, looked up through a minimal perfect hash.
+        """
+        # Imported here, as the frozen module builds on this one.
+        from .frozen import FrozenHashMap
+
+        return FrozenHashMap(self)
+
     def copy(self) -> "HashMap":
-        """Returns a shallow copy of the hashmap."""
-        return HashMap(self.items())
+        """Returns a shallow copy of the hashmap.
+
+        The copy shares the hasher of the original hashmap.
+        """
+        new_map = type(self)(
+            None,
+            self._load_factor,
+            self._hasher,
+            self._capacity_policy,
+            self._shrink_load_factor,
+            self._auto_shrink,
+        )
+        # Entries are copied with their stored prehash, so no key
+        # is hashed again.
+        new_map._set_initial_map_size(len(self))
+        new_map._create_new_list()
+        for entry in self._iter_entries():
+            new_map._place_entry(entry)
+        return new_map
 
-    def _generate_salt_secret(self):
-        self._ss = token_urlsafe(16)
+    @property
+    def capacity_policy(self) -> str:
+        """How capacities are sized: 'even' or 'pow2'."""
+        return self._capacity_policy
 
-    def _salt(self, key) -> int:
-        encoded_key = key.encode() if isinstance(key, str) else bytes(key)
-        hash_key_sum = sum(sha256(encoded_key, usedforsecurity=True).digest())
-        return hash_key_sum + hash(self._ss)
+    @property
+    def auto_shrink(self) -> bool:
+        """Whether the hashmap shrinks by itself when its load is low."""
+        return self._auto_shrink
 
-    def _prehash(self, key):
-        return abs(hash(key) + self._salt(key))
+    @property
+    def hasher(self) -> Hasher:
+        """The hasher used to compute the prehash of the keys."""
+        return self._hasher
 
-    def _hash(self, key) -> int:
+    @property
+    def treeified_buckets(self) -> int:
+        """The number of buckets whose chain is currently kept
+        as a tree, because too many keys collided there.
+        """
+        return self._number_of_treeified_buckets
+
+    @property
+    def stats_enabled(self) -> bool:
+        """Whether the hashmap counts its operations, resizes and
+        hasher calls.
+        """
+        return hasattr(type(self), "_UNCOUNTED_CLASS")
+
+    def enable_stats(self):
+        """Starts counting the operations, resizes and hasher calls of
+        the hashmap, from zero, for stats to report.
+
+        The hashmap switches to a counting version of its class, so
+        that hashmaps whose stats are disabled pay nothing for them.
+        """
+        # Imported here, as the stats module builds on this one.
+        from .stats import _StatsCounters, counting_class
+
+        if not self.stats_enabled:
+            self.__class__ = counting_class(type(self))
+        self._stats_counters = _StatsCounters()
+
+    def disable_stats(self):
+        """Stops counting. stats keeps reporting the counts so far."""
+        if self.stats_enabled:
+            self.__class__ = type(self)._UNCOUNTED_CLASS
+
+    def _bucket_lists(self) -> List[List]:
+        return [self._list]
+
+    def _length_histogram(self) -> Dict[int, int]:
+        # The number of buckets per chain length, 0 for empty buckets.
+        histogram: Dict[int, int] = {}
+        for buckets in self._bucket_lists():
+            for bucket in buckets:
+                if bucket is None:
+                    length = 0
+                elif isinstance(bucket, tuple):
+                    length = 1
+                else:
+                    length = len(bucket)
+                histogram[length] = histogram.get(length, 0) + 1
+        return dict(sorted(histogram.items()))
+
+    def stats(self):
+        """Returns a HashMapStats report on the layout of the hashmap
+        and, if stats were ever enabled, on its operations.
+
+        length_histogram maps chain lengths to their number of buckets,
+        or, for open addressing backends, probe lengths to their number
+        of entries. load is the one the resizes go by. The resizes,
+        hash_calls, gets, sets, deletes and misses counts, and the
+        resize_time and hash_time in seconds, are None until stats are
+        enabled, and stop changing once they are disabled.
+        """
+        # Imported here, as the stats module builds on this one.
+        from .stats import HashMapStats, _StatsCounters
+
+        counters = self._stats_counters
+        linked_list_buckets = sum(
+            isinstance(bucket, LinkedList)
+            for buckets in self._bucket_lists()
+            for bucket in buckets
+        )
+        return HashMapStats(
+            capacity=self._capacity,
+            entries=len(self),
+            load=self._load,
+            length_histogram=self._length_histogram(),
+            linked_list_buckets=linked_list_buckets,
+            tree_buckets=self._number_of_treeified_buckets,
+            **{
+                name: None if counters is None else getattr(counters, name)
+                for name in _StatsCounters.__slots__
+            },
+        )
+
+    def _set_hasher(self, hasher: Union[str, Hasher, None]):
+        # The hasher, and therefore its secret or seed, is kept
+        # for the whole life of the hashmap.
+        self._hasher = get_hasher(hasher)
+
+    def _prehash(self, key) -> int:
+        return self._hasher.prehash(key)
+
+    @staticmethod
+    def _enforce_valid_key(key):
         # Although a tuple can be hashable if its values are hashable,
         # in this specification I want to prevent users from using
         # tuples for the keys. It may be reconsidered in the future.
@@ -307,95 +739,412 @@ class HashMap:
         # for this implementation.
         if key is None:
             raise ValueError(f"Key cannot be {get_class_name(key)}.")
-        return self._prehash(key) % self._hash_ceiling
 
-    def __getitem__(self, key):
-        hash_code = self._hash(key)
-        bucket = self._list[hash_code]
+    def _key_hash(self, key) -> int:
+        self._enforce_valid_key(key)
+        if self._mixes_prehash:
+            return mix64(self._hasher.prehash(key))
+        return self._hasher.prehash(key)
+
+    def _hash(self, key) -> int:
+        return self._key_hash(key) % self._hash_ceiling
+
+    @staticmethod
+    def _find_in_bucket(bucket, key, prehash: int) -> Union[Tuple, None]:
         if bucket is None:
-            raise KeyError("Mapping key not found.")
+            return None
         if isinstance(bucket, tuple):
-            if bucket[0] == key:
-                return bucket[1]
-            raise KeyError("Mapping key not found.")
+            # Entries are (key, value, prehash) tuples. The stored
+            # prehash is compared first, since it is cheaper than
+            # the keys' __eq__.
+            if bucket[2] == prehash and bucket[0] == key:
+                return bucket
+            return None
+        if isinstance(bucket, TreeBucket):
+            return bucket.find(key, prehash)
+        for node in bucket:
+            entry = node.data
+            if entry[2] == prehash and entry[0] == key:
+                return entry
+        return None
+
+    @staticmethod
+    def _find_in_bucket_at(bucket, key, prehash: int) -> Tuple:
+        # Like _find_in_bucket, but also returns where the entry sits:
+        # its node in a linked list, or its index in a tree bucket.
         if isinstance(bucket, LinkedList):
             for node in bucket:
-                existing_key, value = node.data
-                if existing_key == key:
-                    return value
+                entry = node.data
+                if entry[2] == prehash and entry[0] == key:
+                    return entry, node
+            return None, None
+        if isinstance(bucket, TreeBucket):
+            index = bucket.find_index(key, prehash)
+            if index < 0:
+                return None, None
+            return bucket.entry_at(index), index
+        return HashMap._find_in_bucket(bucket, key, prehash), None
+
+    def _locate(self, prehash: int) -> Tuple[List, int]:
+        # Returns the bucket list that holds the key of prehash, and
+        # the index of its bucket.
+        return self._list, prehash % self._hash_ceiling
+
+    def _find_entry(self, key, prehash: int) -> Union[Tuple, None]:
+        bucket = self._list[prehash % self._hash_ceiling]
+        return self._find_in_bucket(bucket, key, prehash)
+
+    def __getitem__(self, key):
+        prehash = self._key_hash(key)
+        bucket = self._list[prehash % self._hash_ceiling]
+        entry = self._find_in_bucket(bucket, key, prehash)
+        if entry is None:
             raise KeyError("Mapping key not found.")
+        return entry[1]
 
     @staticmethod
     def _is_empty_bucket(bucket) -> bool:
         return bucket is None
 
     @staticmethod
-    def _get_from_linked_list(key, linked_list):
+    def _get_from_linked_list(key, prehash, linked_list):
         index = 0
         for node in linked_list:
-            existing_key, _ = node.data
-            if existing_key == key:
+            existing_key, _, existing_prehash = node.data
+            if existing_prehash == prehash and existing_key == key:
                 return index
             index += 1
         return None
 
-    def __setitem__(self, key, value):
-        hash_code = self._hash(key)
-        bucket = self._list[hash_code]
-        new_bucket = (key, value)
+    def _set_in_bucket(self, buckets: List, hash_code: int, new_entry: Tuple):
+        key, _, prehash = new_entry
+        bucket = buckets[hash_code]
         if self._is_empty_bucket(bucket):
-            self._list[hash_code] = new_bucket
+            buckets[hash_code] = new_entry
+            self._number_of_entries += 1
+            self._number_of_occupied_buckets += 1
         elif isinstance(bucket, tuple):
-            if bucket[0] == key:
-                self._list[hash_code] = new_bucket
+            if bucket[2] == prehash and bucket[0] == key:
+                buckets[hash_code] = new_entry
             else:
-                new_bucket = (key, value)
-                self._list[hash_code] = LinkedList([bucket, new_bucket])
+                buckets[hash_code] = LinkedList([bucket, new_entry])
+                self._number_of_entries += 1
+                self._number_of_chained_entries += 2
         elif isinstance(bucket, LinkedList):
-            index = self._get_from_linked_list(key, bucket)
+            index = self._get_from_linked_list(key, prehash, bucket)
             bucket: LinkedList
             if index is not None:
-                bucket[index] = new_bucket
+                bucket[index] = new_entry
             else:
-                bucket.append(new_bucket)
+                bucket.append(new_entry)
+                self._number_of_entries += 1
+                self._number_of_chained_entries += 1
+                self._treeify_if_needed(buckets, hash_code)
+        elif isinstance(bucket, TreeBucket):
+            if bucket.set(new_entry):
+                self._number_of_entries += 1
+                self._number_of_chained_entries += 1
 
-    def __delitem__(self, key):
-        hash_code = self._hash(key)
-        bucket = self._list[hash_code]
+    def _set_entry(self, key, value, prehash: int):
+        hash_code = prehash % self._hash_ceiling
+        self._set_in_bucket(self._list, hash_code, (key, value, prehash))
+        if self._is_load_high(self._size / self._hash_ceiling):
+            self._resize_list(0)
+
+    def __setitem__(self, key, value):
+        self._set_entry(key, value, self._key_hash(key))
+
+    def _set_value_at(
+        self, buckets: List, hash_code: int, position, entry: Tuple, value
+    ):
+        # Replaces the value of an entry found by _find_in_bucket_at,
+        # without searching the bucket again.
+        bucket = buckets[hash_code]
+        if isinstance(bucket, TreeBucket):
+            bucket.set_value_at(position, value)
+        elif isinstance(bucket, LinkedList):
+            position.data = (entry[0], value, entry[2])
+        else:
+            buckets[hash_code] = (entry[0], value, entry[2])
+
+    def _add_to_bucket(self, buckets: List, hash_code: int, entry: Tuple):
+        # Adds an entry whose key was just searched for in the bucket,
+        # and not found.
+        self._place_in_bucket(buckets, hash_code, entry)
+        if self._is_load_high(self._size / self._hash_ceiling):
+            self._resize_list(0)
+
+    def _delete_from_bucket(
+        self, buckets: List, hash_code: int, key, prehash: int
+    ) -> Tuple:
+        bucket = buckets[hash_code]
         if bucket is None:
             raise KeyError("Mapping key not found.")
         if isinstance(bucket, tuple):
-            if bucket[0] == key:
-                _, self._list[hash_code] = bucket, None
-                del _
+            if bucket[2] == prehash and bucket[0] == key:
+                entry, buckets[hash_code] = bucket, None
+                self._number_of_occupied_buckets -= 1
             else:
                 raise KeyError("Mapping key not found.")
         elif isinstance(bucket, LinkedList):
             bucket: LinkedList
-            index = self._get_from_linked_list(key, bucket)
-            if index is None or bucket[index].data[0] != key:
+            index = self._get_from_linked_list(key, prehash, bucket)
+            if index is None:
                 raise KeyError("Mapping key not found.")
             else:
-                _ = bucket.pop(index)
-                del _
+                entry = bucket.pop(index).data
+                self._number_of_chained_entries -= 1
                 if bucket.is_empty():
                     del bucket
-                    self._list[hash_code] = None
+                    buckets[hash_code] = None
+                    self._number_of_occupied_buckets -= 1
+        elif isinstance(bucket, TreeBucket):
+            entry = bucket.remove(key, prehash)
+            self._number_of_chained_entries -= 1
+            if len(bucket) <= self._UNTREEIFY_THRESHOLD:
+                buckets[hash_code] = LinkedList(list(bucket))
+                self._number_of_treeified_buckets -= 1
+        else:
+            raise TypeError(
+                f"Inappropriate type '{get_class_name(bucket)}' "
+                "for bucket. Should be 'tuple', 'LinkedList' or "
+                "'TreeBucket'."
+            )
+        self._number_of_entries -= 1
+        self._number_of_deletions += 1
+        return entry
+
+    def _treeify_if_needed(self, buckets: List, hash_code: int):
+        bucket = buckets[hash_code]
+        if len(bucket) > self._TREEIFY_THRESHOLD:
+            buckets[hash_code] = TreeBucket(self._iter_bucket(bucket))
+            self._number_of_treeified_buckets += 1
+
+    def _delete_entry(self, key, prehash: int) -> Tuple:
+        # Removes the entry of key and returns it. The load is left
+        # for the caller to manage.
+        hash_code = prehash % self._hash_ceiling
+        return self._delete_from_bucket(self._list, hash_code, key, prehash)
+
+    def __delitem__(self, key):
+        self._delete_entry(key, self._key_hash(key))
         self._manage_current_load()
 
-    def __iter__(self):
+    @staticmethod
+    def _iter_bucket(bucket) -> Iterator[Tuple]:
+        if isinstance(bucket, LinkedList):
+            for node in bucket:
+                yield node.data
+        elif isinstance(bucket, tuple):
+            yield bucket
+        elif isinstance(bucket, TreeBucket):
+            yield from bucket
+
+    def _take_bucket(self, buckets: List, hash_code: int) -> Tuple:
+        # Empties a bucket, so that its entries can be placed again,
+        # and returns them.
+        bucket = buckets[hash_code]
+        buckets[hash_code] = None
+        entries = tuple(self._iter_bucket(bucket))
+        self._number_of_entries -= len(entries)
+        self._number_of_occupied_buckets -= 1
+        if not isinstance(bucket, tuple):
+            self._number_of_chained_entries -= len(entries)
+        if isinstance(bucket, TreeBucket):
+            self._number_of_treeified_buckets -= 1
+        return entries
+
+    def _iter_entries(self) -> Iterator[Tuple]:
         for bucket in self._list:
-            if isinstance(bucket, LinkedList):
-                for node in bucket:
-                    yield node.data[0]
-            elif isinstance(bucket, Tuple):
-                yield bucket[0]
+            if bucket is not None:
+                yield from self._iter_bucket(bucket)
+
+    def _place_in_bucket(self, buckets: List, hash_code: int, entry: Tuple):
+        # Places an entry whose key is known not to be in the map,
+        # so the hasher is not called and no keys are compared.
+        bucket = buckets[hash_code]
+        if bucket is None:
+            buckets[hash_code] = entry
+            self._number_of_occupied_buckets += 1
+        elif isinstance(bucket, tuple):
+            buckets[hash_code] = LinkedList([bucket, entry])
+            self._number_of_chained_entries += 2
+        elif isinstance(bucket, TreeBucket):
+            bucket.insert(entry)
+            self._number_of_chained_entries += 1
+        else:
+            # The order of a chain does not matter, and prepending
+            # does not walk it.
+            bucket.prepend(entry)
+            self._number_of_chained_entries += 1
+            self._treeify_if_needed(buckets, hash_code)
+        self._number_of_entries += 1
+
+    def _place_entry(self, entry: Tuple):
+        # Only the stored prehash and the capacity decide the bucket.
+        hash_code = entry[2] % self._hash_ceiling
+        self._place_in_bucket(self._list, hash_code, entry)
+
+    def __iter__(self):
+        for entry in self._iter_entries():
+            yield entry[0]
+
+    def _scan_tables(self) -> List[Tuple[int, Callable]]:
+        # The tables a scan goes through, as pairs of their number of
+        # home buckets and of a function yielding the entries whose
+        # home is a given bucket.
+        buckets = self._list
+        return [(len(buckets), lambda home: self._iter_bucket(buckets[home]))]
+
+    @staticmethod
+    def _enforce_valid_cursor(cursor: int):
+        if not isinstance(cursor, int) or isinstance(cursor, bool):
+            raise TypeError(
+                f"Inappropriate type '{get_class_name(cursor)}' "
+                "for cursor. Should be 'int'."
+            )
+        if cursor < 0 or cursor > MASK_64:
+            raise ValueError("Cursor should be between 0 and 2**64 - 1.")
+
+    @staticmethod
+    def _enforce_valid_count(count: int):
+        if not isinstance(count, int) or isinstance(count, bool):
+            raise TypeError(
+                f"Inappropriate type '{get_class_name(count)}' "
+                "for count. Should be 'int'."
+            )
+        if count < 1:
+            raise ValueError("Count should be >= 1.")
+
+    def scan(self, cursor: int = 0, count: int = 10) -> Tuple[int, List]:
+        """Returns the next cursor and a batch of about count key-value
+        pairs of the hashmap, starting from cursor.
+
+        At most about 10 * count buckets are visited per call, so a
+        sparse hashmap may return fewer pairs, even none, along with a
+        nonzero cursor to go on from.
+
+        A full scan starts with cursor 0 and goes on with the returned
+        cursor until it is 0 again. Every key that is in the hashmap
+        for the whole scan is returned, even if the hashmap is resized
+        in between, although a key may be returned more than once
+        after a shrink. Keys added or removed during the scan may or
+        may not be returned.
+
+        Modeled on the SCAN command of Redis: the cursor visits the
+        buckets in reverse binary order, which only covers resizes
+        between power of two capacities, so the hashmap must use the
+        'pow2' capacity policy.
+        """
+        self._enforce_valid_cursor(cursor)
+        self._enforce_valid_count(count)
+        if self._capacity_policy != POWER_OF_TWO_CAPACITY:
+            raise ValueError(
+                "Only hashmaps with the 'pow2' capacity policy "
+                "can be scanned."
+            )
+        tables = sorted(self._scan_tables(), key=lambda table: table[0])
+        small_size, small_table = tables[0]
+        small_mask = small_size - 1
+        pairs: List = []
+        visits_left = self._SCAN_VISITS_PER_ITEM * count
+        while True:
+            home = cursor & small_mask
+            pairs.extend(entry[:2] for entry in small_table(home))
+            visits_left -= 1
+            if len(tables) == 1:
+                cursor = _next_cursor(cursor, small_mask)
+            else:
+                # While a migration lasts, the buckets of the larger
+                # table that the small table bucket splits into are
+                # visited along with it.
+                large_size, large_table = tables[1]
+                large_mask = large_size - 1
+                while True:
+                    home = cursor & large_mask
+                    pairs.extend(entry[:2] for entry in large_table(home))
+                    visits_left -= 1
+                    cursor = _next_cursor(cursor, large_mask)
+                    if not cursor & (small_mask ^ large_mask):
+                        break
+            if not cursor or len(pairs) >= count or visits_left <= 0:
+                return cursor, pairs
 
     def __contains__(self, key) -> bool:
-        for existing_key in self:
-            if existing_key == key:
-                return True
-        return False
+        try:
+            prehash = self._key_hash(key)
+        except (TypeError, ValueError):
+            # A key that cannot be hashed cannot be in the hashmap.
+            return False
+        return self._find_entry(key, prehash) is not None
+
+    def contains_many(self, keys: Iterable) -> List[bool]:
+        """Returns a list telling, for each of the keys and in the same
+        order, whether it is in the hashmap.
+        """
+        self._enforce_iterable(keys)
+        contains = self.__contains__
+        return [contains(key) for key in keys]
+
+    @staticmethod
+    def _enforce_iterable(_iterable: Iterable):
+        if not isinstance(_iterable, Iterable):
+            raise TypeError(
+                f"object of type {get_class_name(_iterable)} is not iterable"
+            )
+
+    def get_many(self, keys: Iterable, default: Any = None) -> List:
+        """Returns a list with the value of each of the keys, in the same
+        order, or default for the keys that are not in the hashmap.
+        """
+        self._enforce_iterable(keys)
+        keys = list(keys)
+        prehashes = [self._key_hash(key) for key in keys]
+        find = self._find_entry
+        results = []
+        for key, prehash in zip(keys, prehashes):
+            entry = find(key, prehash)
+            results.append(default if entry is None else entry[1])
+        return results
+
+    def set_many(self, pairs: Iterable):
+        """Sets all the key-value pairs of an iterable (or of a dict).
+
+        Every key is validated and hashed before any of them is set,
+        and the hashmap is grown at most once, for the whole batch.
+        """
+        self._enforce_iterable(pairs)
+        if isinstance(pairs, Dict):
+            pairs = pairs.items()
+        try:
+            pairs = [(key, value) for (key, value) in pairs]
+        except (TypeError, ValueError):
+            raise ValueError("List items should be key-value pair iterables.")
+        prehashes = [self._key_hash(key) for key, _ in pairs]
+        self.reserve(len(pairs))
+        set_entry = self._set_entry
+        for (key, value), prehash in zip(pairs, prehashes):
+            set_entry(key, value, prehash)
+
+    def delete_many(self, keys: Iterable, default: Any = None) -> List:
+        """Removes the keys from the hashmap and returns a list with
+        their values, in the same order, or default for the keys that
+        were not in the hashmap.
+
+        The load is checked once, after all the keys are removed.
+        """
+        self._enforce_iterable(keys)
+        keys = list(keys)
+        prehashes = [self._key_hash(key) for key in keys]
+        delete_entry = self._delete_entry
+        results = []
+        for key, prehash in zip(keys, prehashes):
+            try:
+                results.append(delete_entry(key, prehash)[1])
+            except KeyError:
+                results.append(default)
+        self._manage_current_load()
+        return results
 
     def _ensure_its_a_hashmap(  # type: ignore
         func: Callable[["HashMap", "HashMap"], bool]
@@ -419,10 +1168,11 @@ class HashMap:
         return self.items() != other.items()
 
     def __len__(self) -> int:
-        return sum((1 for _ in self))
+        return self._number_of_entries
 
     def __repr__(self) -> str:
         return f"<HashMap: {self._list}>"
 
     def __str__(self) -> str:
-        return str(self.items())
+        pairs = (f"{key!r}: {value!r}" for key, value in self.items())
+        return f"{{{', '.join(pairs)}}}"
@@ -0,0 +1,153 @@
+"""The IncrementalHashMap class module."""
+
+from typing import Callable, Iterator, List, Tuple, Union
+
+from .hashmap import HashMap
+from ..tools.tools import get_class_name
+
+
+class IncrementalHashMap(HashMap):
+    """Chained HashMap that resizes incrementally.
+
+    A resize only allocates the new bucket list. The old one is kept,
+    and every subsequent operation moves a bounded number of its
+    buckets, in order, to the new list. While the migration lasts,
+    a key lives in the old list if its old bucket was not migrated
+    yet, and in the new list otherwise, so each lookup still probes
+    a single bucket.
+
+    This spreads the cost of a resize over many operations, instead
+    of pausing a single insert or delete to rebuild the whole map.
+    """
+
+    _MIGRATION_STEP = 4
+
+    def _reset_counters(self):
+        super()._reset_counters()
+        self._old_list: Union[List, None] = None
+        self._old_hash_ceiling = 0
+        self._migration_index = 0
+        self._number_of_old_entries = 0
+
+    @property
+    def is_migrating(self) -> bool:
+        """Whether a resize is still moving entries to the new buckets."""
+        return self._old_list is not None
+
+    @property
+    def pending_buckets(self) -> int:
+        """The number of old buckets that were not migrated yet."""
+        if self._old_list is None:
+            return 0
+        return len(self._old_list) - self._migration_index
+
+    @property
+    def pending_entries(self) -> int:
+        """The number of entries that were not migrated yet."""
+        return self._number_of_old_entries
+
+    def _resize_to(self, new_map_size: int):
+        self.finish_migration()
+        self._old_list = self._list
+        self._old_hash_ceiling = self._hash_ceiling
+        self._migration_index = 0
+        self._number_of_old_entries = self._number_of_entries
+        # The counters keep covering both bucket lists, and the load
+        # is measured against the capacity of the new one.
+        self._allocate_buckets(new_map_size)
+        self._set_hash_ceiling(self._capacity)
+
+    def _migrate_buckets(self, number_of_buckets: int):
+        old_list = self._old_list
+        start = self._migration_index
+        end = min(start + number_of_buckets, len(old_list))
+        for hash_code in range(start, end):
+            bucket = old_list[hash_code]
+            if bucket is None:
+                continue
+            entries = self._take_bucket(old_list, hash_code)
+            self._number_of_old_entries -= len(entries)
+            for entry in entries:
+                self._place_entry(entry)
+        self._migration_index = end
+        if end == len(old_list):
+            self._old_list = None
+
+    def finish_migration(self):
+        """Migrates all the pending buckets at once."""
+        if self._old_list is not None:
+            self._migrate_buckets(len(self._old_list))
+
+    def _locate(self, prehash: int) -> Tuple[List, int]:
+        # Every operation that locates a key first moves the migration
+        # forward, then looks at the bucket list that holds the key.
+        if self._old_list is not None:
+            self._migrate_buckets(self._MIGRATION_STEP)
+        if self._old_list is not None:
+            hash_code = prehash % self._old_hash_ceiling
+            if hash_code >= self._migration_index:
+                return self._old_list, hash_code
+        return self._list, prehash % self._hash_ceiling
+
+    def _find_entry(self, key, prehash: int) -> Union[Tuple, None]:
+        buckets, hash_code = self._locate(prehash)
+        return self._find_in_bucket(buckets[hash_code], key, prehash)
+
+    def __getitem__(self, key):
+        entry = self._find_entry(key, self._key_hash(key))
+        if entry is None:
+            raise KeyError("Mapping key not found.")
+        return entry[1]
+
+    def _set_entry(self, key, value, prehash: int):
+        buckets, hash_code = self._locate(prehash)
+        number_of_entries = self._number_of_entries
+        self._set_in_bucket(buckets, hash_code, (key, value, prehash))
+        if buckets is self._old_list:
+            self._number_of_old_entries += (
+                self._number_of_entries - number_of_entries
+            )
+        if self._is_load_high(self._size / self._hash_ceiling):
+            self._resize_list(0)
+
+    def _add_to_bucket(self, buckets: List, hash_code: int, entry: Tuple):
+        if buckets is self._old_list:
+            self._number_of_old_entries += 1
+        super()._add_to_bucket(buckets, hash_code, entry)
+
+    def _delete_entry(self, key, prehash: int) -> Tuple:
+        buckets, hash_code = self._locate(prehash)
+        entry = self._delete_from_bucket(buckets, hash_code, key, prehash)
+        if buckets is self._old_list:
+            self._number_of_old_entries -= 1
+        return entry
+
+    def _iter_entries(self) -> Iterator[Tuple]:
+        yield from super()._iter_entries()
+        if self._old_list is not None:
+            for bucket in self._old_list:
+                if bucket is not None:
+                    yield from self._iter_bucket(bucket)
+
+    def _bucket_lists(self) -> List[List]:
+        if self._old_list is None:
+            return [self._list]
+        return [self._list, self._old_list]
+
+    def _scan_tables(self) -> List[Tuple[int, Callable]]:
+        # The old buckets not migrated yet are scanned as well.
+        tables = super()._scan_tables()
+        old_list = self._old_list
+        if old_list is not None:
+            tables.append(
+                (len(old_list), lambda home: self._iter_bucket(old_list[home]))
+            )
+        return tables
+
+    def __repr__(self) -> str:
+        if self._old_list is None:
+            return f"<{get_class_name(self)}: {self._list}>"
+        return (
+            f"<{get_class_name(self)}: {self._list}, "
+            f"migrating: {self._old_list}>"
+        )
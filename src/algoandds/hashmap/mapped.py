@@ -0,0 +1,265 @@
+"""The MappedHashMap class module."""
+
+from abc import ABC, abstractmethod
+from contextlib import suppress
+import mmap
+import os
+import pickle
+from secrets import randbits
+from struct import Struct
+import tempfile
+from typing import Any, Hashable, Iterator, List, Tuple, Union
+
+from .hashers import DeterministicHasher
+from ..tools.tools import get_class_name
+
+
+# Layout of a packed hashmap table, all integers little endian:
+#
+#   header        magic, version, seed, number of entries and of buckets
+#   bucket index  number of buckets + 1 offsets into the entry table,
+#                 bucket b holding the entries from index[b] to
+#                 index[b + 1]
+#   entry table   one record per entry: prehash, offset of its blobs,
+#                 length of the key blob and of the value blob
+#   blobs         key blob followed by the pickled value, per entry
+_MAGIC = b"HASHMAP\x00"
+_VERSION = 1
+_HEADER = Struct("<8sIQQQ")
+_INDEX_OFFSET = Struct("<Q")
+_BUCKET_RANGE = Struct("<QQ")
+_ENTRY = Struct("<QQII")
+
+# Key blobs are a type tag followed by the key's canonical bytes.
+# Equal numbers must have equal blobs, so integral floats and bools
+# are written as ints.
+_STR_TAG = b"s"
+_BYTES_TAG = b"b"
+_INT_TAG = b"i"
+_FLOAT_TAG = b"f"
+_FLOAT = Struct("<d")
+
+
+def _encode_key(key: Hashable) -> bytes:
+    if isinstance(key, str):
+        return _STR_TAG + key.encode("utf-8", "surrogatepass")
+    if isinstance(key, (bytes, bytearray, memoryview)):
+        return _BYTES_TAG + bytes(key)
+    if isinstance(key, float) and not key.is_integer():
+        return _FLOAT_TAG + _FLOAT.pack(key)
+    if isinstance(key, (int, float)):
+        return _INT_TAG + str(int(key)).encode()
+    raise TypeError(
+        f"Inappropriate type '{get_class_name(key)}' for a mapped "
+        "hashmap key. Should be 'str', 'bytes', 'int' or 'float'."
+    )
+
+
+def _decode_key(blob: bytes) -> Hashable:
+    tag, data = blob[:1], blob[1:]
+    if tag == _STR_TAG:
+        return data.decode("utf-8", "surrogatepass")
+    if tag == _BYTES_TAG:
+        return data
+    if tag == _INT_TAG:
+        return int(data)
+    return _FLOAT.unpack(data)[0]
+
+
+def _write_table(mapping, file):
+    # Writes the items of mapping to file, in the layout above.
+    if not hasattr(mapping, "items"):
+        raise TypeError(
+            f"Inappropriate type '{get_class_name(mapping)}' "
+            "for mapping. Should be 'HashMap' or 'dict'."
+        )
+    seed = randbits(64)
+    hasher = DeterministicHasher(seed)
+    entries: List[Tuple[int, bytes, bytes]] = []
+    for key, value in mapping.items():
+        key_blob = _encode_key(key)
+        entries.append(
+            (hasher.prehash(key_blob), key_blob, pickle.dumps(value))
+        )
+    number_of_buckets = max(len(entries), 1)
+    entries.sort(key=lambda entry: entry[0] % number_of_buckets)
+
+    index = [0] * (number_of_buckets + 1)
+    for prehash, _, _ in entries:
+        index[prehash % number_of_buckets + 1] += 1
+    for bucket in range(number_of_buckets):
+        index[bucket + 1] += index[bucket]
+
+    file.write(
+        _HEADER.pack(_MAGIC, _VERSION, seed, len(entries), number_of_buckets)
+    )
+    file.write(Struct(f"<{len(index)}Q").pack(*index))
+    offset = (
+        _HEADER.size
+        + len(index) * _INDEX_OFFSET.size
+        + len(entries) * _ENTRY.size
+    )
+    for prehash, key_blob, value_blob in entries:
+        file.write(
+            _ENTRY.pack(prehash, offset, len(key_blob), len(value_blob))
+        )
+        offset += len(key_blob) + len(value_blob)
+    for _, key_blob, value_blob in entries:
+        file.write(key_blob)
+        file.write(value_blob)
+
+
+class _PackedHashMap(ABC):
+    # Lookups over a buffer holding a table in the layout above. The
+    # subclasses provide the buffer, and how to release it.
+
+    _buffer: Union[mmap.mmap, memoryview]
+
+    def _read_header(self):
+        if len(self._buffer) < _HEADER.size:
+            raise ValueError("Not a packed hashmap table.")
+        magic, version, seed, entries, buckets = _HEADER.unpack_from(
+            self._buffer
+        )
+        if magic != _MAGIC:
+            raise ValueError("Not a packed hashmap table.")
+        if version != _VERSION:
+            raise ValueError(
+                f"Unsupported packed hashmap version {version}."
+            )
+        self._hasher = DeterministicHasher(seed)
+        self._number_of_entries = entries
+        self._number_of_buckets = buckets
+        self._entries_offset = (
+            _HEADER.size + (buckets + 1) * _INDEX_OFFSET.size
+        )
+
+    def _find_value_blob(self, key) -> Union[bytes, memoryview, None]:
+        key_blob = _encode_key(key)
+        prehash = self._hasher.prehash(key_blob)
+        bucket = prehash % self._number_of_buckets
+        buffer = self._buffer
+        start, end = _BUCKET_RANGE.unpack_from(
+            buffer, _HEADER.size + bucket * _INDEX_OFFSET.size
+        )
+        for position in range(start, end):
+            entry_hash, offset, key_length, value_length = _ENTRY.unpack_from(
+                buffer, self._entries_offset + position * _ENTRY.size
+            )
+            if (
+                entry_hash == prehash
+                and key_length == len(key_blob)
+                and buffer[offset:offset + key_length] == key_blob
+            ):
+                value_start = offset + key_length
+                return buffer[value_start:value_start + value_length]
+        return None
+
+    def __getitem__(self, key) -> Any:
+        value_blob = self._find_value_blob(key)
+        if value_blob is None:
+            raise KeyError("Mapping key not found.")
+        return pickle.loads(value_blob)
+
+    def get(self, key, default=None) -> Any:
+        """Returns the value for key if the latter is in the map,
+        else default.
+        """
+        value_blob = self._find_value_blob(key)
+        return default if value_blob is None else pickle.loads(value_blob)
+
+    def __contains__(self, key) -> bool:
+        try:
+            return self._find_value_blob(key) is not None
+        except TypeError:
+            # Keys that cannot be packed cannot be in the table.
+            return False
+
+    def __iter__(self) -> Iterator:
+        for position in range(self._number_of_entries):
+            _, offset, key_length, _ = _ENTRY.unpack_from(
+                self._buffer, self._entries_offset + position * _ENTRY.size
+            )
+            yield _decode_key(bytes(self._buffer[offset:offset + key_length]))
+
+    def __len__(self) -> int:
+        return self._number_of_entries
+
+    @abstractmethod
+    def close(self):
+        """Releases the buffer of the table."""
+        ...
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class MappedHashMap(_PackedHashMap):
+    """Read-only map served straight from a file, through mmap.
+
+    The file is written from a HashMap (or any mapping) by write, or by
+    HashMap.dump. Opening it only reads its header, so it takes the same
+    time whatever the size of the map, and lookups read the pages they
+    need: the bucket index entry, the few entry records of the bucket
+    and the blobs of the key looked for. Processes opening the same file
+    share its pages through the OS page cache.
+
+    Keys are limited to str, bytes, int and float, whose hashes do not
+    change between processes. They are hashed with a DeterministicHasher
+    whose seed is stored in the file. Values are pickled, so only files
+    from trusted sources should be opened.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]):
+        self._path = os.fspath(path)
+        with open(self._path, "rb") as file:
+            self._buffer = mmap.mmap(
+                file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        try:
+            self._read_header()
+        except ValueError:
+            self._buffer.close()
+            raise
+
+    @staticmethod
+    def write(path: Union[str, os.PathLike], mapping):
+        """Writes the items of mapping to a file at path.
+
+        The file is written next to path first and then renamed, so
+        processes never open a partly written file.
+        """
+        path = os.fspath(path)
+        # Each writer gets a file of its own, so that concurrent writes
+        # to the same path cannot interleave.
+        descriptor, temporary_path = tempfile.mkstemp(
+            suffix=".tmp",
+            prefix=f"{os.path.basename(path)}.",
+            dir=os.path.dirname(path) or None,
+        )
+        try:
+            with open(descriptor, "wb") as file:
+                _write_table(mapping, file)
+            os.replace(temporary_path, path)
+        except BaseException:
+            with suppress(FileNotFoundError):
+                os.remove(temporary_path)
+            raise
+
+    @property
+    def path(self) -> str:
+        """The path of the mapped file."""
+        return self._path
+
+    def close(self):
+        """Unmaps the file."""
+        self._buffer.close()
+
+    def __repr__(self) -> str:
+        return (
+            f"<{get_class_name(self)}: {self._number_of_entries} entries "
+            f"from '{self._path}'>"
+        )
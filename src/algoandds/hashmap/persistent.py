@@ -0,0 +1,462 @@
+"""The PersistentHashMap and TransientHashMap classes module."""
+
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+from .hashers import Hasher, get_hasher, mix64
+from .hashmap import HashMap
+from .views import HashMapItemsView, HashMapKeysView, HashMapValuesView
+from ..tools.tools import get_class_name, popcount
+
+
+# Every level of the trie consumes 5 bits of the prehash, so nodes
+# have up to 32 slots and 64-bit prehashes need at most 13 levels.
+_BITS = 5
+_CHUNK_MASK = (1 << _BITS) - 1
+
+
+class _BitmapNode:
+    # Slots hold entries, as (key, value, prehash) tuples, or child
+    # nodes. The bitmap tells which of the 32 possible slots are used,
+    # and the array only holds those, in order.
+
+    __slots__ = ("bitmap", "array", "owner")
+
+    def __init__(self, bitmap: int, array: List, owner: object = None):
+        self.bitmap = bitmap
+        self.array = array
+        self.owner = owner
+
+
+class _CollisionNode:
+    # Entries whose keys have the very same prehash.
+
+    __slots__ = ("prehash", "array", "owner")
+
+    def __init__(self, prehash: int, array: List, owner: object = None):
+        self.prehash = prehash
+        self.array = array
+        self.owner = owner
+
+
+_Node = Union[_BitmapNode, _CollisionNode]
+_EMPTY_ROOT = _BitmapNode(0, [])
+
+
+def _editable(node: _Node, owner: object) -> _Node:
+    # Nodes created by a transient carry its owner token, and it may
+    # change them in place. Every other node is copied before a change.
+    if owner is not None and node.owner is owner:
+        return node
+    if isinstance(node, _BitmapNode):
+        return _BitmapNode(node.bitmap, list(node.array), owner)
+    return _CollisionNode(node.prehash, list(node.array), owner)
+
+
+def _pair(
+    existing: Union[Tuple, _CollisionNode],
+    existing_prehash: int,
+    entry: Tuple,
+    shift: int,
+    owner: object,
+) -> _Node:
+    # Returns the node holding an existing entry (or collision node)
+    # and a new entry, which shared the same slot at the level above.
+    prehash = entry[2]
+    if existing_prehash == prehash:
+        return _CollisionNode(prehash, [existing, entry], owner)
+    existing_chunk = (existing_prehash >> shift) & _CHUNK_MASK
+    chunk = (prehash >> shift) & _CHUNK_MASK
+    if existing_chunk == chunk:
+        child = _pair(existing, existing_prehash, entry, shift + _BITS, owner)
+        return _BitmapNode(1 << chunk, [child], owner)
+    array = [existing, entry] if existing_chunk < chunk else [entry, existing]
+    return _BitmapNode((1 << existing_chunk) | (1 << chunk), array, owner)
+
+
+def _set_in_collision(
+    node: _CollisionNode, shift: int, entry: Tuple, owner: object
+) -> Tuple[_Node, bool]:
+    key, value, prehash = entry
+    if prehash != node.prehash:
+        return _pair(node, node.prehash, entry, shift, owner), True
+    for index, stored in enumerate(node.array):
+        if stored[0] is key or stored[0] == key:
+            if stored[1] is value:
+                return node, False
+            new_node = _editable(node, owner)
+            new_node.array[index] = entry
+            return new_node, False
+    new_node = _editable(node, owner)
+    new_node.array.append(entry)
+    return new_node, True
+
+
+def _set_in_slot(
+    slot: Union[Tuple, _Node], shift: int, entry: Tuple, owner: object
+) -> Tuple[Union[Tuple, _Node], bool]:
+    # Returns what the used slot of a bitmap node holds once entry is
+    # set, and whether its key is new.
+    if not isinstance(slot, tuple):
+        return _set(slot, shift + _BITS, entry, owner)
+    if slot[0] is entry[0] or slot[0] == entry[0]:
+        if slot[1] is entry[1]:
+            return slot, False
+        return entry, False
+    return _pair(slot, slot[2], entry, shift + _BITS, owner), True
+
+
+def _set(
+    node: _Node, shift: int, entry: Tuple, owner: object
+) -> Tuple[_Node, bool]:
+    # Returns the node with entry set, and whether its key is new.
+    # Nodes that do not change are returned as they are.
+    if isinstance(node, _CollisionNode):
+        return _set_in_collision(node, shift, entry, owner)
+    bit = 1 << ((entry[2] >> shift) & _CHUNK_MASK)
+    index = popcount(node.bitmap & (bit - 1))
+    if not node.bitmap & bit:
+        new_node = _editable(node, owner)
+        new_node.bitmap |= bit
+        new_node.array.insert(index, entry)
+        return new_node, True
+    slot = node.array[index]
+    child, is_new = _set_in_slot(slot, shift, entry, owner)
+    if child is slot:
+        return node, is_new
+    new_node = _editable(node, owner)
+    new_node.array[index] = child
+    return new_node, is_new
+
+
+def _delete_from_collision(
+    node: _CollisionNode, key, owner: object
+) -> Union[_Node, Tuple]:
+    for index, stored in enumerate(node.array):
+        if stored[0] is key or stored[0] == key:
+            break
+    else:
+        raise KeyError("Mapping key not found.")
+    if len(node.array) == 2:
+        return node.array[1 - index]
+    new_node = _editable(node, owner)
+    del new_node.array[index]
+    return new_node
+
+
+def _without_slot(
+    node: _BitmapNode, index: int, bit: int, shift: int, owner: object
+) -> Union[_Node, Tuple, None]:
+    # Returns the bitmap node without its slot at index, following the
+    # same rules as _delete.
+    if len(node.array) == 1:
+        return None
+    remaining = node.array[1 - index] if len(node.array) == 2 else None
+    if shift and isinstance(remaining, tuple):
+        return remaining
+    new_node = _editable(node, owner)
+    new_node.bitmap ^= bit
+    del new_node.array[index]
+    return new_node
+
+
+def _delete(
+    node: _Node, shift: int, key, prehash: int, owner: object
+) -> Union[_Node, Tuple, None]:
+    # Returns the node without key, None if it ends up empty, or its
+    # last entry, which the parent then holds instead of the node.
+    # Raises KeyError if key is not found.
+    if isinstance(node, _CollisionNode):
+        return _delete_from_collision(node, key, owner)
+    bit = 1 << ((prehash >> shift) & _CHUNK_MASK)
+    if not node.bitmap & bit:
+        raise KeyError("Mapping key not found.")
+    index = popcount(node.bitmap & (bit - 1))
+    slot = node.array[index]
+    if isinstance(slot, tuple):
+        if not (slot[0] is key or slot[0] == key):
+            raise KeyError("Mapping key not found.")
+        return _without_slot(node, index, bit, shift, owner)
+    child = _delete(slot, shift + _BITS, key, prehash, owner)
+    if child is None:
+        return _without_slot(node, index, bit, shift, owner)
+    if shift and len(node.array) == 1 and isinstance(child, tuple):
+        return child
+    new_node = _editable(node, owner)
+    new_node.array[index] = child
+    return new_node
+
+
+def _iter_node(node: _Node) -> Iterator[Tuple]:
+    for slot in node.array:
+        if isinstance(slot, tuple):
+            yield slot
+        else:
+            yield from _iter_node(slot)
+
+
+class _TrieMap:
+    # Lookups shared by the persistent and the transient maps, which
+    # both hold a root node and their number of entries.
+
+    _hasher: Hasher
+    _root: _BitmapNode
+    _size: int
+
+    @property
+    def hasher(self) -> Hasher:
+        """The hasher used to compute the prehash of the keys."""
+        return self._hasher
+
+    def _key_hash(self, key) -> int:
+        # Prehashes are mixed, as every level of the trie branches on
+        # a different chunk of their bits.
+        HashMap._enforce_valid_key(key)
+        return mix64(self._hasher.prehash(key))
+
+    def _find_entry(self, key, prehash: int) -> Union[Tuple, None]:
+        node, shift = self._root, 0
+        while True:
+            if isinstance(node, _CollisionNode):
+                for entry in node.array:
+                    if entry[0] is key or entry[0] == key:
+                        return entry
+                return None
+            bit = 1 << ((prehash >> shift) & _CHUNK_MASK)
+            if not node.bitmap & bit:
+                return None
+            slot = node.array[popcount(node.bitmap & (bit - 1))]
+            if isinstance(slot, tuple):
+                if slot[0] is key or slot[0] == key:
+                    return slot
+                return None
+            node, shift = slot, shift + _BITS
+
+    def _iter_entries(self) -> Iterator[Tuple]:
+        return _iter_node(self._root)
+
+    def __getitem__(self, key):
+        entry = self._find_entry(key, self._key_hash(key))
+        if entry is None:
+            raise KeyError("Mapping key not found.")
+        return entry[1]
+
+    def get(self, key, default=None):
+        """Returns the value for key if the latter exists in the map,
+        else default.
+        """
+        entry = self._find_entry(key, self._key_hash(key))
+        return default if entry is None else entry[1]
+
+    def __contains__(self, key) -> bool:
+        try:
+            prehash = self._key_hash(key)
+        except (TypeError, ValueError):
+            return False
+        return self._find_entry(key, prehash) is not None
+
+    def keys(self) -> HashMapKeysView:
+        """Returns a set-like view of the keys of the map."""
+        return HashMapKeysView(self)
+
+    def values(self) -> HashMapValuesView:
+        """Returns a view of the values of the map."""
+        return HashMapValuesView(self)
+
+    def items(self) -> HashMapItemsView:
+        """Returns a set-like view of the (key, value) pairs of the map."""
+        return HashMapItemsView(self)
+
+    def __iter__(self) -> Iterator:
+        for entry in self._iter_entries():
+            yield entry[0]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __str__(self) -> str:
+        pairs = (f"{key!r}: {value!r}" for key, value in self.items())
+        return f"{{{', '.join(pairs)}}}"
+
+
+class PersistentHashMap(_TrieMap):
+    """Immutable map stored as a hash array mapped trie (HAMT).
+
+    Keys are placed in the trie by their prehash, computed with the
+    same hashers as HashMap, five bits per level. set and delete return
+    a new version of the map that shares every node the change did not
+    go through with the previous version, which stays untouched. So a
+    change copies O(log32 n) nodes, and copying a map is free: the map
+    itself is its own copy.
+
+    For bulk edits, transient returns a mutable TransientHashMap that
+    changes the nodes it created in place, and turns back into a
+    PersistentHashMap once done. set_many and delete_many go through
+    one.
+    """
+
+    def __init__(
+        self,
+        _iter: Union[Tuple, Dict, List] = None,
+        hasher: Union[str, Hasher] = None,
+    ):
+        self._hasher = get_hasher(hasher)
+        self._root = _EMPTY_ROOT
+        self._size = 0
+        if _iter is not None:
+            transient = self.transient()
+            transient.update(_iter)
+            self._root, self._size = transient._root, transient._size
+
+    @classmethod
+    def _from_root(
+        cls, hasher: Hasher, root: _BitmapNode, size: int
+    ) -> "PersistentHashMap":
+        new_map = cls.__new__(cls)
+        new_map._hasher, new_map._root, new_map._size = hasher, root, size
+        return new_map
+
+    def set(self, key, value) -> "PersistentHashMap":
+        """Returns a new version of the map, with key set to value."""
+        entry = (key, value, self._key_hash(key))
+        root, is_new = _set(self._root, 0, entry, None)
+        if root is self._root:
+            return self
+        return self._from_root(self._hasher, root, self._size + is_new)
+
+    def delete(self, key) -> "PersistentHashMap":
+        """Returns a new version of the map, without key.
+
+        Raises KeyError if key is not in the map.
+        """
+        root = _delete(self._root, 0, key, self._key_hash(key), None)
+        return self._from_root(
+            self._hasher, root or _EMPTY_ROOT, self._size - 1
+        )
+
+    def set_many(self, pairs: Iterable) -> "PersistentHashMap":
+        """Returns a new version of the map, with all the key-value pairs
+        of an iterable (or of a dict) set.
+        """
+        transient = self.transient()
+        transient.set_many(pairs)
+        return transient.persistent()
+
+    def delete_many(self, keys: Iterable) -> "PersistentHashMap":
+        """Returns a new version of the map, without all the keys
+        of an iterable.
+
+        Raises KeyError if any of the keys is not in the map.
+        """
+        transient = self.transient()
+        transient.delete_many(keys)
+        return transient.persistent()
+
+    def transient(self) -> "TransientHashMap":
+        """Returns a mutable TransientHashMap, starting from this map,
+        for bulk edits. The map itself does not change.
+        """
+        return TransientHashMap(self)
+
+    def copy(self) -> "PersistentHashMap":
+        """Returns the map itself, as it cannot change."""
+        return self
+
+    def __eq__(self, other: "PersistentHashMap") -> bool:
+        if not isinstance(other, PersistentHashMap):
+            raise TypeError(
+                "Cannot compare PersistentHashMap with object of another "
+                f"type ({get_class_name(other)})."
+            )
+        return self._root is other._root or self.items() == other.items()
+
+    def __ne__(self, other: "PersistentHashMap") -> bool:
+        return not self == other
+
+    def __repr__(self) -> str:
+        return f"<{get_class_name(self)}: {self._size} entries>"
+
+
+class TransientHashMap(_TrieMap):
+    """Mutable version of a PersistentHashMap, for bulk edits.
+
+    Nodes are copied the first time a change goes through them, and
+    changed in place afterwards, so a batch of edits copies each node
+    at most once. The PersistentHashMap it started from never changes.
+
+    persistent returns the edited map as a PersistentHashMap, after
+    which the transient cannot be changed anymore.
+    """
+
+    def __init__(self, persistent_map: PersistentHashMap):
+        if not isinstance(persistent_map, PersistentHashMap):
+            raise TypeError(
+                f"Inappropriate type '{get_class_name(persistent_map)}' "
+                "for persistent map. Should be 'PersistentHashMap'."
+            )
+        self._hasher = persistent_map._hasher
+        self._root = persistent_map._root
+        self._size = persistent_map._size
+        self._owner = object()
+
+    def _ensure_editable(self):
+        if self._owner is None:
+            raise RuntimeError(
+                "Transient map cannot be changed after being made "
+                "persistent."
+            )
+
+    def __setitem__(self, key, value):
+        self._ensure_editable()
+        entry = (key, value, self._key_hash(key))
+        self._root, is_new = _set(self._root, 0, entry, self._owner)
+        self._size += is_new
+
+    def __delitem__(self, key):
+        self._ensure_editable()
+        root = _delete(
+            self._root, 0, key, self._key_hash(key), self._owner
+        )
+        self._root = root or _EMPTY_ROOT
+        self._size -= 1
+
+    def set_many(self, pairs: Iterable):
+        """Sets all the key-value pairs of an iterable (or of a dict)."""
+        HashMap._enforce_iterable(pairs)
+        if isinstance(pairs, Dict):
+            pairs = pairs.items()
+        try:
+            pairs = [(key, value) for (key, value) in pairs]
+        except (TypeError, ValueError):
+            raise ValueError("List items should be key-value pair iterables.")
+        for key, value in pairs:
+            self[key] = value
+
+    def delete_many(self, keys: Iterable):
+        """Removes all the keys of an iterable from the map.
+
+        Raises KeyError if any of the keys is not in the map.
+        """
+        HashMap._enforce_iterable(keys)
+        for key in keys:
+            del self[key]
+
+    def update(self, _iterable: Union[Tuple, Dict, List]):
+        """Updates the map from a key-value pair tuple, a list of
+        key-value pairs, a dict or an items view.
+        """
+        if isinstance(_iterable, tuple):
+            _iterable = [_iterable]
+        self.set_many(_iterable)
+
+    def persistent(self) -> PersistentHashMap:
+        """Returns the edited map as a PersistentHashMap, and ends the
+        transient, whose nodes are now shared by the persistent map.
+        """
+        self._ensure_editable()
+        self._owner = None
+        return PersistentHashMap._from_root(
+            self._hasher, self._root, self._size
+        )
+
+    def __repr__(self) -> str:
+        return f"<{get_class_name(self)}: {self._size} entries>"
@@ -0,0 +1,205 @@
+"""The RobinHoodHashMap class module."""
+
+from typing import Callable, Dict, Iterator, List, Tuple, Union
+
+from .hashmap import HashMap
+from ..tools.tools import get_class_name
+
+
+class RobinHoodHashMap(HashMap):
+    """HashMap backend based on open addressing with Robin Hood hashing.
+
+    Keys, values and prehashes are stored in three flat parallel lists,
+    with no per-entry objects besides the keys and values themselves.
+    An empty slot is marked by a None key, which is never a valid key.
+
+    On insertion, an entry that is further from its home slot takes
+    the place of any entry closer to its own, which keeps probe
+    sequences short and lets lookups stop early. Deletions shift the
+    following entries back instead of leaving tombstones.
+    """
+
+    _HAS_SPLITTABLE_BUCKETS = False
+
+    def _allocate_buckets(self, map_size: int):
+        self._keys: List = [None] * map_size
+        self._values: List = [None] * map_size
+        self._hashes: List = [None] * map_size
+
+    @property
+    def _capacity(self) -> int:
+        return len(self._keys)
+
+    def _find_slot(self, key, prehash: int) -> int:
+        """Returns the slot holding key, or -1 if key is not found."""
+        keys, hashes = self._keys, self._hashes
+        capacity = len(keys)
+        index = prehash % capacity
+        distance = 0
+        while True:
+            slot_key = keys[index]
+            if slot_key is None:
+                return -1
+            slot_hash = hashes[index]
+            if slot_hash == prehash and (slot_key is key or slot_key == key):
+                return index
+            # Had key been inserted, it would have displaced any entry
+            # closer to its home slot than key is to its own.
+            if (index - slot_hash) % capacity < distance:
+                return -1
+            distance += 1
+            index += 1
+            if index == capacity:
+                index = 0
+
+    def _insert_new(self, key, value, prehash: int):
+        keys, values, hashes = self._keys, self._values, self._hashes
+        capacity = len(keys)
+        index = prehash % capacity
+        distance = 0
+        while True:
+            slot_key = keys[index]
+            if slot_key is None:
+                keys[index], values[index], hashes[index] = key, value, prehash
+                return
+            slot_distance = (index - hashes[index]) % capacity
+            if slot_distance < distance:
+                # The entry being placed is poorer (further from home),
+                # so it takes the slot and the richer one moves on.
+                keys[index], key = key, slot_key
+                values[index], value = value, values[index]
+                hashes[index], prehash = prehash, hashes[index]
+                distance = slot_distance
+            distance += 1
+            index += 1
+            if index == capacity:
+                index = 0
+
+    def _remove_slot(self, index: int):
+        # Backward shift deletion: every following entry that is not
+        # in its home slot moves one slot back, closing the gap.
+        keys, values, hashes = self._keys, self._values, self._hashes
+        capacity = len(keys)
+        next_index = index + 1 if index + 1 < capacity else 0
+        while (
+            keys[next_index] is not None
+            and (next_index - hashes[next_index]) % capacity != 0
+        ):
+            keys[index] = keys[next_index]
+            values[index] = values[next_index]
+            hashes[index] = hashes[next_index]
+            index = next_index
+            next_index = index + 1 if index + 1 < capacity else 0
+        keys[index] = values[index] = hashes[index] = None
+
+    def _is_insert_overloading(self) -> bool:
+        new_load = (self._number_of_entries + 1) / len(self._keys)
+        return self._is_load_high(new_load)
+
+    def __getitem__(self, key):
+        index = self._find_slot(key, self._key_hash(key))
+        if index < 0:
+            raise KeyError("Mapping key not found.")
+        return self._values[index]
+
+    def _set_entry(self, key, value, prehash: int):
+        index = self._find_slot(key, prehash)
+        if index >= 0:
+            self._values[index] = value
+            return
+        self._add_entry(key, value, prehash)
+
+    def _add_entry(self, key, value, prehash: int):
+        # Unlike chaining, open addressing cannot go over capacity,
+        # so the load is checked on every new entry.
+        if self._is_insert_overloading():
+            self._resize_list(1)
+        self._insert_new(key, value, prehash)
+        self._number_of_entries += 1
+        self._number_of_occupied_buckets += 1
+
+    def _key_at_slot(self, slot: int):
+        return self._keys[slot]
+
+    def _value_at_slot(self, slot: int):
+        return self._values[slot]
+
+    def _set_value_at_slot(self, slot: int, value):
+        self._values[slot] = value
+
+    _compute_entry = HashMap._compute_in_slot
+
+    def _delete_entry(self, key, prehash: int) -> Tuple:
+        index = self._find_slot(key, prehash)
+        if index < 0:
+            raise KeyError("Mapping key not found.")
+        entry = (self._keys[index], self._values[index], prehash)
+        self._remove_slot(index)
+        self._number_of_entries -= 1
+        self._number_of_deletions += 1
+        self._number_of_occupied_buckets -= 1
+        return entry
+
+    def __contains__(self, key) -> bool:
+        try:
+            prehash = self._key_hash(key)
+        except (TypeError, ValueError):
+            return False
+        return self._find_slot(key, prehash) >= 0
+
+    def _find_entry(self, key, prehash: int) -> Union[Tuple, None]:
+        index = self._find_slot(key, prehash)
+        if index < 0:
+            return None
+        return (self._keys[index], self._values[index], prehash)
+
+    def _iter_entries(self) -> Iterator[Tuple]:
+        for entry in zip(self._keys, self._values, self._hashes):
+            if entry[0] is not None:
+                yield entry
+
+    def _bucket_lists(self) -> List[List]:
+        return []
+
+    def _length_histogram(self) -> Dict[int, int]:
+        # The number of entries per probe length, from 1 for entries
+        # in their home slot.
+        histogram: Dict[int, int] = {}
+        capacity = len(self._keys)
+        for index, prehash in enumerate(self._hashes):
+            if prehash is not None:
+                length = (index - prehash) % capacity + 1
+                histogram[length] = histogram.get(length, 0) + 1
+        return dict(sorted(histogram.items()))
+
+    def _scan_tables(self) -> List[Tuple[int, Callable]]:
+        keys, values, hashes = self._keys, self._values, self._hashes
+        capacity = len(keys)
+
+        def home_entries(home: int) -> Iterator[Tuple]:
+            # Entries are sorted by home slot along a cluster, so the
+            # ones of home sit together and end before the first entry
+            # that is closer to its own home slot.
+            index, distance = home, 0
+            while keys[index] is not None and distance < capacity:
+                slot_distance = (index - hashes[index]) % capacity
+                if slot_distance < distance:
+                    return
+                if slot_distance == distance:
+                    yield (keys[index], values[index], hashes[index])
+                distance += 1
+                index = index + 1 if index + 1 < capacity else 0
+
+        return [(capacity, home_entries)]
+
+    def _place_entry(self, entry: Tuple):
+        self._insert_new(*entry)
+        self._number_of_entries += 1
+        self._number_of_occupied_buckets += 1
+
+    def __repr__(self) -> str:
+        slots = [
+            None if key is None else (key, value)
+            for key, value in zip(self._keys, self._values)
+        ]
+        return f"<{get_class_name(self)}: {slots}>"
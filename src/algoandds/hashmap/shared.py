@@ -0,0 +1,101 @@
+"""The SharedHashMap class module."""
+
+import io
+import os
+import sys
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+from .mapped import _PackedHashMap, _write_table
+from ..tools.tools import get_class_name
+
+
+_TRACKS_ATTACHED_BLOCKS = sys.version_info < (3, 13) and os.name == "posix"
+
+
+def _attach(name: str) -> SharedMemory:
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    block = SharedMemory(name=name)
+    if _TRACKS_ATTACHED_BLOCKS:
+        # Before Python 3.13, every process attaching to a block
+        # registers it with its resource tracker, which unlinks it when
+        # the process exits. Only the publisher should unlink it.
+        resource_tracker.unregister(block._name, "shared_memory")
+    return block
+
+
+class SharedHashMap(_PackedHashMap):
+    """Read-only map held in a shared memory block, that processes
+    attach to by name instead of each holding a copy of the map.
+
+    publish packs a HashMap (or any mapping) into a new block, in the
+    same layout as MappedHashMap files: a flat bucket index and entry
+    table of hashes and offsets, followed by a heap of key and value
+    blobs. Other processes attach with SharedHashMap(name), and look
+    keys up straight from the shared pages. Pickling a SharedHashMap
+    only sends its name, so it can be passed to pool workers as is.
+
+    Every process closes its own SharedHashMap when done with it, and
+    the publisher unlinks the block once no process needs it anymore.
+    Keys and values follow the rules of MappedHashMap.
+    """
+
+    def __init__(self, name: str):
+        if not isinstance(name, str):
+            raise TypeError(
+                f"Inappropriate type '{get_class_name(name)}' "
+                "for name. Should be 'str'."
+            )
+        self._open(_attach(name))
+
+    def _open(self, block: SharedMemory):
+        self._block = block
+        self._buffer = block.buf
+        try:
+            self._read_header()
+        except ValueError:
+            self.close()
+            raise
+
+    @classmethod
+    def publish(cls, mapping, name: str = None) -> "SharedHashMap":
+        """Packs the items of mapping into a new shared memory block,
+        named name if a name is given, and returns the map over it.
+        """
+        table = io.BytesIO()
+        _write_table(mapping, table)
+        size = table.tell()
+        block = SharedMemory(name=name, create=True, size=size)
+        block.buf[:size] = table.getbuffer()
+        shared_map = cls.__new__(cls)
+        shared_map._open(block)
+        return shared_map
+
+    @property
+    def name(self) -> str:
+        """The name processes attach to the block with."""
+        return self._block.name
+
+    def close(self):
+        """Detaches from the block, which other processes can still use."""
+        self._buffer = None
+        self._block.close()
+
+    def unlink(self):
+        """Frees the block once every process has closed it."""
+        if _TRACKS_ATTACHED_BLOCKS:
+            # Unlinking unregisters the block, which an attach in a
+            # process sharing this resource tracker may have done
+            # already, so it is registered again first.
+            resource_tracker.register(self._block._name, "shared_memory")
+        self._block.unlink()
+
+    def __reduce__(self):
+        return (type(self), (self.name,))
+
+    def __repr__(self) -> str:
+        return (
+            f"<{get_class_name(self)}: {self._number_of_entries} entries "
+            f"in '{self.name}'>"
+        )
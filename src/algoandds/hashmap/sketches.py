@@ -0,0 +1,576 @@
+"""Streaming cardinality and frequency sketches built on HashMap's
+hashers.
+"""
+
+from abc import ABC, abstractmethod
+from array import array
+import heapq
+from math import log, sqrt
+import sys
+from typing import Hashable, Iterable, List, Tuple, Union
+
+from .filters import _mix64_array
+from .hashers import (
+    MASK_64,
+    DeterministicHasher,
+    Hasher,
+    KeyedHasher,
+    get_hasher,
+    mix64,
+)
+from .hashmap import HashMap
+from ..tools.tools import get_class_name
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+# Unlike the salted one, these hashers compute the prehash of an int
+# as mix64(hash(key) ^ seed), which NumPy can do for a whole array.
+_SEEDED_HASHERS = (KeyedHasher, DeterministicHasher)
+
+
+def _hash_int_array(keys: "np.ndarray") -> "np.ndarray":
+    # Python's hash of every int of an array, as uint64 two's complement:
+    # the absolute value modulo the hash modulus, with the sign of the
+    # int, and -2 instead of -1.
+    modulus = np.uint64(sys.hash_info.modulus)
+    if keys.dtype.kind == "u":
+        return keys.astype(np.uint64) % modulus
+    keys = keys.astype(np.int64)
+    negative = keys < 0
+    magnitude = np.where(negative, -(keys + 1), keys).astype(np.uint64)
+    remainder = ((magnitude + negative) % modulus).astype(np.int64)
+    hashes = np.where(negative, -remainder, remainder)
+    hashes[hashes == -1] = -2
+    return hashes.view(np.uint64)
+
+
+def _bit_length_array(values: "np.ndarray") -> "np.ndarray":
+    # int.bit_length of every uint64 of an array, without going through
+    # floats, which would round the largest values up.
+    lengths = np.zeros(values.shape, dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = values >= np.uint64(1 << shift)
+        lengths += high * shift
+        values = np.where(high, values >> np.uint64(shift), values)
+    return lengths + (values > 0)
+
+
+def _same_hashing(first: Hasher, second: Hasher) -> bool:
+    # Deterministic hashers with equal seeds compute the same prehashes
+    # in every process. Keyed ones build on hash(), whose values for
+    # str and bytes differ between processes, so a keyed hasher only
+    # matches itself.
+    if first is second:
+        return True
+    return (
+        type(first) is type(second) is DeterministicHasher
+        and first.seed == second.seed
+    )
+
+
+def _enforce_positive_int(value: int, name: str):
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise TypeError(
+            f"Inappropriate type '{get_class_name(value)}' "
+            f"for {name}. Should be 'int'."
+        )
+    if value < 1:
+        raise ValueError(f"{name.capitalize()} should be >= 1.")
+
+
+class _Sketch(ABC):
+    """Base of the sketches: keys go through the same validation and
+    hashers as HashMap keys, and the prehash is mixed into the 64-bit
+    hash the sketch is updated with.
+
+    The default hasher is the deterministic one, whose prehashes of
+    str, bytes and numbers are the same in every process, so sketches
+    built in separate processes can be merged. Sketches with other
+    hashers can only be merged when they share the hasher object.
+    """
+
+    _hasher: Hasher
+
+    @property
+    def hasher(self) -> Hasher:
+        """The hasher used to compute the prehash of the keys."""
+        return self._hasher
+
+    def _key_hash(self, key: Hashable) -> int:
+        HashMap._enforce_valid_key(key)
+        return mix64(self._hasher.prehash(key))
+
+    def _key_hashes(self, keys: Iterable) -> Union[List[int], "np.ndarray"]:
+        # Arrays of ints are hashed in a few vectorized passes when the
+        # hasher allows it, and as lists of their items otherwise.
+        if np is not None and isinstance(keys, np.ndarray):
+            if keys.dtype.kind in "iu" and type(self._hasher) in (
+                _SEEDED_HASHERS
+            ):
+                seed = np.uint64(self._hasher.seed)
+                prehashes = _mix64_array(_hash_int_array(keys.ravel()) ^ seed)
+                return _mix64_array(prehashes)
+            keys = keys.ravel().tolist()
+        HashMap._enforce_iterable(keys)
+        key_hash = self._key_hash
+        return [key_hash(key) for key in keys]
+
+    def _enforce_mergeable(self, other: "_Sketch"):
+        if type(other) is not type(self):
+            raise TypeError(
+                f"Inappropriate type '{get_class_name(other)}' for sketch. "
+                f"Should be '{get_class_name(self)}'."
+            )
+        if other._shape() != self._shape() or not _same_hashing(
+            self._hasher, other._hasher
+        ):
+            raise ValueError(
+                "Only sketches of the same size and with the same hashing "
+                "can be merged."
+            )
+
+    @abstractmethod
+    def _shape(self) -> Tuple:
+        """Returns what sketches must have in common to be merged."""
+        ...
+
+
+class HyperLogLog(_Sketch):
+    """HyperLogLog estimate of the number of distinct keys of a stream.
+
+    The highest bits of a key's hash pick one of 2 ** precision byte
+    registers, which keeps the longest run of leading zeros seen in
+    the remaining bits. The registers take 2 ** precision bytes,
+    whatever the number of keys, and the estimate has a standard error
+    of about 1.04 / sqrt(2 ** precision). Small cardinalities are
+    estimated by linear counting of the empty registers.
+
+    Merging two sketches keeps the largest of each pair of registers,
+    and gives the sketch of the union of their streams. When NumPy is
+    available, add_many updates the registers in vectorized passes.
+    """
+
+    _MINIMUM_PRECISION = 4
+    _MAXIMUM_PRECISION = 18
+
+    def __init__(
+        self, precision: int = 14, hasher: Union[str, Hasher] = None
+    ):
+        self._enforce_valid_precision(precision)
+        self._precision = precision
+        self._registers = bytearray(1 << precision)
+        self._hasher = get_hasher(
+            DeterministicHasher.mode if hasher is None else hasher
+        )
+
+    def _enforce_valid_precision(self, precision: int):
+        if not isinstance(precision, int) or isinstance(precision, bool):
+            raise TypeError(
+                f"Inappropriate type '{get_class_name(precision)}' "
+                "for precision. Should be 'int'."
+            )
+        minimum, maximum = self._MINIMUM_PRECISION, self._MAXIMUM_PRECISION
+        if not minimum <= precision <= maximum:
+            raise ValueError(
+                f"Precision value should be between {minimum} and "
+                f"{maximum} (both ends included)."
+            )
+
+    def _shape(self) -> Tuple:
+        return (self._precision,)
+
+    @property
+    def precision(self) -> int:
+        """The number of hash bits that pick a register."""
+        return self._precision
+
+    @property
+    def error_rate(self) -> float:
+        """The standard error of the estimates, relative to the true
+        number of distinct keys.
+        """
+        return 1.04 / sqrt(len(self._registers))
+
+    def _add_hash(self, key_hash: int):
+        remaining_bits = 64 - self._precision
+        index = key_hash >> remaining_bits
+        rest = key_hash & ((1 << remaining_bits) - 1)
+        rank = remaining_bits - rest.bit_length() + 1
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+
+    def add(self, key: Hashable):
+        """Adds key to the stream."""
+        self._add_hash(self._key_hash(key))
+
+    def add_many(self, keys: Iterable):
+        """Adds all the keys of an iterable, or of a NumPy array,
+        to the stream.
+        """
+        key_hashes = self._key_hashes(keys)
+        if np is None:
+            for key_hash in key_hashes:
+                self._add_hash(key_hash)
+            return
+        if not len(key_hashes):
+            return
+        hashes = np.asarray(key_hashes, dtype=np.uint64)
+        remaining_bits = 64 - self._precision
+        indexes = (hashes >> np.uint64(remaining_bits)).astype(np.int64)
+        rest = hashes & np.uint64((1 << remaining_bits) - 1)
+        ranks = remaining_bits - _bit_length_array(rest) + 1
+        registers = np.frombuffer(self._registers, dtype=np.uint8)
+        np.maximum.at(registers, indexes, ranks.astype(np.uint8))
+
+    def count(self) -> int:
+        """Returns the estimated number of distinct keys added."""
+        registers = self._registers
+        size = len(registers)
+        if size >= 128:
+            alpha = 0.7213 / (1 + 1.079 / size)
+        else:
+            alpha = {16: 0.673, 32: 0.697, 64: 0.709}[size]
+        estimate = alpha * size * size / sum(2.0**-r for r in registers)
+        empty_registers = registers.count(0)
+        if estimate <= 2.5 * size and empty_registers:
+            estimate = size * log(size / empty_registers)
+        return round(estimate)
+
+    def merge(self, *others: "HyperLogLog"):
+        """Merges other sketches, which must have the same precision and
+        hashing, into this one, which then counts the union of their
+        streams.
+        """
+        for other in others:
+            self._enforce_mergeable(other)
+        registers = self._registers
+        for other in others:
+            for index, rank in enumerate(other._registers):
+                if rank > registers[index]:
+                    registers[index] = rank
+
+    def __repr__(self) -> str:
+        return (
+            f"<{get_class_name(self)}: about {self.count()} distinct keys, "
+            f"precision={self._precision}>"
+        )
+
+
+class CountMinSketch(_Sketch):
+    """Count-Min sketch of the number of times each key of a stream was
+    added.
+
+    Counters are laid out in depth rows of width columns, and every key
+    adds its count to one counter per row, picked by double hashing.
+    The estimate of a key is the smallest of its counters, so it never
+    falls below the true count, and it exceeds it by more than
+    e / width times the total count with a probability of at most
+    exp(-depth).
+
+    Merging two sketches adds their counters, and gives the sketch of
+    both streams together. When NumPy is available, add_many and
+    estimate_many update and read the counters in vectorized passes.
+    """
+
+    def __init__(
+        self,
+        width: int = 2048,
+        depth: int = 5,
+        hasher: Union[str, Hasher] = None,
+    ):
+        _enforce_positive_int(width, "width")
+        _enforce_positive_int(depth, "depth")
+        self._width = width
+        self._depth = depth
+        self._counters = array("Q", [0]) * (width * depth)
+        self._total = 0
+        self._hasher = get_hasher(
+            DeterministicHasher.mode if hasher is None else hasher
+        )
+
+    def _shape(self) -> Tuple:
+        return (self._width, self._depth)
+
+    @property
+    def width(self) -> int:
+        """The number of counters per row."""
+        return self._width
+
+    @property
+    def depth(self) -> int:
+        """The number of rows, each with its own counter for a key."""
+        return self._depth
+
+    @property
+    def total(self) -> int:
+        """The sum of the counts of all the keys added."""
+        return self._total
+
+    def _slots(self, key_hash: int) -> List[int]:
+        step = mix64(key_hash) | 1
+        width = self._width
+        return [
+            row * width + ((key_hash + row * step) & MASK_64) % width
+            for row in range(self._depth)
+        ]
+
+    def _slots_array(self, hashes: "np.ndarray") -> "np.ndarray":
+        step = _mix64_array(hashes) | np.uint64(1)
+        rows = np.arange(self._depth, dtype=np.uint64)
+        columns = (hashes[:, None] + rows * step[:, None]) % np.uint64(
+            self._width
+        )
+        return (rows * np.uint64(self._width) + columns).astype(np.int64)
+
+    def _add_hash(self, key_hash: int, count: int) -> int:
+        # Returns the new estimate of the key.
+        counters = self._counters
+        estimate = None
+        for slot in self._slots(key_hash):
+            counters[slot] += count
+            if estimate is None or counters[slot] < estimate:
+                estimate = counters[slot]
+        self._total += count
+        return estimate
+
+    def _estimate_hash(self, key_hash: int) -> int:
+        counters = self._counters
+        return min(counters[slot] for slot in self._slots(key_hash))
+
+    @staticmethod
+    def _enforce_valid_count(count: int):
+        if not isinstance(count, int) or isinstance(count, bool):
+            raise TypeError(
+                f"Inappropriate type '{get_class_name(count)}' "
+                "for count. Should be 'int'."
+            )
+        if count < 0:
+            raise ValueError("Count should be >= 0.")
+
+    def add(self, key: Hashable, count: int = 1) -> int:
+        """Adds count occurrences of key to the stream, and returns its
+        new estimate.
+        """
+        self._enforce_valid_count(count)
+        return self._add_hash(self._key_hash(key), count)
+
+    def _counts(self, counts, number_of_keys: int) -> List[int]:
+        if counts is None:
+            return [1] * number_of_keys
+        if np is not None and isinstance(counts, np.ndarray):
+            counts = counts.ravel().tolist()
+        counts = list(counts)
+        if len(counts) != number_of_keys:
+            raise ValueError("There should be one count per key.")
+        for count in counts:
+            self._enforce_valid_count(count)
+        return counts
+
+    def add_many(self, keys: Iterable, counts: Iterable = None):
+        """Adds all the keys of an iterable, or of a NumPy array, to the
+        stream, each with the count in the same position of counts, or
+        once if no counts are given.
+        """
+        key_hashes = self._key_hashes(keys)
+        counts = self._counts(counts, len(key_hashes))
+        if np is None:
+            for key_hash, count in zip(key_hashes, counts):
+                self._add_hash(key_hash, count)
+            return
+        if not len(key_hashes):
+            return
+        slots = self._slots_array(np.asarray(key_hashes, dtype=np.uint64))
+        increments = np.repeat(
+            np.array(counts, dtype=np.uint64), self._depth
+        )
+        counters = np.frombuffer(self._counters, dtype=np.uint64)
+        np.add.at(counters, slots.ravel(), increments)
+        self._total += sum(counts)
+
+    def estimate(self, key: Hashable) -> int:
+        """Returns the estimated number of occurrences of key, which is
+        never below the true one.
+        """
+        return self._estimate_hash(self._key_hash(key))
+
+    def __getitem__(self, key: Hashable) -> int:
+        return self.estimate(key)
+
+    def estimate_many(self, keys: Iterable) -> List[int]:
+        """Returns a list with the estimate of each of the keys, of an
+        iterable or of a NumPy array, in the same order.
+        """
+        key_hashes = self._key_hashes(keys)
+        if np is None:
+            return [self._estimate_hash(key_hash) for key_hash in key_hashes]
+        if not len(key_hashes):
+            return []
+        return self._estimate_array(
+            np.asarray(key_hashes, dtype=np.uint64)
+        ).tolist()
+
+    def _estimate_array(self, hashes: "np.ndarray") -> "np.ndarray":
+        counters = np.frombuffer(self._counters, dtype=np.uint64)
+        return counters[self._slots_array(hashes)].min(axis=1)
+
+    def merge(self, *others: "CountMinSketch"):
+        """Merges other sketches, which must have the same width, depth
+        and hashing, into this one, which then counts the keys of all
+        their streams.
+        """
+        for other in others:
+            self._enforce_mergeable(other)
+        counters = self._counters
+        for other in others:
+            for slot, count in enumerate(other._counters):
+                counters[slot] += count
+            self._total += other._total
+
+    def __repr__(self) -> str:
+        return (
+            f"<{get_class_name(self)}: {self._total} total, "
+            f"width={self._width}, depth={self._depth}>"
+        )
+
+
+class HeavyHitters:
+    """Tracks the k most frequent keys of a stream, along with a
+    Count-Min sketch of the counts of all its keys.
+
+    The candidates and their estimates are kept in a HashMap, and in
+    a heap that gives the candidate with the lowest estimate, which
+    a key leaves its place to once its own estimate is higher. As
+    estimates only go up, heap entries whose estimate is outdated are
+    skipped, and the heap is rebuilt when they pile up.
+
+    Merging merges the sketches, then keeps the k keys, among the
+    candidates of both trackers, with the highest merged estimates.
+    """
+
+    def __init__(
+        self,
+        k: int = 10,
+        width: int = 2048,
+        depth: int = 5,
+        hasher: Union[str, Hasher] = None,
+    ):
+        _enforce_positive_int(k, "k")
+        self._k = k
+        self._sketch = CountMinSketch(width, depth, hasher)
+        self._estimates = HashMap(hasher=self._sketch.hasher)
+        self._heap: List[Tuple[int, int, Hashable]] = []
+        self._pushes = 0
+
+    @property
+    def k(self) -> int:
+        """The number of keys tracked."""
+        return self._k
+
+    @property
+    def sketch(self) -> CountMinSketch:
+        """The Count-Min sketch of the counts of all the keys."""
+        return self._sketch
+
+    @property
+    def hasher(self) -> Hasher:
+        """The hasher used to compute the prehash of the keys."""
+        return self._sketch.hasher
+
+    def _push(self, key: Hashable, estimate: int):
+        # The push number breaks ties, so keys are never compared.
+        self._pushes += 1
+        heapq.heappush(self._heap, (estimate, self._pushes, key))
+        if len(self._heap) > 4 * self._k + 64:
+            self._heap = [
+                (estimate, order, key)
+                for order, (key, estimate) in enumerate(
+                    self._estimates.items()
+                )
+            ]
+            heapq.heapify(self._heap)
+
+    def _lowest(self) -> Tuple[int, Hashable]:
+        heap, estimates = self._heap, self._estimates
+        while heap[0][0] != estimates.get(heap[0][2]):
+            heapq.heappop(heap)
+        return heap[0][0], heap[0][2]
+
+    def _offer(self, key: Hashable, estimate: int):
+        estimates = self._estimates
+        current = estimates.get(key)
+        if current is not None:
+            if estimate != current:
+                estimates[key] = estimate
+                self._push(key, estimate)
+            return
+        if len(estimates) == self._k:
+            lowest_estimate, lowest_key = self._lowest()
+            if estimate <= lowest_estimate:
+                return
+            del estimates[lowest_key]
+            heapq.heappop(self._heap)
+        estimates[key] = estimate
+        self._push(key, estimate)
+
+    def add(self, key: Hashable, count: int = 1):
+        """Adds count occurrences of key to the stream."""
+        self._offer(key, self._sketch.add(key, count))
+
+    def add_many(self, keys: Iterable, counts: Iterable = None):
+        """Adds all the keys of an iterable, or of a NumPy array, to the
+        stream, each with the count in the same position of counts, or
+        once if no counts are given.
+        """
+        if np is not None and isinstance(keys, np.ndarray):
+            keys = keys.ravel()
+            key_list = keys.tolist()
+        else:
+            HashMap._enforce_iterable(keys)
+            keys = key_list = list(keys)
+        self._sketch.add_many(keys, counts)
+        # Each distinct key is offered once the whole batch is counted.
+        distinct_keys = list(dict.fromkeys(key_list))
+        estimates = self._sketch.estimate_many(distinct_keys)
+        for key, estimate in zip(distinct_keys, estimates):
+            self._offer(key, estimate)
+
+    def top(self) -> List[Tuple[Hashable, int]]:
+        """Returns the tracked keys with their estimated counts, from the
+        most frequent one.
+        """
+        return sorted(
+            self._estimates.items(), key=lambda item: item[1], reverse=True
+        )
+
+    def merge(self, *others: "HeavyHitters"):
+        """Merges other trackers, which must track as many keys, with
+        sketches of the same size and hashing, into this one.
+        """
+        for other in others:
+            if not isinstance(other, HeavyHitters):
+                raise TypeError(
+                    f"Inappropriate type '{get_class_name(other)}' for "
+                    "tracker. Should be 'HeavyHitters'."
+                )
+            if other._k != self._k:
+                raise ValueError("Only trackers of the same k can be merged.")
+        self._sketch.merge(*(other._sketch for other in others))
+        candidates = HashMap(hasher=self._sketch.hasher)
+        for tracker in (self, *others):
+            candidates.update(tracker._estimates.items())
+        candidates = list(candidates)
+        self._estimates = HashMap(hasher=self._sketch.hasher)
+        self._heap = []
+        estimates = self._sketch.estimate_many(candidates)
+        for key, estimate in zip(candidates, estimates):
+            self._offer(key, estimate)
+
+    def __repr__(self) -> str:
+        return (
+            f"<{get_class_name(self)}: k={self._k}, "
+            f"{self._sketch.total} total>"
+        )
@@ -0,0 +1,158 @@
+"""The HashMap statistics module."""
+
+from collections import namedtuple
+from time import perf_counter
+from typing import Any, Callable, Dict, Tuple, Union
+
+from .hashmap import HashMap
+
+
+HashMapStats = namedtuple(
+    "HashMapStats",
+    [
+        "capacity",
+        "entries",
+        "load",
+        "length_histogram",
+        "linked_list_buckets",
+        "tree_buckets",
+        "resizes",
+        "resize_time",
+        "hash_calls",
+        "hash_time",
+        "gets",
+        "sets",
+        "deletes",
+        "misses",
+    ],
+)
+
+
+class _StatsCounters:
+    __slots__ = (
+        "resizes",
+        "resize_time",
+        "hash_calls",
+        "hash_time",
+        "gets",
+        "sets",
+        "deletes",
+        "misses",
+    )
+
+    def __init__(self):
+        self.resizes = 0
+        self.resize_time = 0.0
+        self.hash_calls = 0
+        self.hash_time = 0.0
+        self.gets = 0
+        self.sets = 0
+        self.deletes = 0
+        self.misses = 0
+
+
+class _CountingHashMap(HashMap):
+    """Mixin placed before a HashMap class, whose operations update the
+    counters of the map. It derives from HashMap, which every backend
+    derives from too, so HashMap comes after the backend in the MRO.
+
+    Maps switch to a counting class, and back, by changing their class,
+    so that maps that do not count pay nothing for it. Lookups all go
+    through _find_entry, and writes through _set_entry and
+    _delete_entry, where they are counted, so the operations that
+    backends optimize around those hooks use the generic HashMap ones.
+    """
+
+    _UNCOUNTED_CLASS: type
+    _stats_counters: _StatsCounters
+
+    def __init__(self, *args, **kwargs):
+        # Maps created from a counting map, such as its copies,
+        # count too.
+        self._stats_counters = _StatsCounters()
+        super().__init__(*args, **kwargs)
+
+    def _key_hash(self, key) -> int:
+        counters = self._stats_counters
+        start = perf_counter()
+        try:
+            return super()._key_hash(key)
+        finally:
+            counters.hash_time += perf_counter() - start
+            counters.hash_calls += 1
+
+    def _resize_to(self, new_map_size: int):
+        counters = self._stats_counters
+        start = perf_counter()
+        try:
+            super()._resize_to(new_map_size)
+        finally:
+            counters.resize_time += perf_counter() - start
+            counters.resizes += 1
+
+    def _find_entry(self, key, prehash: int) -> Union[Tuple, None]:
+        counters = self._stats_counters
+        counters.gets += 1
+        entry = super()._find_entry(key, prehash)
+        if entry is None:
+            counters.misses += 1
+        return entry
+
+    def __getitem__(self, key):
+        entry = self._find_entry(key, self._key_hash(key))
+        if entry is None:
+            raise KeyError("Mapping key not found.")
+        return entry[1]
+
+    __contains__ = HashMap.__contains__
+    get_many = HashMap.get_many
+
+    def _compute_entry(self, key, prehash: int, compute: Callable) -> Any:
+        # Backends look the key up and write it in a single pass, which
+        # counts as a get, and as a set unless the value is unchanged.
+        counters = self._stats_counters
+        counters.gets += 1
+
+        def counted_compute(found: bool, value) -> Any:
+            new_value = compute(found, value)
+            if not found:
+                counters.misses += 1
+            if not found or new_value is not value:
+                counters.sets += 1
+            return new_value
+
+        return super()._compute_entry(key, prehash, counted_compute)
+
+    def _set_entry(self, key, value, prehash: int):
+        self._stats_counters.sets += 1
+        super()._set_entry(key, value, prehash)
+
+    def _delete_entry(self, key, prehash: int) -> Tuple:
+        self._stats_counters.deletes += 1
+        return super()._delete_entry(key, prehash)
+
+    def __reduce__(self):
+        # Counting classes are made at runtime, so counting maps are
+        # pickled as maps of their uncounted class.
+        return (object.__new__, (self._UNCOUNTED_CLASS,), self.__dict__)
+
+
+_COUNTING_CLASSES: Dict[type, type] = {}
+
+
+def counting_class(cls: type) -> type:
+    """Returns the counting subclass of a HashMap class."""
+    counting_cls = _COUNTING_CLASSES.get(cls)
+    if counting_cls is None:
+        counting_cls = type(
+            cls.__name__,
+            (_CountingHashMap, cls),
+            {
+                "__slots__": (),
+                "__module__": cls.__module__,
+                "__qualname__": cls.__qualname__,
+                "_UNCOUNTED_CLASS": cls,
+            },
+        )
+        _COUNTING_CLASSES[cls] = counting_cls
+    return counting_cls
@@ -0,0 +1,293 @@
+"""The SwissHashMap class module."""
+
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Tuple,
+    Union,
+)
+
+from .hashmap import HashMap
+from ..tools.tools import get_class_name
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+GROUP_SIZE = 16
+EMPTY = 0x80
+DELETED = 0xFE
+H2_MASK = 0x7F
+
+
+class SwissHashMap(HashMap):
+    """HashMap backend modeled on SwissTable, meant for read-heavy maps.
+
+    Besides the flat lists of keys, values and prehashes, every slot
+    has a control byte: the lowest 7 bits of the prehash (h2) when it
+    is full, or a marker when it is empty or deleted. Slots are probed
+    by groups of 16, and a single bytearray search over the group's
+    control bytes finds the candidate slots before any key is compared.
+    A probe sequence stops at the first group with an empty slot.
+
+    When NumPy is available, get_many matches the control bytes of all
+    the requested keys in a few vectorized passes.
+    """
+
+    _MINIMUM_MAP_SIZE = GROUP_SIZE
+    _HAS_SPLITTABLE_BUCKETS = False
+
+    def _get_size_with_load_margin(self, n: int) -> int:
+        # Capacities are always a whole number of groups.
+        size = super()._get_size_with_load_margin(n)
+        return -(-size // GROUP_SIZE) * GROUP_SIZE
+
+    def _allocate_buckets(self, map_size: int):
+        map_size = -(-map_size // GROUP_SIZE) * GROUP_SIZE
+        self._ctrl = bytearray([EMPTY]) * map_size
+        self._keys: List = [None] * map_size
+        self._values: List = [None] * map_size
+        self._hashes: List = [None] * map_size
+        self._number_of_groups = map_size // GROUP_SIZE
+        self._number_of_tombstones = 0
+
+    @property
+    def _capacity(self) -> int:
+        return len(self._keys)
+
+    def _find_slot(self, key, prehash: int) -> int:
+        """Returns the slot holding key, or -1 if key is not found."""
+        ctrl, keys, hashes = self._ctrl, self._keys, self._hashes
+        number_of_groups = self._number_of_groups
+        h2 = prehash & H2_MASK
+        group = (prehash >> 7) % number_of_groups
+        for _ in range(number_of_groups):
+            start = group * GROUP_SIZE
+            end = start + GROUP_SIZE
+            index = ctrl.find(h2, start, end)
+            while index != -1:
+                if hashes[index] == prehash and (
+                    keys[index] is key or keys[index] == key
+                ):
+                    return index
+                index = ctrl.find(h2, index + 1, end)
+            if ctrl.find(EMPTY, start, end) != -1:
+                return -1
+            group = group + 1 if group + 1 < number_of_groups else 0
+        return -1
+
+    def _find_free_slot(self, prehash: int) -> int:
+        ctrl = self._ctrl
+        number_of_groups = self._number_of_groups
+        group = (prehash >> 7) % number_of_groups
+        while True:
+            start = group * GROUP_SIZE
+            end = start + GROUP_SIZE
+            empty = ctrl.find(EMPTY, start, end)
+            deleted = ctrl.find(DELETED, start, end)
+            if empty != -1 or deleted != -1:
+                if deleted == -1 or (empty != -1 and empty < deleted):
+                    return empty
+                return deleted
+            group = group + 1 if group + 1 < number_of_groups else 0
+
+    def _insert_new(self, key, value, prehash: int):
+        index = self._find_free_slot(prehash)
+        if self._ctrl[index] == DELETED:
+            self._number_of_tombstones -= 1
+        self._ctrl[index] = prehash & H2_MASK
+        self._keys[index] = key
+        self._values[index] = value
+        self._hashes[index] = prehash
+
+    def _remove_slot(self, index: int):
+        start = index - index % GROUP_SIZE
+        # A probe sequence never goes past a group with an empty slot,
+        # so the slot can be emptied. Otherwise, later probes may need
+        # to go through this group, and a tombstone is left instead.
+        if self._ctrl.find(EMPTY, start, start + GROUP_SIZE) != -1:
+            self._ctrl[index] = EMPTY
+        else:
+            self._ctrl[index] = DELETED
+            self._number_of_tombstones += 1
+        self._keys[index] = self._values[index] = None
+        self._hashes[index] = None
+
+    def _is_insert_overloading(self) -> bool:
+        # Tombstones lengthen probe sequences just like full slots, so
+        # they count towards the load. Resizing gets rid of them.
+        used = self._number_of_entries + self._number_of_tombstones + 1
+        return self._is_load_high(used / len(self._keys))
+
+    def __getitem__(self, key):
+        index = self._find_slot(key, self._key_hash(key))
+        if index < 0:
+            raise KeyError("Mapping key not found.")
+        return self._values[index]
+
+    def _set_entry(self, key, value, prehash: int):
+        index = self._find_slot(key, prehash)
+        if index >= 0:
+            self._values[index] = value
+            return
+        self._add_entry(key, value, prehash)
+
+    def _add_entry(self, key, value, prehash: int):
+        if self._is_insert_overloading():
+            self._resize_list(1)
+        self._insert_new(key, value, prehash)
+        self._number_of_entries += 1
+        self._number_of_occupied_buckets += 1
+
+    def _key_at_slot(self, slot: int):
+        return self._keys[slot]
+
+    def _value_at_slot(self, slot: int):
+        return self._values[slot]
+
+    def _set_value_at_slot(self, slot: int, value):
+        self._values[slot] = value
+
+    _compute_entry = HashMap._compute_in_slot
+
+    def _delete_entry(self, key, prehash: int) -> Tuple:
+        index = self._find_slot(key, prehash)
+        if index < 0:
+            raise KeyError("Mapping key not found.")
+        entry = (self._keys[index], self._values[index], prehash)
+        self._remove_slot(index)
+        self._number_of_entries -= 1
+        self._number_of_deletions += 1
+        self._number_of_occupied_buckets -= 1
+        return entry
+
+    def __contains__(self, key) -> bool:
+        try:
+            prehash = self._key_hash(key)
+        except (TypeError, ValueError):
+            return False
+        return self._find_slot(key, prehash) >= 0
+
+    def _find_entry(self, key, prehash: int) -> Union[Tuple, None]:
+        index = self._find_slot(key, prehash)
+        if index < 0:
+            return None
+        return (self._keys[index], self._values[index], prehash)
+
+    def get_many(self, keys: Iterable, default: Any = None) -> List:
+        """Returns a list with the value of each of the keys, in the same
+        order, or default for the keys that are not in the hashmap.
+
+        When NumPy is available, the control bytes of all the keys are
+        matched in a few vectorized passes.
+        """
+        if np is None:
+            return super().get_many(keys, default)
+        self._enforce_iterable(keys)
+        keys = list(keys)
+        if not keys:
+            return []
+        prehashes = [self._key_hash(key) for key in keys]
+        return self._get_many_vectorized(keys, prehashes, default)
+
+    def _get_many_vectorized(
+        self, keys: List, prehashes: List[int], default: Any
+    ) -> List:
+        number_of_groups = self._number_of_groups
+        stored_keys, stored_hashes = self._keys, self._hashes
+        values = self._values
+        results = [default] * len(keys)
+        found = np.zeros(len(keys), dtype=bool)
+        h2 = np.array([p & H2_MASK for p in prehashes], dtype=np.uint8)
+        groups = np.array(
+            [(p >> 7) % number_of_groups for p in prehashes], dtype=np.int64
+        )
+        ctrl = np.frombuffer(self._ctrl, dtype=np.uint8).reshape(
+            number_of_groups, GROUP_SIZE
+        )
+        pending = np.arange(len(keys))
+        # Every pass compares the current group of all the pending keys
+        # at once; keys move on to the next group only while their probe
+        # sequence is not over.
+        for _ in range(number_of_groups):
+            rows = ctrl[groups[pending]]
+            matches, columns = np.nonzero(rows == h2[pending, None])
+            slots = groups[pending[matches]] * GROUP_SIZE + columns
+            for i, slot in zip(pending[matches].tolist(), slots.tolist()):
+                if found[i]:
+                    continue
+                key = keys[i]
+                if stored_hashes[slot] == prehashes[i] and (
+                    stored_keys[slot] is key or stored_keys[slot] == key
+                ):
+                    results[i] = values[slot]
+                    found[i] = True
+            has_empty = (rows == EMPTY).any(axis=1)
+            pending = pending[~found[pending] & ~has_empty]
+            if not pending.size:
+                break
+            groups[pending] = (groups[pending] + 1) % number_of_groups
+        del ctrl
+        return results
+
+    def _iter_entries(self) -> Iterator[Tuple]:
+        for entry in zip(self._keys, self._values, self._hashes):
+            if entry[0] is not None:
+                yield entry
+
+    def _bucket_lists(self) -> List[List]:
+        return []
+
+    def _length_histogram(self) -> Dict[int, int]:
+        # The number of entries per probe length, in groups, from 1
+        # for entries in their home group.
+        histogram: Dict[int, int] = {}
+        number_of_groups = self._number_of_groups
+        for index, prehash in enumerate(self._hashes):
+            if prehash is not None:
+                home = (prehash >> 7) % number_of_groups
+                length = (index // GROUP_SIZE - home) % number_of_groups + 1
+                histogram[length] = histogram.get(length, 0) + 1
+        return dict(sorted(histogram.items()))
+
+    def _scan_tables(self) -> List[Tuple[int, Callable]]:
+        # Home buckets are groups, picked by the bits of the prehash
+        # above the seven of the control bytes.
+        ctrl, keys, hashes = self._ctrl, self._keys, self._hashes
+        values = self._values
+        number_of_groups = self._number_of_groups
+
+        def home_entries(home: int) -> Iterator[Tuple]:
+            group = home
+            for _ in range(number_of_groups):
+                start = group * GROUP_SIZE
+                end = start + GROUP_SIZE
+                for index in range(start, end):
+                    if (
+                        keys[index] is not None
+                        and (hashes[index] >> 7) % number_of_groups == home
+                    ):
+                        yield (keys[index], values[index], hashes[index])
+                if ctrl.find(EMPTY, start, end) != -1:
+                    return
+                group = group + 1 if group + 1 < number_of_groups else 0
+
+        return [(number_of_groups, home_entries)]
+
+    def _place_entry(self, entry: Tuple):
+        self._insert_new(*entry)
+        self._number_of_entries += 1
+        self._number_of_occupied_buckets += 1
+
+    def __repr__(self) -> str:
+        slots = [
+            None if key is None else (key, value)
+            for key, value in zip(self._keys, self._values)
+        ]
+        return f"<{get_class_name(self)}: {slots}>"
@@ -0,0 +1,142 @@
+"""The TreeBucket class module."""
+
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Iterator, List, Tuple, Union
+
+from ..tools.tools import get_class_name
+
+
+# Types whose values, NaN aside, are totally ordered by <.
+_ORDERED_TYPES = (int, str, bytes, float)
+
+
+class TreeBucket:
+    """Ordered bucket used by HashMap for chains that grew too long.
+
+    Entries are (key, value, prehash) tuples kept sorted by prehash
+    and, among entries with the same prehash, by key. Lookups binary
+    search the prehashes, so they take O(log k) comparisons instead
+    of walking a chain of k entries.
+
+    Keys are only ordered while they all have the same type, among
+    types whose values are totally ordered (a NaN float is not). Other
+    types, such as frozensets, whose < is a subset test, may compare
+    without error and still not sort, so as soon as a key of another
+    type is inserted, entries with equal prehashes are scanned linearly
+    instead.
+    """
+
+    def __init__(self, entries: Iterable[Tuple] = ()):
+        self._keys: List = []
+        self._values: List = []
+        self._hashes: List[int] = []
+        self._key_type: Union[type, None] = None
+        self._keys_are_ordered = True
+        for entry in entries:
+            self.insert(entry)
+
+    def _is_ordered_with(self, key) -> bool:
+        # Whether key sorts with the keys of the bucket. The equality
+        # test rules out NaN, the only float that breaks the order.
+        return (
+            self._keys_are_ordered
+            and type(key) is self._key_type
+            and key == key
+        )
+
+    def _locate(self, key, prehash: int) -> Tuple[int, bool]:
+        """Returns the index where key is, or where it should be
+        inserted, and whether it was found.
+        """
+        hashes, keys = self._hashes, self._keys
+        start = bisect_left(hashes, prehash)
+        end = bisect_right(hashes, prehash, start)
+        if self._is_ordered_with(key):
+            index = bisect_left(keys, key, start, end)
+            return index, index < end and keys[index] == key
+        for index in range(start, end):
+            if keys[index] is key or keys[index] == key:
+                return index, True
+        return end, False
+
+    def find(self, key, prehash: int) -> Union[Tuple, None]:
+        """Returns the entry of key, or None if key is not found."""
+        index, found = self._locate(key, prehash)
+        if not found:
+            return None
+        return (self._keys[index], self._values[index], prehash)
+
+    def find_index(self, key, prehash: int) -> int:
+        """Returns the index of the entry of key, or -1 if key is not
+        found.
+        """
+        index, found = self._locate(key, prehash)
+        return index if found else -1
+
+    def entry_at(self, index: int) -> Tuple:
+        """Returns the entry at index."""
+        return (self._keys[index], self._values[index], self._hashes[index])
+
+    def set_value_at(self, index: int, value):
+        """Replaces the value of the entry at index."""
+        self._values[index] = value
+
+    def set(self, entry: Tuple) -> bool:
+        """Sets the entry, replacing the one with the same key if any.
+
+        Returns whether the key is new to the bucket.
+        """
+        key, value, prehash = entry
+        index, found = self._locate(key, prehash)
+        if found:
+            self._keys[index] = key
+            self._values[index] = value
+            return False
+        self._insert_at(index, entry)
+        return True
+
+    def insert(self, entry: Tuple):
+        """Inserts an entry whose key is known not to be in the bucket."""
+        key, _, prehash = entry
+        if self._is_ordered_with(key):
+            index, _ = self._locate(key, prehash)
+        else:
+            # Unordered keys go after those with the same prehash,
+            # which they need not be compared with.
+            index = bisect_right(self._hashes, prehash)
+        self._insert_at(index, entry)
+
+    def _insert_at(self, index: int, entry: Tuple):
+        key, value, prehash = entry
+        if not self._keys and type(key) in _ORDERED_TYPES:
+            self._key_type = type(key)
+        if not self._is_ordered_with(key):
+            self._keys_are_ordered = False
+        self._keys.insert(index, key)
+        self._values.insert(index, value)
+        self._hashes.insert(index, prehash)
+
+    def remove(self, key, prehash: int) -> Tuple:
+        """Removes the entry of key and returns it.
+
+        Raises KeyError if key is not found.
+        """
+        index, found = self._locate(key, prehash)
+        if not found:
+            raise KeyError("Mapping key not found.")
+        entry = (self._keys.pop(index), self._values.pop(index), prehash)
+        del self._hashes[index]
+        if not self._keys:
+            self._key_type = None
+            self._keys_are_ordered = True
+        return entry
+
+    def __iter__(self) -> Iterator[Tuple]:
+        return zip(self._keys, self._values, self._hashes)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        pairs = list(zip(self._keys, self._values))
+        return f"{get_class_name(self)}({pairs})"
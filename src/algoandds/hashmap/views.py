@@ -0,0 +1,65 @@
+"""Live views over the keys, values and items of a HashMap."""
+
+from collections.abc import ItemsView, KeysView, ValuesView
+from typing import Iterator
+
+from ..tools.tools import get_class_name
+
+
+class _HashMapView:
+    # The views keep a reference to the hashmap only, so they always
+    # reflect its current contents. Entries are read straight from the
+    # buckets, and no key is hashed again while iterating.
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return f"{get_class_name(self)}({list(self)})"
+
+
+class HashMapKeysView(_HashMapView, KeysView):
+    """Set-like view of the keys of a HashMap."""
+
+    __slots__ = ()
+
+    def __iter__(self) -> Iterator:
+        for entry in self._mapping._iter_entries():
+            yield entry[0]
+
+
+class HashMapValuesView(_HashMapView, ValuesView):
+    """View of the values of a HashMap."""
+
+    __slots__ = ()
+
+    def __iter__(self) -> Iterator:
+        for entry in self._mapping._iter_entries():
+            yield entry[1]
+
+    def __contains__(self, value) -> bool:
+        for entry in self._mapping._iter_entries():
+            if entry[1] is value or entry[1] == value:
+                return True
+        return False
+
+
+class HashMapItemsView(_HashMapView, ItemsView):
+    """Set-like view of the (key, value) pairs of a HashMap."""
+
+    __slots__ = ()
+
+    def __iter__(self) -> Iterator:
+        for entry in self._mapping._iter_entries():
+            yield (entry[0], entry[1])
+
+    def __contains__(self, item) -> bool:
+        try:
+            key, value = item
+        except (TypeError, ValueError):
+            return False
+        try:
+            stored_value = self._mapping[key]
+        except (KeyError, TypeError, ValueError):
+            # Keys that cannot be in the hashmap are not in the view.
+            return False
+        return stored_value is value or stored_value == value
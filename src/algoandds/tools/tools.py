@@ -24,6 +24,15 @@ def get_class_name(obj: Any) -> str:
     return getattr(type(obj), '__name__')
 
 
+# int.bit_count is only available from Python 3.10.
+if hasattr(int, "bit_count"):
+    popcount = int.bit_count
+else:
+
+    def popcount(value: int) -> int:
+        return bin(value).count("1")
+
+
 def generate_random_indexes(length: int) -> list:
     indexes = [i for i in range(length)]
     shuffle(indexes)
@@ -0,0 +1,218 @@
+import pytest
+
+from src.algoandds.hashmap import BoundedCache, memoize
+
+
+POLICIES = ["lru", "lfu", "slru"]
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "error"),
+    [
+        ({"maxsize": 0}, ValueError),
+        ({"maxsize": 1.0}, TypeError),
+        ({"maxsize": True}, TypeError),
+        ({"policy": "fifo"}, ValueError),
+        ({"policy": None}, TypeError),
+        ({"hasher": "unknown"}, ValueError),
+    ],
+)
+def test_wrong_arguments(kwargs, error):
+    with pytest.raises(error):
+        BoundedCache(**kwargs)
+
+
+@pytest.mark.parametrize("policy", POLICIES)
+def test_basic_operations(policy):
+    cache = BoundedCache(3, policy)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache["a"] == 1 and cache.get("c") is None
+    with pytest.raises(KeyError):
+        cache["c"]
+    cache["a"] = 10
+    assert cache.get("a") == 10
+    assert "b" in cache and "c" not in cache and len(cache) == 2
+    del cache["b"]
+    assert "b" not in cache and len(cache) == 1
+    with pytest.raises(KeyError):
+        del cache["b"]
+    assert (cache.hits, cache.misses, cache.evictions) == (2, 2, 0)
+
+
+@pytest.mark.parametrize("policy", POLICIES)
+def test_size_is_bounded(policy):
+    cache = BoundedCache(10, policy, hasher="keyed")
+    for i in range(1000):
+        cache[i] = i
+        cache.get(i // 2)
+    assert len(cache) == 10 and len(list(cache)) == 10
+    assert cache.evictions == 990
+    assert all(cache.get(key) == key for key in list(cache))
+
+
+def test_lru_evicts_least_recently_used():
+    cache = BoundedCache(3, "lru")
+    for key in "abc":
+        cache[key] = key
+    cache.get("a")
+    cache["d"] = "d"
+    assert list(cache) == ["c", "a", "d"]
+
+
+def test_lfu_evicts_least_frequently_used():
+    cache = BoundedCache(3, "lfu")
+    for key in "abc":
+        cache[key] = key
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+    cache["d"] = "d"
+    assert "c" not in cache
+    # Among entries used as often, the least recently used goes first.
+    cache["e"] = "e"
+    assert "d" not in cache
+    assert list(cache) == ["e", "b", "a"]
+    del cache["e"]
+    cache.get("b")
+    cache["f"] = "f"
+    cache["g"] = "g"
+    assert set(cache) == {"a", "b", "g"}
+
+
+def test_slru_protects_entries_used_again():
+    cache = BoundedCache(5, "slru")
+    cache["hot"] = 1
+    cache.get("hot")
+    # A scan of entries used once does not flush the protected one.
+    for i in range(100):
+        cache[f"scan{i}"] = i
+    assert "hot" in cache
+    for i in range(100):
+        cache[f"hot{i}"] = i
+        cache.get(f"hot{i}")
+    assert "hot" not in cache
+    assert len(cache) == 5
+
+
+def test_cache_info_and_clear():
+    cache = BoundedCache(2)
+    cache["a"] = 1
+    cache.get("a")
+    cache.get("b")
+    cache["b"] = 2
+    cache["c"] = 3
+    assert cache.cache_info() == (1, 1, 1, 2, 2)
+    cache.clear()
+    assert cache.cache_info() == (0, 0, 0, 2, 0)
+    assert repr(cache) == "<BoundedCache: policy=lru, maxsize=2, size=0>"
+
+
+@pytest.mark.parametrize("policy", POLICIES)
+@pytest.mark.parametrize("hasher", ["sha256", "keyed", "deterministic"])
+def test_memoize(policy, hasher):
+    calls = []
+
+    @memoize(maxsize=4, policy=policy, hasher=hasher)
+    def add(a, b=0):
+        calls.append((a, b))
+        return a + b
+
+    assert add(1, 2) == 3 and add(1, 2) == 3
+    assert add(1, b=2) == 3 and add(-5) == -5 and add("x", "y") == "xy"
+    assert add(1.0, 2) == 3
+    assert calls == [(1, 2), (1, 2), (-5, 0), ("x", "y")]
+    assert add.cache_info().hits == 2
+    assert add.cache.policy == policy
+    add.cache_clear()
+    add(1, 2)
+    assert len(calls) == 5
+
+
+class CountingKey:
+    # Key whose hashes and comparisons are counted, all keys colliding.
+    hashes = comparisons = 0
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __hash__(self) -> int:
+        CountingKey.hashes += 1
+        return 0
+
+    def __eq__(self, other) -> bool:
+        CountingKey.comparisons += 1
+        return isinstance(other, CountingKey) and self.name == other.name
+
+
+@pytest.mark.parametrize("policy", POLICIES)
+def test_get_or_compute(policy):
+    cache = BoundedCache(2, policy, hasher="keyed")
+    cache[CountingKey("a")] = 1
+    CountingKey.hashes = CountingKey.comparisons = 0
+    assert cache.get_or_compute(CountingKey("b"), lambda: 2) == 2
+    assert (CountingKey.hashes, CountingKey.comparisons) == (1, 1)
+    assert cache.get_or_compute(CountingKey("b"), lambda: 3) == 2
+    assert cache.get_or_compute(CountingKey("c"), lambda: 3) == 3
+    assert len(cache) == 2 and cache.cache_info()[:3] == (1, 2, 1)
+
+    def factory():
+        # Inserts the key being computed, and evicts another one.
+        cache["d"] = 4
+        cache["e"] = 5
+        return 6
+
+    assert cache.get_or_compute("d", factory) == 6
+    assert len(cache) == len(set(cache)) == 2 and cache["d"] == 6
+
+
+@pytest.mark.parametrize("policy", POLICIES)
+def test_unbounded_cache(policy):
+    cache = BoundedCache(None, policy)
+    for i in range(1000):
+        cache[i] = i
+        cache.get(i // 2)
+    assert len(cache) == 1000 and cache.evictions == 0
+    assert cache.maxsize is None and cache.cache_info().maxsize is None
+    assert sorted(cache) == list(range(1000))
+    cache.clear()
+    assert repr(cache) == (
+        f"<BoundedCache: policy={policy}, maxsize=None, size=0>"
+    )
+
+
+def test_memoize_without_arguments():
+    @memoize
+    def fibonacci(n):
+        return n if n < 2 else fibonacci(n - 1) + fibonacci(n - 2)
+
+    assert fibonacci(100) == 354224848179261915075
+    assert fibonacci.__name__ == "fibonacci"
+    assert fibonacci.cache_info().maxsize == 128
+    with pytest.raises(TypeError):
+        fibonacci([1])
+
+
+def test_functions_memoized_by_one_decorator():
+    decorator = memoize(16)
+
+    @decorator
+    def square(x):
+        return x**2
+
+    @decorator
+    def cube(x):
+        return x**3
+
+    assert square(3) == 9 and cube(3) == 27
+    assert square.cache is not cube.cache
+    assert square.cache_info().misses == cube.cache_info().misses == 1
+
+
+def test_unbounded_memoize():
+    @memoize(maxsize=None)
+    def fibonacci(n):
+        return n if n < 2 else fibonacci(n - 1) + fibonacci(n - 2)
+
+    assert fibonacci(120) == fibonacci(119) + fibonacci(118)
+    assert fibonacci.cache_info() == (120, 121, 0, None, 121)
@@ -0,0 +1,83 @@
+from secrets import randbelow
+import pytest
+
+from src.algoandds.hashmap import CompactHashMap, HashMap
+from src.algoandds.hashmap.compact import DUMMY, EMPTY, get_index_typecode
+
+
+@pytest.fixture
+def ch0():
+    return CompactHashMap()
+
+
+@pytest.fixture
+def ch4():
+    return CompactHashMap([(i, i * 2) for i in range(40)])
+
+
+@pytest.mark.parametrize(
+    ("map_size", "typecode"),
+    [(10, "b"), (128, "b"), (129, "h"), (32768, "h"), (32769, "i")],
+)
+def test_get_index_typecode(map_size, typecode):
+    assert get_index_typecode(map_size) == typecode
+
+
+def test_is_a_hashmap(ch4: CompactHashMap):
+    assert isinstance(ch4, HashMap)
+    assert dict(ch4.items()) == {i: i * 2 for i in range(40)}
+    assert len(ch4) == ch4._size == 40
+    assert ch4._capacity == 80
+    assert ch4._indices.typecode == "b"
+
+
+def test_iteration_follows_insertion_order(ch0: CompactHashMap):
+    keys = [randbelow(10**6) for _ in range(2000)]
+    for key in keys:
+        ch0[key] = -key
+    unique_keys = list(dict.fromkeys(keys))
+    assert list(ch0) == unique_keys
+    assert list(ch0.keys()) == unique_keys
+    assert list(ch0.values()) == [-key for key in unique_keys]
+    for key in unique_keys[::3]:
+        del ch0[key]
+    del unique_keys[::3]
+    ch0[unique_keys[0]] = 0
+    assert list(ch0) == unique_keys
+
+
+def test_getitem_setitem_delitem(ch0: CompactHashMap):
+    reference = {}
+    for _ in range(20000):
+        key = randbelow(3000)
+        action = randbelow(3)
+        if action == 0:
+            ch0[key] = reference[key] = randbelow(100)
+        elif action == 1 and key in reference:
+            del ch0[key]
+            del reference[key]
+        elif key in reference:
+            assert ch0[key] == reference[key]
+        else:
+            with pytest.raises(KeyError):
+                ch0[key]
+    assert dict(ch0.items()) == reference
+    assert list(ch0) == list(reference)
+
+
+def test_delete_leaves_holes_until_resize(ch4: CompactHashMap):
+    for k in range(10):
+        del ch4[k]
+    assert len(ch4._keys) == 40
+    assert ch4._keys[:10] == [None] * 10
+    assert list(ch4._indices).count(DUMMY) == 10
+    ch4._resize_list(0)
+    assert len(ch4._keys) == 30
+    assert DUMMY not in ch4._indices
+    assert list(ch4._indices).count(EMPTY) == ch4._capacity - 30
+    assert list(ch4) == list(range(10, 40))
+
+
+def test_repr():
+    assert repr(CompactHashMap()) == "<CompactHashMap: []>"
+    assert repr(CompactHashMap((1, "a"))) == "<CompactHashMap: [(1, 'a')]>"
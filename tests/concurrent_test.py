@@ -0,0 +1,123 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+
+from src.algoandds.hashmap import (
+    ConcurrentHashMap,
+    HashMap,
+    RobinHoodHashMap,
+    SwissHashMap,
+    CompactHashMap,
+    IncrementalHashMap,
+)
+
+
+BACKENDS = [
+    HashMap,
+    RobinHoodHashMap,
+    SwissHashMap,
+    CompactHashMap,
+    IncrementalHashMap,
+]
+
+
+@pytest.fixture(params=[False, True], ids=["locked", "lock-free reads"])
+def cm0(request):
+    return ConcurrentHashMap(hasher="keyed", lock_free_reads=request.param)
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "error"),
+    [
+        ({"number_of_shards": 0}, ValueError),
+        ({"number_of_shards": 2.0}, TypeError),
+        ({"number_of_shards": True}, TypeError),
+        ({"backend": dict}, TypeError),
+        ({"backend": HashMap()}, TypeError),
+        ({"lock_free_reads": 1}, TypeError),
+        ({"backend": IncrementalHashMap, "lock_free_reads": True}, ValueError),
+    ],
+)
+def test_wrong_arguments(kwargs, error):
+    with pytest.raises(error):
+        ConcurrentHashMap(**kwargs)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_basic_operations(backend):
+    cm = ConcurrentHashMap(
+        {i: i * 2 for i in range(1000)}, backend=backend, hasher="keyed"
+    )
+    assert len(cm) == 1000
+    assert cm[10] == 20
+    assert 999 in cm and 1000 not in cm and None not in cm
+    cm[1000] = 0
+    del cm[0]
+    assert cm.get(0) is None and cm.get(1000) == 0
+    with pytest.raises(KeyError):
+        cm[0]
+    with pytest.raises(KeyError):
+        del cm[0]
+    assert set(cm) == set(range(1, 1001))
+    assert all(len(shard) > 0 for shard in cm._shards)
+    assert all(shard.hasher is cm.hasher for shard in cm._shards)
+
+
+def test_keys_are_hashed_once_and_routed_by_prehash():
+    cm = ConcurrentHashMap({i: i for i in range(500)}, number_of_shards=8)
+    for index, shard in enumerate(cm._shards):
+        for _, _, prehash in shard._iter_entries():
+            assert cm._shard_index(prehash) == index
+
+
+def test_compound_operations(cm0: ConcurrentHashMap):
+    assert cm0.setdefault("a", 1) == 1
+    assert cm0.setdefault("a", 2) == 1
+    assert cm0.get_or_compute("b", list) == []
+    assert cm0.merge("c", "x", str.__add__) == "x"
+    assert cm0.merge("c", "y", str.__add__) == "xy"
+    assert cm0.increment("d") == 1
+    assert cm0.pop("d") == 1
+    assert cm0.pop("d", None) is None
+    with pytest.raises(KeyError):
+        cm0.pop("d")
+
+
+def test_batch_operations(cm0: ConcurrentHashMap):
+    cm0.set_many((i, -i) for i in range(200))
+    cm0.update((200, -200))
+    assert cm0.get_many([5, 300, 200], default=0) == [-5, 0, -200]
+    snapshot = cm0.snapshot()
+    assert isinstance(snapshot, HashMap)
+    assert dict(snapshot.items()) == {i: -i for i in range(201)}
+    cm0[0] = "changed"
+    assert snapshot[0] == 0
+
+
+@pytest.mark.parametrize("lock_free_reads", [False, True])
+def test_concurrent_increments_are_atomic(lock_free_reads):
+    cm = ConcurrentHashMap(hasher="keyed", lock_free_reads=lock_free_reads)
+    keys = [f"key:{i % 50}" for i in range(2000)]
+
+    def work(worker: int):
+        for key in keys:
+            cm.increment(key)
+            cm.get(key)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(work, range(8)))
+    assert len(cm) == 50
+    assert all(cm[f"key:{i}"] == 8 * 40 for i in range(50))
+
+
+def test_lock_free_reads_see_published_snapshots():
+    cm = ConcurrentHashMap({1: "a"}, lock_free_reads=True, hasher="keyed")
+    index = cm._shard_index(cm._key_hash(1))
+    shard = cm._shards[index]
+    cm[1] = "b"
+    assert cm._shards[index] is not shard
+    assert shard[1] == "a" and cm[1] == "b"
+
+
+def test_repr():
+    cm = ConcurrentHashMap({1: 1}, number_of_shards=4)
+    assert repr(cm) == "<ConcurrentHashMap: 1 entries in 4 HashMap shards>"
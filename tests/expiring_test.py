@@ -0,0 +1,194 @@
+import random
+
+import pytest
+
+from src.algoandds.hashmap import ExpiringHashMap
+
+
+class FakeClock:
+    def __init__(self, time: float = 0.0):
+        self.time = time
+
+    def __call__(self) -> float:
+        return self.time
+
+    def advance(self, seconds: float):
+        self.time += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock(1000.0)
+
+
+@pytest.fixture
+def em0(clock):
+    return ExpiringHashMap(ttl=10, clock=clock)
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "error"),
+    [
+        ({"ttl": 0}, ValueError),
+        ({"ttl": "10"}, TypeError),
+        ({"ttl": True}, TypeError),
+        ({"ttl": 1, "resolution": -1.0}, ValueError),
+        ({"ttl": 1, "clock": 0}, TypeError),
+        ({"ttl": 1, "sweep_limit": -1}, ValueError),
+        ({"ttl": 1, "sweep_limit": 1.0}, TypeError),
+    ],
+)
+def test_wrong_arguments(kwargs, error):
+    with pytest.raises(error):
+        ExpiringHashMap(**kwargs)
+
+
+def test_entries_expire_lazily_on_access(em0, clock):
+    em0["a"] = 1
+    em0.set("b", 2, ttl=20)
+    clock.advance(9.9)
+    assert em0["a"] == 1 and "a" in em0
+    clock.advance(0.1)
+    assert em0.get("a") is None and "a" not in em0
+    with pytest.raises(KeyError):
+        em0["a"]
+    assert em0["b"] == 2
+    assert len(em0) == 1 and em0.expired == 1
+
+
+def test_set_renews_deadline(em0, clock):
+    em0["a"] = 1
+    clock.advance(8)
+    em0["a"] = 2
+    clock.advance(8)
+    assert em0["a"] == 2
+    assert em0.expire() == 0
+    clock.advance(3)
+    assert em0.expire() == 1 and len(em0) == 0
+
+
+def test_pop_and_delete(em0, clock):
+    em0["a"] = 1
+    em0["b"] = 2
+    assert em0.pop("a") == 1 and em0.pop("a", None) is None
+    del em0["b"]
+    with pytest.raises(KeyError):
+        del em0["b"]
+    em0["c"] = 3
+    clock.advance(10)
+    assert em0.pop("c", 0) == 0
+    clock.advance(100)
+    assert em0.expire() == 0 and em0.expired == 1
+
+
+def test_expire_sweeps_and_is_bounded(em0, clock):
+    for i in range(100):
+        em0[i] = i
+    clock.advance(5)
+    for i in range(100, 150):
+        em0[i] = i
+    clock.advance(6)
+    assert len(em0) == 150
+    assert set(em0) == set(range(100, 150))
+    assert em0.expire(limit=30) == 30
+    assert em0.expire() == 70
+    assert len(em0) == 50 and em0.expired == 100
+    with pytest.raises(ValueError):
+        em0.expire(limit=-1)
+
+
+def test_writes_run_bounded_sweeps(clock):
+    em = ExpiringHashMap(ttl=1, clock=clock, sweep_limit=4)
+    for i in range(20):
+        em[i] = i
+    clock.advance(2)
+    em["x"] = 0
+    assert len(em) == 17
+    for i in range(5):
+        em[f"y{i}"] = i
+    assert len(em) == 6 and em.expired == 20
+
+
+def test_hierarchical_wheel_expires_every_entry_in_time(clock):
+    em = ExpiringHashMap(ttl=1, resolution=0.5, clock=clock, sweep_limit=0)
+    rng = random.Random(0)
+    deadlines = {}
+    for i in range(2000):
+        ttl = rng.choice([rng.uniform(0.1, 40), rng.uniform(0, 1e5)])
+        em.set(i, i, ttl=ttl)
+        deadlines[i] = clock.time + ttl
+    while deadlines:
+        clock.advance(rng.uniform(0, 5000))
+        em.expire()
+        alive = set(em._map.keys())
+        for key, deadline in list(deadlines.items()):
+            if deadline < clock.time - em.resolution:
+                assert key not in alive
+                del deadlines[key]
+            elif deadline > clock.time:
+                assert key in alive
+    assert len(em) == 0 and em.expired == 2000
+
+
+@pytest.mark.parametrize(
+    ("ttl", "resolution"), [(2**24 + 5, 1.0), (5 * 3600, 0.001)]
+)
+def test_deadlines_beyond_the_wheel(clock, ttl, resolution):
+    em = ExpiringHashMap(ttl=ttl, resolution=resolution, clock=clock)
+    em["far"] = 0
+    em.set("near", 1, ttl=1)
+    step = ttl / 7
+    for _ in range(6):
+        clock.advance(step)
+        em["x"] = 0
+        assert "far" in em
+    clock.advance(step + 2 * resolution)
+    em.expire()
+    assert "far" not in em._map and "near" not in em._map
+
+
+def test_hierarchical_wheel_with_overflow(clock):
+    em = ExpiringHashMap(ttl=1, resolution=0.001, clock=clock)
+    rng = random.Random(1)
+    deadlines = {}
+    for i in range(500):
+        ttl = rng.choice([rng.uniform(0, 100), rng.uniform(0, 1e5)])
+        em.set(i, i, ttl=ttl)
+        deadlines[i] = clock.time + ttl
+    while deadlines:
+        clock.advance(rng.uniform(0, 5000))
+        em.expire()
+        alive = set(em._map.keys())
+        for key, deadline in list(deadlines.items()):
+            if deadline < clock.time - em.resolution:
+                assert key not in alive
+                del deadlines[key]
+            elif deadline > clock.time:
+                assert key in alive
+    assert len(em) == 0
+
+
+def test_sweeps_skip_empty_ticks(clock, monkeypatch):
+    em = ExpiringHashMap(ttl=3600, resolution=0.001, clock=clock)
+    em["a"] = 1
+    cascades = []
+    cascade = em._cascade
+    monkeypatch.setattr(
+        em, "_cascade", lambda tick: cascades.append(tick) or cascade(tick)
+    )
+    # Ten idle minutes are 600000 ticks, and the wheel only stops at
+    # the few whose slots hold the entry.
+    clock.advance(600)
+    em["b"] = 2
+    assert len(cascades) <= 4 and "a" in em
+    clock.advance(3601)
+    assert em.expire() == 2
+
+
+def test_clear_and_repr(em0, clock):
+    em0["a"] = 1
+    assert repr(em0) == "<ExpiringHashMap: 1 entries, ttl=10>"
+    em0.clear()
+    assert len(em0) == 0
+    clock.advance(100)
+    assert em0.expire() == 0
@@ -0,0 +1,135 @@
+import pytest
+
+from src.algoandds.hashmap import (
+    BloomFilter,
+    CountingBloomFilter,
+    CuckooFilter,
+    HashMap,
+    KeyedHasher,
+)
+from src.algoandds.hashmap import filters
+
+
+FILTERS = [BloomFilter, CountingBloomFilter, CuckooFilter]
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "no numpy"])
+def numpy(request, monkeypatch):
+    if not request.param:
+        monkeypatch.setattr(filters, "np", None)
+    elif filters.np is None:
+        pytest.skip("NumPy is not installed.")
+
+
+@pytest.mark.parametrize("filter_class", FILTERS)
+def test_no_false_negatives(filter_class, numpy):
+    bf = filter_class(2000, 0.01, hasher="keyed")
+    bf.add_many(f"key{i}" for i in range(1000))
+    for i in range(1000, 2000):
+        bf.add(f"key{i}")
+    assert len(bf) == 2000
+    keys = [f"key{i}" for i in range(2000)]
+    assert all(key in bf for key in keys)
+    assert all(bf.contains_many(keys))
+    assert bf.contains_many([]) == [] and [] not in bf and None not in bf
+
+
+@pytest.mark.parametrize("filter_class", FILTERS)
+def test_batch_and_single_operations_agree(filter_class, numpy):
+    single = filter_class(1000, 0.05, hasher=HashMap().hasher)
+    batch = filter_class(1000, 0.05, hasher=single.hasher)
+    for i in range(0, 1000, 2):
+        single.add(i)
+    batch.add_many(range(0, 1000, 2))
+    probes = list(range(5000))
+    assert batch.contains_many(probes) == [i in single for i in probes]
+
+
+@pytest.mark.parametrize("filter_class", FILTERS)
+@pytest.mark.parametrize("error_rate", [0.1, 0.01, 0.001])
+def test_error_rates(filter_class, error_rate):
+    bf = filter_class(5000, error_rate, hasher=KeyedHasher(seed=1))
+    assert bf.measured_error_rate == 0.0
+    bf.add_many(f"key{i}" for i in range(5000))
+    measured = bf.measure_error_rate(f"absent{i}" for i in range(20000))
+    assert measured < error_rate * 1.5
+    assert bf.measured_error_rate < error_rate * 1.5
+    assert measured == pytest.approx(bf.measured_error_rate, abs=0.01)
+
+
+@pytest.mark.parametrize("filter_class", [CountingBloomFilter, CuckooFilter])
+def test_remove(filter_class):
+    bf = filter_class(100, hasher="keyed")
+    bf.add_many(range(1, 100))
+    for i in range(1, 100, 2):
+        bf.remove(i)
+    assert len(bf) == 49
+    assert all(i in bf for i in range(2, 100, 2))
+    assert sum(i in bf for i in range(1, 100, 2)) < 5
+    with pytest.raises(KeyError):
+        bf.remove(10**6)
+
+
+def test_counting_bloom_filter_saturates(numpy):
+    bf = CountingBloomFilter(11, hasher="keyed")
+    bf.add_many(["a"] * 10)
+    for _ in range(10):
+        bf.add("a")
+    assert bf.measured_error_rate > 0
+    for _ in range(20):
+        bf.remove("a")
+    # Saturated counters lost their true count, and stay set.
+    assert "a" in bf
+
+
+def test_cuckoo_filter_full():
+    cf = CuckooFilter(8, hasher="keyed")
+    with pytest.raises(RuntimeError):
+        cf.add_many(range(1, 100))
+    # No key added before the error is lost.
+    assert all(i in cf for i in range(1, len(cf) + 1))
+
+
+def test_cuckoo_filter_fingerprints():
+    assert CuckooFilter(10, 0.01).fingerprint_bits == 10
+    assert CuckooFilter(10, 1e-6).fingerprint_bits == 23
+    assert CuckooFilter(10, 1e-6)._slots.format == "I"
+
+
+def test_bloom_filter_sizing():
+    bf = BloomFilter(1000, 0.01)
+    assert bf.size == 9586 and bf.number_of_hashes == 7
+    assert len(bf._bits) == 1199
+    assert len(CountingBloomFilter(1000, 0.01)._counters) == 4793
+    assert repr(bf) == "<BloomFilter: 0 of 1000 keys, error rate 0.01>"
+
+
+@pytest.mark.parametrize("filter_class", FILTERS)
+@pytest.mark.parametrize(
+    ("capacity", "error_rate", "error"),
+    [
+        (0, 0.01, ValueError),
+        (1.0, 0.01, TypeError),
+        (True, 0.01, TypeError),
+        (10, 1, TypeError),
+        (10, 0.0, ValueError),
+        (10, 1.0, ValueError),
+    ],
+)
+def test_wrong_arguments(filter_class, capacity, error_rate, error):
+    with pytest.raises(error):
+        filter_class(capacity, error_rate)
+
+
+@pytest.mark.parametrize("filter_class", FILTERS)
+def test_wrong_keys(filter_class):
+    bf = filter_class(10)
+    with pytest.raises(TypeError):
+        bf.add([])
+    with pytest.raises(ValueError):
+        bf.add_many(["a", None])
+    assert len(bf) == 0
+    with pytest.raises(TypeError):
+        bf.contains_many(1)
+    with pytest.raises(ValueError):
+        bf.measure_error_rate([])
@@ -0,0 +1,92 @@
+import pytest
+
+from src.algoandds.hashmap import (
+    FrozenHashMap,
+    HashMap,
+    RobinHoodHashMap,
+    SwissHashMap,
+    CompactHashMap,
+    IncrementalHashMap,
+    Hasher,
+)
+
+
+BACKENDS = [
+    HashMap,
+    RobinHoodHashMap,
+    SwissHashMap,
+    CompactHashMap,
+    IncrementalHashMap,
+]
+
+
+class CollidingHasher(Hasher):
+    mode = "colliding"
+
+    def prehash(self, key) -> int:
+        return hash(key) % 4
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("hasher", ["sha256", "keyed", "deterministic"])
+def test_freeze_and_lookups(backend, hasher):
+    items = {f"key{i}": i for i in range(2000)}
+    hm = backend(items, hasher=hasher)
+    fm = hm.freeze()
+    assert len(fm) == 2000 and fm.hasher is hm.hasher
+    for key, value in items.items():
+        assert fm[key] == value and key in fm
+    for i in range(2000):
+        assert f"missing{i}" not in fm
+    assert fm.get("missing") is None and fm.get("missing", 0) == 0
+    with pytest.raises(KeyError):
+        fm["missing"]
+    assert [] not in fm and None not in fm
+    assert dict(fm.items()) == items and set(fm) == set(items)
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 3, 10, 100])
+def test_small_maps(size):
+    fm = FrozenHashMap({i: -i for i in range(size)}, hasher="keyed")
+    assert len(fm) == size
+    assert all(fm[i] == -i for i in range(size)) and size not in fm
+
+
+def test_identical_prehashes_go_to_overflow():
+    # -1 and -2 have the same hash in CPython.
+    fm = FrozenHashMap({-1: "a", -2: "b", 3: "c"}, hasher="keyed")
+    assert (fm[-1], fm[-2], fm[3]) == ("a", "b", "c")
+    fm = HashMap({i: i for i in range(50)}, hasher=CollidingHasher()).freeze()
+    assert all(fm[i] == i for i in range(50)) and 50 not in fm
+
+
+def test_frozen_map_is_hashable():
+    fm0 = FrozenHashMap({"a": 1, "b": 2})
+    fm1 = HashMap({"b": 2, "a": 1}, hasher="keyed").freeze()
+    assert fm0 == fm1 and hash(fm0) == hash(fm1)
+    assert fm0 != FrozenHashMap({"a": 1})
+    assert len({fm0, fm1, FrozenHashMap({"a": 1})}) == 2
+    with pytest.raises(TypeError):
+        fm0 == {"a": 1, "b": 2}
+    with pytest.raises(TypeError):
+        hash(FrozenHashMap({"a": []}))
+
+
+def test_frozen_map_is_immutable():
+    fm = FrozenHashMap({"a": 1})
+    with pytest.raises(TypeError):
+        fm["a"] = 2
+    with pytest.raises(TypeError):
+        del fm["a"]
+    assert fm.copy() is fm
+    hm = fm.thaw()
+    hm["a"] = 2
+    assert fm["a"] == 1 and hm["a"] == 2
+
+
+def test_build_report():
+    fm = FrozenHashMap({i: i for i in range(10000)}, hasher="keyed")
+    assert fm.build_time > 0
+    assert 3 < fm.bits_per_key < 6
+    assert repr(fm).startswith("<FrozenHashMap: 10000 entries, ")
+    assert str(FrozenHashMap({"a": 1})) == "{'a': 1}"
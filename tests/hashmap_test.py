@@ -1,10 +1,22 @@
 ﻿from typing import Dict, Iterable, List
 from secrets import randbelow
 from itertools import count
+import pickle
 import pytest
 
 from src.algoandds.linkedlist import LinkedList
-from src.algoandds.hashmap import HashMap
+from src.algoandds.hashmap.treebucket import TreeBucket
+from src.algoandds.hashmap import (
+    HashMap,
+    RobinHoodHashMap,
+    SwissHashMap,
+    CompactHashMap,
+    IncrementalHashMap,
+    Hasher,
+    SaltedSHA256Hasher,
+    KeyedHasher,
+    DeterministicHasher,
+)
 
 
 @pytest.fixture
@@ -125,7 +137,7 @@ def test_add_from_dict_wrong_type(hm0: HashMap, value, error):
 @pytest.mark.parametrize("d", [{1: "a", 2: "b", 3: "c"}, {"key": "value"}])
 def test_add_from_dict_correct_argument(hm0: HashMap, d: Dict):
     hm0._add_from_dict(d)
-    assert hm0.items() == d
+    assert dict(hm0.items()) == d
 
 
 @pytest.mark.parametrize(
@@ -148,7 +160,7 @@ def test_add_from_list_invalid_list(hm0: HashMap, l: List):
 @pytest.mark.parametrize("l", [[(1, "a"), (2, "b"), (3, "c")]])
 def test_add_from_list_correct_argument(hm0: HashMap, l: List):
     hm0._add_from_list(l)
-    assert hm0.items() == dict(l)
+    assert dict(hm0.items()) == dict(l)
 
 
 @pytest.fixture
@@ -231,18 +243,18 @@ def test_create_hashmap_wrong_iter(wrong_iter):
 
 def test_create_hashmap_from_single_tuple():
     hm = HashMap((1, "a"))
-    assert hm.items() == {1: "a"}
+    assert dict(hm.items()) == {1: "a"}
     assert len(hm) == 1
 
 
 def test_create_hashmap_from_list_of_tuples(hm1: HashMap):
     hm1_dict = {1: "a", 2: "b", 3: "c"}
-    assert hm1.items() == hm1_dict
+    assert dict(hm1.items()) == hm1_dict
 
 
 def test_create_hashmap_from_dict(hm2: HashMap):
     hm1_dict = {1: "a", 2: "b", 3: "c"}
-    assert hm2.items() == hm1_dict
+    assert dict(hm2.items()) == hm1_dict
 
 
 @pytest.fixture
@@ -341,18 +353,18 @@ def test_set_default_existing_key(hm4: HashMap, key, value):
 
 
 def test_items(hm0: HashMap, hm4: HashMap, d10: Dict, d20: Dict):
-    assert hm0.items() == {}
+    assert dict(hm0.items()) == {}
     hm0.update(d10)
-    assert hm0.items() == d10
+    assert dict(hm0.items()) == d10
     hm0.update(d20)
     dtemp = d10.copy()
     dtemp.update(d20)
-    assert hm0.items() == dtemp
-    assert hm4.items() == {i: i * 2 for i in range(40)}
+    assert dict(hm0.items()) == dtemp
+    assert dict(hm4.items()) == {i: i * 2 for i in range(40)}
 
 
 def test_keys(hm0: HashMap, hm4: HashMap, d10: Dict, d20: Dict):
-    assert hm0.keys() == ()
+    assert tuple(hm0.keys()) == ()
     hm0.update(d10)
     assert set(hm0.keys()) == set(d10.keys())
     hm0.update(d20)
@@ -363,7 +375,7 @@ def test_keys(hm0: HashMap, hm4: HashMap, d10: Dict, d20: Dict):
 
 
 def test_values(hm0: HashMap, hm4: HashMap, d10: Dict, d20: Dict):
-    assert hm0.values() == ()
+    assert tuple(hm0.values()) == ()
     hm0.update(d10)
     assert set(hm0.values()) == set(d10.values())
     hm0.update(d20)
@@ -503,7 +515,7 @@ def test_delitem_existing_key(hm4: HashMap):
     ],
 )
 def test_delitem_ensure_empty_bucket_is_none(hm: HashMap):
-    keys = hm.keys()
+    keys = tuple(hm.keys())
     # Delete all items.
     for k in keys:
         del hm[k]
@@ -595,7 +607,7 @@ def test_eq_ne_correct_type(correct_item: HashMap):
 )
 def test_str_repr(hm: HashMap):
     l = hm._list
-    items = hm.items()
+    items = dict(hm.items())
     assert repr(hm) == f"<HashMap: {l}>"
     assert str(hm) == str(items)
 
@@ -627,3 +639,684 @@ def test_integrity_on_increasing_load(hm0: HashMap, rng: range):
 )
 def test_copy(hm: HashMap):
     assert set(hm) == set(hm.copy())
+
+
+def test_counters_match_buckets(hm0: HashMap):
+    keys = [randbelow(5000) for _ in range(3000)]
+    for key in keys:
+        hm0[key] = key
+    for key in set(keys[:1500]):
+        del hm0[key]
+    occupied = [bucket for bucket in hm0._list if bucket is not None]
+    chained = [b for b in occupied if not isinstance(b, tuple)]
+    assert hm0._size == len(occupied)
+    remaining = set(keys[1500:]) - set(keys[:1500])
+    assert len(hm0) == sum(1 for _ in hm0) == len(remaining)
+    assert hm0._number_of_chained_entries == sum(len(b) for b in chained)
+
+
+@pytest.mark.parametrize(
+    ("mode", "hasher_type"),
+    [
+        (None, SaltedSHA256Hasher),
+        ("sha256", SaltedSHA256Hasher),
+        ("keyed", KeyedHasher),
+        ("deterministic", DeterministicHasher),
+    ],
+)
+def test_hasher_modes(mode, hasher_type):
+    hm = HashMap({i: i * 2 for i in range(1, 500)}, hasher=mode)
+    assert isinstance(hm.hasher, hasher_type)
+    for i in range(1, 500):
+        assert hm[i] == i * 2
+    assert hm.copy().hasher is hm.hasher
+
+
+@pytest.mark.parametrize(
+    ("hasher", "error"), [(1, TypeError), ("x", ValueError)]
+)
+def test_hasher_wrong_argument(hasher, error):
+    with pytest.raises(error):
+        HashMap(hasher=hasher)
+
+
+def test_hasher_instance_is_used_as_is():
+    hasher = KeyedHasher(seed=42)
+    hm = HashMap(hasher=hasher)
+    assert hm.hasher is hasher
+    assert isinstance(hasher, Hasher)
+    assert hasher.seed == 42 and DeterministicHasher(-1).seed == 2**64 - 1
+
+
+@pytest.mark.parametrize("key", [1, 2**70, -5, 1.5, "abc", b"abc", "\u00e9"])
+def test_deterministic_hasher_is_reproducible(key):
+    prehash = DeterministicHasher(7).prehash(key)
+    assert prehash == DeterministicHasher(7).prehash(key)
+    assert prehash != DeterministicHasher(8).prehash(key)
+
+
+@pytest.mark.parametrize(
+    "hasher", [KeyedHasher(), DeterministicHasher(), SaltedSHA256Hasher()]
+)
+def test_equal_keys_have_equal_prehashes(hasher: Hasher):
+    assert hasher.prehash(1) == hasher.prehash(True)
+    if not isinstance(hasher, SaltedSHA256Hasher):
+        assert hasher.prehash(2) == hasher.prehash(2.0)
+    assert hasher.prehash("a") == hasher.prehash("".join(["a"]))
+
+
+class CountingHasher(KeyedHasher):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def prehash(self, key):
+        self.calls += 1
+        return super().prehash(key)
+
+
+def test_resize_does_not_rehash_keys():
+    hasher = CountingHasher()
+    hm = HashMap(hasher=hasher)
+    for i in range(1000):
+        hm.update((i, i))
+    for i in range(900):
+        del hm[i]
+    assert hasher.calls == 1900
+    assert dict(hm.items()) == {i: i for i in range(900, 1000)}
+
+
+def test_entries_store_prehash(hm4: HashMap):
+    for key, value, prehash in hm4._iter_entries():
+        assert hm4[key] == value
+        assert prehash == hm4.hasher.prehash(key)
+
+
+@pytest.mark.parametrize("key", [None, (1, 2), [1], {}])
+def test_contains_invalid_key(hm4: HashMap, key):
+    assert key not in hm4
+
+
+def test_contains_many(hm4: HashMap):
+    keys = [0, 39, 40, "a", None, 20, -1]
+    assert hm4.contains_many(keys) == [k in hm4 for k in keys]
+    assert hm4.contains_many(iter(keys)) == [
+        True, True, False, False, False, True, False
+    ]
+    assert hm4.contains_many([]) == []
+    with pytest.raises(TypeError):
+        hm4.contains_many(1)
+
+
+@pytest.mark.parametrize(
+    ("policy", "error"), [(2, TypeError), ("odd", ValueError)]
+)
+def test_capacity_policy_wrong_argument(policy, error):
+    with pytest.raises(error):
+        HashMap(capacity_policy=policy)
+
+
+@pytest.mark.parametrize(
+    ("number_of_items", "expected_capacity"),
+    [(0, 16), (3, 16), (8, 16), (9, 32), (20, 64), (1000, 2048)],
+)
+def test_power_of_two_capacity(number_of_items, expected_capacity):
+    hm = HashMap(
+        {i: i for i in range(number_of_items)}, capacity_policy="pow2"
+    )
+    assert hm._capacity == hm._hash_ceiling == expected_capacity
+    assert hm.capacity_policy == "pow2"
+    assert hm.copy().capacity_policy == "pow2"
+
+
+def test_power_of_two_resize_splits_buckets():
+    hm = HashMap(hasher=KeyedHasher(), capacity_policy="pow2")
+    reference = {}
+    for i in range(5000):
+        hm.update((i * 1024, i))
+        reference[i * 1024] = i
+        capacity = hm._capacity
+        assert capacity & (capacity - 1) == 0
+    for hash_code, bucket in enumerate(hm._list):
+        for _, _, prehash in hm._iter_bucket(bucket):
+            assert prehash & (hm._capacity - 1) == hash_code
+    assert dict(hm.items()) == reference
+    assert hm.contains_many([0, 1024, 1]) == [True, True, False]
+    occupied = [bucket for bucket in hm._list if bucket is not None]
+    assert hm._size == len(occupied)
+    # Mixing spreads multiples of 1024 over most of the buckets.
+    assert len(occupied) > 0.3 * hm._capacity
+
+
+def test_power_of_two_shrink():
+    hm = HashMap(hasher="keyed", capacity_policy="pow2")
+    hm.update({i: i for i in range(1000)})
+    for i in range(990):
+        del hm[i]
+    assert hm._capacity < 2048
+    assert dict(hm.items()) == {i: i for i in range(990, 1000)}
+
+
+class CollidingHasher(Hasher):
+    """Sends every int key to bucket 0 of a map with 10 buckets."""
+
+    mode = "colliding"
+
+    def prehash(self, key):
+        return hash(key) * 1000
+
+
+class ConstantHasher(Hasher):
+    mode = "constant"
+
+    def prehash(self, key):
+        return 0
+
+
+@pytest.mark.parametrize("hasher", [CollidingHasher(), ConstantHasher()])
+def test_long_chains_are_treeified(hasher: Hasher):
+    hm = HashMap(hasher=hasher)
+    for i in range(1, HashMap._TREEIFY_THRESHOLD + 1):
+        hm[i] = i
+    assert isinstance(hm._list[0], LinkedList)
+    assert hm.treeified_buckets == 0
+    for i in range(HashMap._TREEIFY_THRESHOLD + 1, 101):
+        hm[i] = i
+    assert isinstance(hm._list[0], TreeBucket)
+    assert hm.treeified_buckets == 1
+    assert hm._number_of_chained_entries == len(hm) == 100
+    hm[50] = "fifty"
+    assert len(hm) == 100
+    assert hm[50] == "fifty"
+    assert 101 not in hm
+    expected = {i: "fifty" if i == 50 else i for i in range(1, 101)}
+    assert dict(hm.items()) == expected
+    for i in range(1, 100 - HashMap._UNTREEIFY_THRESHOLD + 1):
+        del hm[i]
+    assert isinstance(hm._list[0], LinkedList)
+    assert hm.treeified_buckets == 0
+    assert dict(hm.items()) == {i: i for i in range(95, 101)}
+    with pytest.raises(KeyError):
+        del hm[1]
+
+
+def test_tree_bucket_with_unorderable_keys():
+    hm = HashMap(hasher=ConstantHasher())
+    keys = list(range(1, 20)) + [f"{i}" for i in range(20)] + [b"a", 1.5]
+    for key in keys:
+        hm[key] = key
+    assert hm.treeified_buckets == 1
+    assert all(hm[key] == key for key in keys)
+    assert "20" not in hm
+    for key in keys[::2]:
+        del hm[key]
+    assert set(hm) == set(keys[1::2])
+
+
+@pytest.mark.parametrize(
+    "keys",
+    [
+        [frozenset(range(i % 5, i)) for i in range(1, 30)],
+        [float(i) for i in range(1, 20)] + [float("nan")],
+        list(range(1, 20)) + [1.0, 2.5, True],
+    ],
+    ids=["frozensets", "nan", "mixed types"],
+)
+def test_tree_bucket_with_partially_ordered_keys(keys):
+    # These keys compare without error, but do not sort.
+    hm = HashMap(hasher=ConstantHasher())
+    for key in keys:
+        hm[key] = key
+    assert hm.treeified_buckets == 1
+    expected = {key: key for key in keys}
+    assert len(hm) == len(expected)
+    assert all(key in hm for key in keys)
+    for key in keys:
+        hm[key] = "new"
+    assert len(hm) == len(expected)
+    assert all(hm[key] == "new" for key in keys)
+
+
+def test_treeified_buckets_survive_resizes():
+    hm = HashMap(hasher=ConstantHasher(), capacity_policy="pow2")
+    hm.update({i: i for i in range(1, 50)})
+    assert hm.treeified_buckets == 1
+    hm._resize_list(100)
+    assert hm.treeified_buckets == 1
+    assert dict(hm.items()) == {i: i for i in range(1, 50)}
+    hm.clear()
+    assert hm.treeified_buckets == 0
+
+
+BACKENDS = [
+    HashMap,
+    RobinHoodHashMap,
+    SwissHashMap,
+    CompactHashMap,
+    IncrementalHashMap,
+]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_batch_operations(backend):
+    hm = backend(hasher="keyed")
+    hm.set_many((i, i * 2) for i in range(1000))
+    hm.set_many({i: -i for i in range(990, 1010)})
+    assert len(hm) == 1010
+    assert hm.get_many([5, 995, 2000, 5], default=-1) == [10, -995, -1, 10]
+    assert hm.delete_many([3, 2000, 3, 1005]) == [6, None, None, -1005]
+    assert len(hm) == 1008
+    assert hm.delete_many(range(1010), default="x")[:4] == [0, 2, 4, "x"]
+    assert len(hm) == 0
+    assert hm.get_many([1, 2]) == [None, None]
+    assert dict(hm.items()) == {}
+
+
+@pytest.mark.parametrize(
+    ("method", "arg", "error"),
+    [
+        ("get_many", 1, TypeError),
+        ("set_many", 1, TypeError),
+        ("delete_many", 1, TypeError),
+        ("set_many", [(1, 2), (3,)], ValueError),
+        ("set_many", [(1, 2), (None, 3)], ValueError),
+        ("set_many", [(1, 2), ((1, 2), 3)], TypeError),
+        ("get_many", [1, None], ValueError),
+        ("delete_many", [1, [2]], TypeError),
+    ],
+)
+def test_batch_operations_wrong_argument(method, arg, error):
+    hm = HashMap(hasher="keyed")
+    with pytest.raises(error):
+        getattr(hm, method)(arg)
+    # Keys are all validated before the first write.
+    assert len(hm) == 0
+
+
+def test_set_many_resizes_once():
+    hm = HashMap(hasher="keyed")
+    resizes = []
+    resize_to = hm._resize_to
+    hm._resize_to = lambda n: resizes.append(n) or resize_to(n)
+    hm.set_many((i, i) for i in range(10000))
+    assert resizes == [20000]
+    assert dict(hm.items()) == {i: i for i in range(10000)}
+
+
+def test_views_are_live():
+    hm = HashMap({i: i * 2 for i in range(5)}, hasher="keyed")
+    keys, values, items = hm.keys(), hm.values(), hm.items()
+    hm[5] = 10
+    del hm[0]
+    assert len(keys) == len(values) == len(items) == 5
+    assert set(keys) == {1, 2, 3, 4, 5}
+    assert sorted(values) == [2, 4, 6, 8, 10]
+    assert dict(items) == {i: i * 2 for i in range(1, 6)}
+    hm.clear()
+    assert len(keys) == 0 and list(items) == []
+
+
+def test_views_membership_and_set_operations():
+    hm = HashMap({i: str(i) for i in range(5)}, hasher="keyed")
+    assert 3 in hm.keys() and 7 not in hm.keys()
+    assert None not in hm.keys() and [1] not in hm.keys()
+    assert "3" in hm.values() and 3 not in hm.values()
+    assert (3, "3") in hm.items() and (3, 3) not in hm.items()
+    assert ([1], "1") not in hm.items() and 3 not in hm.items()
+    assert hm.keys() & {3, 4, 5} == {3, 4}
+    assert hm.keys() | {5} == {0, 1, 2, 3, 4, 5}
+    assert hm.keys() - {0, 1} == {2, 3, 4}
+    assert hm.keys() == {0, 1, 2, 3, 4}
+    assert hm.items() == {i: str(i) for i in range(5)}.items()
+    assert hm.keys().isdisjoint({7, 8})
+
+
+def test_views_do_not_rehash_keys():
+    hasher = CountingHasher()
+    hm = HashMap({i: i for i in range(100)}, hasher=hasher)
+    hasher.calls = 0
+    list(hm.keys()), list(hm.values()), list(hm.items())
+    str(hm)
+    assert len(hm.items()) == 100
+    assert hasher.calls == 0
+
+
+def test_views_repr():
+    hm = HashMap((1, "a"))
+    assert repr(hm.keys()) == "HashMapKeysView([1])"
+    assert repr(hm.values()) == "HashMapValuesView(['a'])"
+    assert repr(hm.items()) == "HashMapItemsView([(1, 'a')])"
+    assert str(hm) == "{1: 'a'}"
+
+
+@pytest.mark.parametrize(
+    ("value", "error"),
+    [
+        (1, TypeError),
+        ("0.1", TypeError),
+        (-0.1, ValueError),
+        (0.26, ValueError),
+    ],
+)
+def test_shrink_load_factor_wrong_argument(value, error):
+    with pytest.raises(error):
+        HashMap(shrink_load_factor=value)
+
+
+def test_auto_shrink_wrong_argument():
+    with pytest.raises(TypeError):
+        HashMap(auto_shrink=1)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_reserve(backend):
+    hm = backend(hasher="keyed")
+    hm.reserve(1000)
+    capacity = hm._capacity
+    assert capacity >= 1000
+    for i in range(1000):
+        hm[i] = i
+    assert hm._capacity == capacity
+    hm.reserve(10)
+    assert hm._capacity == capacity
+    with pytest.raises(ValueError):
+        hm.reserve(-1)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_shrink_to_fit(backend):
+    hm = backend(hasher="keyed", auto_shrink=False)
+    hm.set_many((i, i) for i in range(1000))
+    capacity = hm._capacity
+    hm.delete_many(range(990))
+    assert hm._capacity == capacity
+    assert not hm.auto_shrink and not hm.copy().auto_shrink
+    hm.shrink_to_fit()
+    assert hm._capacity < 100
+    assert dict(hm.items()) == {i: i for i in range(990, 1000)}
+
+
+def test_setitem_grows_the_map(hm0: HashMap):
+    for i in range(1000):
+        hm0[i] = i
+    assert hm0._load < hm0._load_factor
+    assert dict(hm0.items()) == {i: i for i in range(1000)}
+
+
+def test_no_resize_inside_the_dead_band():
+    hm = HashMap(hasher="keyed", shrink_load_factor=0.1)
+    hm.set_many((i, i) for i in range(1000))
+    resizes = []
+    resize_to = hm._resize_to
+    hm._resize_to = lambda n: resizes.append(n) or resize_to(n)
+    # Going back and forth between 800 and 1000 entries keeps the
+    # load between both thresholds.
+    for _ in range(5):
+        hm.delete_many(range(200))
+        hm.set_many((i, i) for i in range(200))
+    assert resizes == []
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_pop_stored_none(backend):
+    hm = backend([(1, None), (2, "b")], hasher="keyed")
+    assert hm.pop(1) is None
+    assert 1 not in hm
+    assert hm.pop(1, None) is None
+    with pytest.raises(KeyError):
+        hm.pop(1)
+    assert hm.pop(2, None) == "b"
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_compound_operations(backend):
+    hm = backend(hasher="keyed")
+    assert hm.setdefault(1, []) == []
+    hm.setdefault(1, []).append("a")
+    assert hm[1] == ["a"]
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return "computed"
+
+    assert hm.get_or_compute(2, factory) == "computed"
+    assert hm.get_or_compute(2, factory) == "computed"
+    assert calls == [1]
+    assert hm.merge(3, "x", str.__add__) == "x"
+    assert hm.merge(3, "y", str.__add__) == "xy"
+    for word in "abracadabra":
+        hm.increment(word)
+    assert hm["a"] == 5 and hm["b"] == 2 and hm["c"] == 1
+    assert hm.increment("a", -5) == 0
+    assert hm.increment(4, 0.5) == 0.5
+    assert len(hm) == 9
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_compound_operations_hash_the_key_once(backend):
+    hasher = CountingHasher()
+    hm = backend({i: i for i in range(100)}, hasher=hasher)
+    for operation in (
+        lambda key: hm.setdefault(key, 0),
+        lambda key: hm.get_or_compute(key, int),
+        lambda key: hm.merge(key, 1, max),
+        lambda key: hm.increment(key),
+        lambda key: hm.pop(key),
+    ):
+        for key in (50, 500):
+            hasher.calls = 0
+            operation(key)
+            assert hasher.calls == 1
+
+
+class CountingKey:
+    comparisons = 0
+
+    def __init__(self, name):
+        self.name = name
+
+    def __eq__(self, other):
+        CountingKey.comparisons += 1
+        return isinstance(other, CountingKey) and self.name == other.name
+
+    def __hash__(self):
+        return 0
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("number_of_keys", [2, 5, 30])
+def test_compound_operations_search_the_key_once(backend, number_of_keys):
+    # Keys that all collide make every search compare them in turn.
+    hm = backend(hasher=ConstantHasher())
+    keys = [CountingKey(i) for i in range(number_of_keys)]
+    for key in keys:
+        hm[key] = 1
+    for key in (keys[-1], CountingKey("missing")):
+        CountingKey.comparisons = 0
+        hm.get(key)
+        lookup = CountingKey.comparisons
+        CountingKey.comparisons = 0
+        hm.merge(key, 1, lambda a, b: a + b)
+        assert CountingKey.comparisons == lookup
+        assert hm[key] == 2 if key is keys[-1] else hm[key] == 1
+    assert len(hm) == number_of_keys + 1
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_compute_that_changes_the_map(backend):
+    hm = backend({i: i for i in range(20)}, hasher="keyed")
+
+    def factory():
+        hm[100] = "inner"
+        hm.update({i: i for i in range(20, 200)})
+        return "outer"
+
+    assert hm.get_or_compute(100, factory) == "outer"
+
+    def merge(current, value):
+        del hm[5]
+        hm[300] = 300
+        return current + value
+
+    assert hm.merge(6, 1, merge) == 7
+    assert hm[100] == "outer" and hm[6] == 7 and 5 not in hm
+    assert len(hm) == len(list(hm)) == 200
+
+    def replace():
+        # Leaves the number of entries unchanged.
+        del hm[7]
+        hm[400] = "inner"
+        return "outer"
+
+    assert hm.get_or_compute(400, replace) == "outer"
+    assert len(hm) == len(set(hm)) == 200
+
+    def refill():
+        items = dict(hm.items())
+        hm.clear()
+        hm.update(items)
+        return "outer"
+
+    assert hm.get_or_compute(500, refill) == "outer"
+    assert hm[400] == hm[500] == "outer" and 7 not in hm
+    assert len(hm) == len(set(hm)) == 201
+
+
+def test_delete_from_a_bucket_of_unknown_type():
+    hm = HashMap({"a": 1}, hasher="keyed")
+    prehash = hm._key_hash("a")
+    hm._list[prehash % hm._hash_ceiling] = [("a", 1, prehash)]
+    with pytest.raises(TypeError):
+        del hm["a"]
+
+
+def test_failing_compute_leaves_the_map_unchanged(hm4: HashMap):
+    items = dict(hm4.items())
+    with pytest.raises(ZeroDivisionError):
+        hm4.get_or_compute(100, lambda: 1 / 0)
+    with pytest.raises(TypeError):
+        hm4.merge(1, "a", lambda a, b: a + b)
+    assert dict(hm4.items()) == items
+
+
+def scan_all(hm: HashMap, count: int = 10, between_calls=None) -> list:
+    cursor, pairs = hm.scan(0, count)
+    while cursor:
+        if between_calls is not None:
+            between_calls()
+        cursor, batch = hm.scan(cursor, count)
+        pairs.extend(batch)
+    return pairs
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_scan_returns_every_entry_once(backend):
+    hm = backend(hasher="keyed", capacity_policy="pow2")
+    assert hm.scan() == (0, [])
+    hm.set_many((i, -i) for i in range(1000))
+    pairs = scan_all(hm, count=7)
+    assert sorted(pairs) == sorted((i, -i) for i in range(1000))
+    cursor, batch = hm.scan(0, 100)
+    assert cursor and len(batch) >= 100
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_scan_of_a_sparse_map_stops_early(backend):
+    hm = backend(hasher="keyed", capacity_policy="pow2", auto_shrink=False)
+    hm.reserve(10000)
+    hm.set_many((i, i) for i in range(5))
+    cursor, batch = hm.scan(0, 2)
+    assert cursor and len(batch) < 2
+    assert sorted(scan_all(hm, count=2)) == [(i, i) for i in range(5)]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_scan_covers_resizes(backend):
+    hm = backend(hasher="keyed", capacity_policy="pow2")
+    hm.set_many((i, i) for i in range(300))
+    starts = iter(range(300, 3000, 20))
+
+    def grow():
+        start = next(starts, 3000)
+        hm.set_many((key, key) for key in range(start, start + 20))
+
+    capacity = hm._capacity
+    assert set(range(300)) <= {key for key, _ in scan_all(hm, 5, grow)}
+    assert hm._capacity > capacity
+    capacity = hm._capacity
+
+    def shrink():
+        hm.delete_many([key for key in hm if key >= 300][:150])
+
+    keys = [key for key, _ in scan_all(hm, 5, shrink)]
+    assert set(range(300)) <= set(keys)
+    assert hm._capacity < capacity
+
+
+def test_scan_wrong_argument():
+    with pytest.raises(ValueError):
+        HashMap({1: 1}).scan()
+    hm = HashMap({1: 1}, capacity_policy="pow2")
+    cursors = ((-1, ValueError), (2**64, ValueError), ("0", TypeError))
+    for cursor, error in cursors:
+        with pytest.raises(error):
+            hm.scan(cursor)
+    counts = ((0, ValueError), (True, TypeError), (1.0, TypeError))
+    for count, error in counts:
+        with pytest.raises(error):
+            hm.scan(0, count)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_stats_report_the_layout(backend):
+    hm = backend({i: i for i in range(100)}, hasher="keyed")
+    stats = hm.stats()
+    assert stats.capacity == hm._capacity and stats.entries == 100
+    assert stats.load == hm._load
+    assert stats.resizes is None and stats.gets is None
+    if backend in (HashMap, IncrementalHashMap):
+        # Chain lengths, counted per bucket.
+        assert sum(stats.length_histogram.values()) == stats.capacity
+        assert stats.linked_list_buckets == sum(
+            count
+            for length, count in stats.length_histogram.items()
+            if length > 1
+        )
+    else:
+        # Probe lengths, counted per entry.
+        assert sum(stats.length_histogram.values()) == 100
+        assert min(stats.length_histogram) >= 1
+        assert stats.linked_list_buckets == 0
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_stats_counters(backend):
+    hm = backend(hasher="keyed")
+    hm.enable_stats()
+    assert hm.stats_enabled and isinstance(hm, backend)
+    hm.set_many((i, i) for i in range(100))
+    hm[5], hm.get(500), 7 in hm, hm.get_many([1, 600])
+    hm.setdefault(1, 0), hm.increment(700)
+    del hm[3]
+    stats = hm.stats()
+    assert (stats.gets, stats.misses) == (7, 3)
+    assert (stats.sets, stats.deletes) == (101, 1)
+    assert stats.resizes >= 1 and stats.resize_time > 0
+    assert stats.hash_calls == 108 and stats.hash_time > 0
+    hm.enable_stats()
+    assert hm.stats().gets == 0
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_stats_can_be_switched_off(backend):
+    hm = backend({"a": 1}, hasher="keyed")
+    hm.enable_stats()
+    assert hm["a"] == 1
+    copy = hm.copy()
+    assert copy.stats_enabled and dict(copy.items()) == {"a": 1}
+    assert type(pickle.loads(pickle.dumps(hm))) is backend
+    hm.disable_stats()
+    assert type(hm) is backend and not hm.stats_enabled
+    hm["b"] = hm["a"]
+    assert hm.stats().gets == 1 and hm.stats().sets == 0
@@ -0,0 +1,106 @@
+from secrets import randbelow
+import pytest
+
+from src.algoandds.hashmap import HashMap, IncrementalHashMap, KeyedHasher
+from src.algoandds.linkedlist import LinkedList
+
+
+@pytest.fixture
+def ih0():
+    return IncrementalHashMap(hasher=KeyedHasher())
+
+
+def assert_counters_match_buckets(ih: IncrementalHashMap):
+    buckets = ih._list + (ih._old_list or [])
+    occupied = [bucket for bucket in buckets if bucket is not None]
+    chained = [b for b in occupied if isinstance(b, LinkedList)]
+    assert ih._size == len(occupied)
+    assert ih._number_of_chained_entries == sum(len(b) for b in chained)
+    assert len(ih) == sum(1 for _ in ih)
+    old_entries = sum(
+        len(tuple(ih._iter_bucket(b))) for b in ih._old_list or [] if b
+    )
+    assert ih.pending_entries == old_entries
+
+
+def test_is_a_hashmap():
+    ih = IncrementalHashMap([(i, i * 2) for i in range(40)])
+    assert isinstance(ih, HashMap)
+    assert dict(ih.items()) == {i: i * 2 for i in range(40)}
+    assert not ih.is_migrating
+    assert ih.pending_buckets == ih.pending_entries == 0
+
+
+def test_resize_is_spread_over_operations(ih0: IncrementalHashMap):
+    ih0.update({i: i for i in range(100)})
+    old_capacity = ih0._capacity
+    ih0._resize_list(100)
+    assert ih0.is_migrating
+    assert ih0._capacity > old_capacity
+    assert ih0.pending_buckets == old_capacity
+    assert ih0.pending_entries == 100
+    step = ih0._MIGRATION_STEP
+    for i in range(1, old_capacity // step):
+        assert ih0[i] == i
+        assert ih0.pending_buckets == old_capacity - i * step
+        assert dict(ih0.items()) == {i: i for i in range(100)}
+        assert_counters_match_buckets(ih0)
+    ih0[100] = 100
+    assert not ih0.is_migrating
+    assert ih0.pending_buckets == ih0.pending_entries == 0
+    assert all(ih0[i] == i for i in range(101))
+    assert_counters_match_buckets(ih0)
+
+
+def test_operations_during_migration(ih0: IncrementalHashMap):
+    reference = {}
+    migrations = 0
+    for _ in range(20000):
+        key = randbelow(3000)
+        action = randbelow(3)
+        if action == 0:
+            ih0.update((key, key * 3))
+            reference[key] = key * 3
+        elif action == 1 and key in reference:
+            del ih0[key]
+            del reference[key]
+        elif key in reference:
+            assert ih0[key] == reference[key]
+        else:
+            assert key not in ih0
+        migrations += ih0.is_migrating
+    assert migrations > 0
+    assert dict(ih0.items()) == reference
+    assert_counters_match_buckets(ih0)
+
+
+def test_finish_migration(ih0: IncrementalHashMap):
+    ih0.update({i: i for i in range(1000)})
+    ih0._resize_list(1000)
+    assert ih0.pending_entries == 1000
+    ih0.finish_migration()
+    assert not ih0.is_migrating
+    assert dict(ih0.items()) == {i: i for i in range(1000)}
+    assert_counters_match_buckets(ih0)
+
+
+def test_clear_drops_migration(ih0: IncrementalHashMap):
+    ih0.update({i: i for i in range(100)})
+    ih0._resize_list(100)
+    ih0.clear()
+    assert not ih0.is_migrating
+    assert len(ih0) == 0
+
+
+def test_scan_during_migration():
+    ih = IncrementalHashMap(hasher="keyed", capacity_policy="pow2")
+    key = 0
+    while not ih.is_migrating or key < 200:
+        ih[key] = key
+        key += 1
+    cursor, pairs = ih.scan(0, 10)
+    while cursor:
+        ih[len(ih)] = 0
+        cursor, batch = ih.scan(cursor, 10)
+        pairs.extend(batch)
+    assert set(range(key)) <= {key for key, _ in pairs}
@@ -0,0 +1,89 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.algoandds.hashmap import HashMap, MappedHashMap, SwissHashMap
+
+
+@pytest.fixture
+def items():
+    items = {f"key{i}": [i, str(i)] for i in range(1000)}
+    items.update({i: i * 2 for i in range(-50, 50)})
+    items.update({b"bytes": b"value", 2.5: "float", "": None, "é\ud800": 1})
+    return items
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "map.bin"
+
+
+@pytest.mark.parametrize("backend", [HashMap, SwissHashMap])
+def test_dump_and_lookups(backend, items, path):
+    backend(items, hasher="keyed").dump(path)
+    with MappedHashMap(path) as mm:
+        assert len(mm) == len(items)
+        for key, value in items.items():
+            assert mm[key] == value and key in mm
+        assert mm.get("missing") is None and mm.get("missing", 0) == 0
+        with pytest.raises(KeyError):
+            mm["missing"]
+        assert "missing" not in mm and (1,) not in mm and 3.5 not in mm
+        assert set(mm) == set(items)
+
+
+def test_equal_numbers_are_the_same_key(path):
+    MappedHashMap.write(path, {1: "one", 2.0: "two"})
+    mm = MappedHashMap(path)
+    assert mm[1.0] == "one" and mm[True] == "one" and mm[2] == "two"
+    assert list(mm) in ([1, 2], [2, 1])
+    mm.close()
+
+
+def test_empty_map(path):
+    HashMap().dump(path)
+    with MappedHashMap(path) as mm:
+        assert len(mm) == 0 and "a" not in mm and list(mm) == []
+
+
+def test_unsupported_keys_and_mappings(path):
+    with pytest.raises(TypeError):
+        MappedHashMap.write(path, {frozenset(): 1})
+    with pytest.raises(TypeError):
+        MappedHashMap.write(path, [("a", 1)])
+    # The temporary files of failed writes are removed.
+    assert list(path.parent.iterdir()) == []
+    with pytest.raises(FileNotFoundError):
+        MappedHashMap.write(path.parent / "missing" / "map.bin", {"a": 1})
+
+
+def test_concurrent_writes(path):
+    def write(writer: int):
+        for _ in range(5):
+            MappedHashMap.write(
+                path, {f"key{i}": writer for i in range(2000)}
+            )
+
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(write, range(4)))
+    # The file is the whole table of one of the writers.
+    with MappedHashMap(path) as mm:
+        assert len(set(mm[f"key{i}"] for i in range(2000))) == 1
+    assert list(path.parent.iterdir()) == [path]
+
+
+def test_wrong_files(tmp_path):
+    not_a_map = tmp_path / "other.bin"
+    not_a_map.write_bytes(b"x" * 100)
+    with pytest.raises(ValueError):
+        MappedHashMap(not_a_map)
+    with pytest.raises(FileNotFoundError):
+        MappedHashMap(tmp_path / "missing.bin")
+
+
+def test_rewrite_replaces_file(path):
+    MappedHashMap.write(path, {"a": 1})
+    MappedHashMap.write(path, {"b": 2})
+    with MappedHashMap(path) as mm:
+        assert "a" not in mm and mm["b"] == 2
+        assert repr(mm) == f"<MappedHashMap: 1 entries from '{path}'>"
@@ -0,0 +1,115 @@
+import random
+
+import pytest
+
+from src.algoandds.hashmap import (
+    Hasher,
+    HashMap,
+    PersistentHashMap,
+    TransientHashMap,
+)
+
+
+class CollidingHasher(Hasher):
+    mode = "colliding"
+
+    def prehash(self, key) -> int:
+        return hash(key) % 4
+
+
+@pytest.fixture
+def pm0():
+    return PersistentHashMap({f"key{i}": i for i in range(100)})
+
+
+def test_construction_and_lookups(pm0):
+    assert len(pm0) == 100 and pm0["key10"] == 10
+    assert "key99" in pm0 and "key100" not in pm0 and [] not in pm0
+    assert pm0.get("missing") is None and pm0.get("missing", 0) == 0
+    with pytest.raises(KeyError):
+        pm0["missing"]
+    assert len(PersistentHashMap()) == 0
+    assert PersistentHashMap(("a", 1))["a"] == 1
+    assert dict(PersistentHashMap(HashMap({1: 2}).items()).items()) == {1: 2}
+    with pytest.raises(ValueError):
+        PersistentHashMap([1, 2])
+    with pytest.raises(TypeError):
+        PersistentHashMap([((1,), 2)])
+
+
+def test_versions_share_structure(pm0):
+    pm1 = pm0.set("key10", -10)
+    pm2 = pm1.set("new", 0).delete("key0")
+    assert pm0["key10"] == 10 and pm1["key10"] == -10
+    assert "new" not in pm1 and pm2["new"] == 0
+    assert "key0" in pm1 and "key0" not in pm2
+    assert (len(pm0), len(pm1), len(pm2)) == (100, 100, 100)
+    assert pm0.set("key10", 10) is pm0 and pm0.copy() is pm0
+    # Only the nodes on the path to the changed key are copied.
+    changed_slots = [
+        a is not b for a, b in zip(pm0._root.array, pm1._root.array)
+    ]
+    assert sum(changed_slots) == 1
+    with pytest.raises(KeyError):
+        pm0.delete("missing")
+
+
+@pytest.mark.parametrize("hasher", ["sha256", "keyed", CollidingHasher()])
+def test_matches_dict_under_random_operations(hasher):
+    rng = random.Random(0)
+    pm, expected, versions = PersistentHashMap(hasher=hasher), {}, []
+    for _ in range(3000):
+        key = rng.randrange(300)
+        if key in expected and rng.random() < 0.4:
+            pm = pm.delete(key)
+            del expected[key]
+        else:
+            pm = pm.set(key, key * 2 + len(expected))
+            expected[key] = key * 2 + len(expected)
+        versions.append((pm, dict(expected)))
+    for version, items in versions[::100]:
+        assert len(version) == len(items)
+        assert dict(version.items()) == items
+        assert all(version[key] == value for key, value in items.items())
+    for key in list(expected):
+        pm = pm.delete(key)
+    assert len(pm) == 0 and list(pm) == [] and pm._root.array == []
+
+
+def test_transient_batch_edits(pm0):
+    transient = pm0.transient()
+    assert isinstance(transient, TransientHashMap)
+    for i in range(100, 1000):
+        transient[f"key{i}"] = i
+    del transient["key0"]
+    transient.update(("key1", -1))
+    assert len(transient) == 999 and transient["key500"] == 500
+    pm1 = transient.persistent()
+    assert len(pm0) == 100 and pm0["key1"] == 1
+    assert len(pm1) == 999 and pm1["key1"] == -1 and "key0" not in pm1
+    with pytest.raises(RuntimeError):
+        transient["key2"] = 2
+    # A new transient copies the nodes shared with pm1 again.
+    pm1.transient()["key3"] = 0
+    assert pm1["key3"] == 3
+    with pytest.raises(TypeError):
+        TransientHashMap(HashMap())
+
+
+def test_set_many_and_delete_many(pm0):
+    pm1 = pm0.set_many({f"key{i}": -i for i in range(50, 150)})
+    assert len(pm1) == 150 and pm1["key60"] == -60 and pm0["key60"] == 60
+    pm2 = pm1.delete_many(f"key{i}" for i in range(150))
+    assert len(pm2) == 0
+    with pytest.raises(KeyError):
+        pm0.delete_many(["key1", "missing"])
+    assert len(pm0) == 100
+
+
+def test_comparison_and_representation(pm0):
+    pm1 = PersistentHashMap(dict(pm0.items()), hasher="keyed")
+    assert pm0 == pm1 and pm0 != pm1.set("x", 1)
+    with pytest.raises(TypeError):
+        pm0 == HashMap()
+    assert repr(pm0) == "<PersistentHashMap: 100 entries>"
+    assert str(PersistentHashMap({"a": 1})) == "{'a': 1}"
@@ -0,0 +1,106 @@
+from secrets import randbelow
+import pytest
+
+from src.algoandds.hashmap import HashMap, RobinHoodHashMap, KeyedHasher
+
+
+@pytest.fixture
+def rh0():
+    return RobinHoodHashMap()
+
+
+@pytest.fixture
+def rh4():
+    return RobinHoodHashMap([(i, i * 2) for i in range(40)])
+
+
+def assert_robin_hood_invariant(rh: RobinHoodHashMap):
+    capacity = rh._capacity
+    for index, key in enumerate(rh._keys):
+        if key is None:
+            continue
+        distance = (index - rh._hashes[index]) % capacity
+        previous = index - 1
+        # The previous slot is either occupied or the entry is at home.
+        assert distance == 0 or rh._keys[previous] is not None
+        if rh._keys[previous] is not None:
+            previous_distance = (previous - rh._hashes[previous]) % capacity
+            assert distance <= previous_distance + 1
+
+
+def test_is_a_hashmap(rh4: RobinHoodHashMap):
+    assert isinstance(rh4, HashMap)
+    assert dict(rh4.items()) == {i: i * 2 for i in range(40)}
+    assert len(rh4) == rh4._size == 40
+    assert rh4._capacity == 80
+
+
+def test_getitem_setitem_delitem(rh0: RobinHoodHashMap):
+    reference = {}
+    for _ in range(20000):
+        key = randbelow(3000)
+        action = randbelow(3)
+        if action == 0:
+            rh0[key] = reference[key] = randbelow(100)
+        elif action == 1 and key in reference:
+            del rh0[key]
+            del reference[key]
+        elif key in reference:
+            assert rh0[key] == reference[key]
+        else:
+            with pytest.raises(KeyError):
+                rh0[key]
+    assert dict(rh0.items()) == reference
+    assert len(rh0) == len(reference)
+    assert_robin_hood_invariant(rh0)
+
+
+def test_setitem_grows_on_high_load(rh0: RobinHoodHashMap):
+    for i in range(1000):
+        rh0[i] = i
+        assert rh0._load < rh0._load_factor
+    assert all(rh0[i] == i for i in range(1000))
+
+
+def test_delitem_leaves_no_tombstones(rh4: RobinHoodHashMap):
+    for k in range(40):
+        del rh4[k]
+        with pytest.raises(KeyError):
+            del rh4[k]
+        assert_robin_hood_invariant(rh4)
+    assert len(rh4) == 0
+    assert all(key is None for key in rh4._keys)
+    assert all(prehash is None for prehash in rh4._hashes)
+
+
+def test_colliding_keys():
+    # A constant hasher puts every key in the same home slot.
+    class ConstantHasher(KeyedHasher):
+        def prehash(self, key):
+            return 7
+
+    rh = RobinHoodHashMap(hasher=ConstantHasher())
+    for i in range(50):
+        rh.update((i, str(i)))
+    for i in range(0, 50, 2):
+        del rh[i]
+    assert dict(rh.items()) == {i: str(i) for i in range(1, 50, 2)}
+    assert_robin_hood_invariant(rh)
+
+
+@pytest.mark.parametrize("key", [None, (1, 2), [1]])
+def test_invalid_keys(rh4: RobinHoodHashMap, key):
+    assert key not in rh4
+    with pytest.raises((TypeError, ValueError)):
+        rh4[key] = 1
+
+
+def test_contains_copy_clear(rh4: RobinHoodHashMap):
+    assert rh4.contains_many([1, 41, "a"]) == [True, False, False]
+    copy = rh4.copy()
+    assert isinstance(copy, RobinHoodHashMap)
+    assert copy == rh4
+    rh4.clear()
+    assert len(rh4) == 0 and 1 not in rh4
+    assert copy[1] == 2
+    assert repr(rh4) == f"<RobinHoodHashMap: {[None] * rh4._capacity}>"
@@ -0,0 +1,115 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import pickle
+import subprocess
+import sys
+
+import pytest
+
+from src.algoandds.hashmap import HashMap, SharedHashMap
+
+
+def lookup(shared_map: SharedHashMap, keys: list) -> list:
+    try:
+        return [shared_map.get(key) for key in keys]
+    finally:
+        shared_map.close()
+
+
+# Publishes a map, then attaches to it from another process that exits,
+# which must neither unlink the block nor make the trackers complain.
+PUBLISHER = """
+import subprocess
+import sys
+
+from src.algoandds.hashmap import SharedHashMap
+
+ATTACH = (
+    "import sys; from src.algoandds.hashmap import SharedHashMap; "
+    "SharedHashMap(sys.argv[1]).close()"
+)
+
+shared_map = SharedHashMap.publish({"a": 1})
+with SharedHashMap(shared_map.name) as attached:
+    assert attached["a"] == 1
+subprocess.run([sys.executable, "-c", ATTACH, shared_map.name], check=True)
+with SharedHashMap(shared_map.name) as attached:
+    assert attached["a"] == 1
+shared_map.close()
+shared_map.unlink()
+"""
+
+
+@pytest.fixture
+def items():
+    return {f"key{i}": {"id": i} for i in range(500)} | {1: "one", 2.5: b""}
+
+
+@pytest.fixture
+def sm0(items):
+    shared_map = HashMap(items, hasher="keyed").share()
+    yield shared_map
+    shared_map.close()
+    shared_map.unlink()
+
+
+def test_publish_and_lookups(sm0, items):
+    assert len(sm0) == len(items)
+    for key, value in items.items():
+        assert sm0[key] == value and key in sm0
+    assert sm0.get("missing") is None and "missing" not in sm0
+    assert [] not in sm0
+    with pytest.raises(KeyError):
+        sm0["missing"]
+    assert set(sm0) == set(items)
+
+
+def test_attach_by_name(sm0, items):
+    with SharedHashMap(sm0.name) as attached:
+        assert attached["key10"] == {"id": 10}
+        assert len(attached) == len(items)
+    # Closing an attached map leaves the block to the others.
+    assert sm0["key10"] == {"id": 10}
+
+
+def test_pickling_sends_the_name_only(sm0):
+    data = pickle.dumps(sm0)
+    assert len(data) < 200
+    with pickle.loads(data) as attached:
+        assert attached.name == sm0.name and attached[1] == "one"
+
+
+def test_workers_attach(sm0):
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        results = list(
+            executor.map(lookup, [sm0] * 2, [["key1", "x"], [2.5, 1]])
+        )
+    assert results == [[{"id": 1}, None], [b"", "one"]]
+
+
+def test_named_publish_and_wrong_names():
+    shared_map = SharedHashMap.publish({"a": 1}, name="hashmap_test_block")
+    try:
+        assert shared_map.name == "hashmap_test_block"
+        assert repr(shared_map) == (
+            "<SharedHashMap: 1 entries in 'hashmap_test_block'>"
+        )
+    finally:
+        shared_map.close()
+        shared_map.unlink()
+    with pytest.raises(FileNotFoundError):
+        SharedHashMap("hashmap_test_block")
+    with pytest.raises(TypeError):
+        SharedHashMap(1)
+
+
+def test_attaching_processes_leave_the_block():
+    result = subprocess.run(
+        [sys.executable, "-c", PUBLISHER],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stderr == ""
@@ -0,0 +1,231 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import pickle
+import random
+
+import pytest
+
+from src.algoandds.hashmap import (
+    CountMinSketch,
+    DeterministicHasher,
+    HeavyHitters,
+    HyperLogLog,
+    KeyedHasher,
+)
+from src.algoandds.hashmap import sketches
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "no numpy"])
+def numpy(request, monkeypatch):
+    if not request.param:
+        monkeypatch.setattr(sketches, "np", None)
+    elif sketches.np is None:
+        pytest.skip("NumPy is not installed.")
+
+
+def sketch_keys(sketch, keys: list):
+    # Runs in a freshly spawned process, whose str hashes differ.
+    sketch.add_many(keys)
+    return pickle.dumps(sketch)
+
+
+def skewed_stream(size: int) -> list:
+    rng = random.Random(0)
+    return [int(rng.paretovariate(1.2)) for _ in range(size)]
+
+
+@pytest.mark.parametrize("precision", [4, 10, 14])
+@pytest.mark.parametrize("cardinality", [0, 5, 1000, 50000])
+def test_hyperloglog_count(precision, cardinality, numpy):
+    hll = HyperLogLog(precision)
+    hll.add_many(f"key{i}" for i in range(cardinality))
+    # Duplicates do not change the registers.
+    hll.add_many(f"key{i}" for i in range(cardinality // 2))
+    error = 4 * hll.error_rate * cardinality
+    assert abs(hll.count() - cardinality) <= max(error, 1)
+    assert len(hll._registers) == 2**precision
+
+
+def test_hyperloglog_merge():
+    first, second, union = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    first.add_many(range(0, 30000))
+    second.add_many(range(20000, 50000))
+    union.add_many(range(0, 50000))
+    first.merge(second)
+    assert first._registers == union._registers
+    assert abs(first.count() - 50000) <= 4 * first.error_rate * 50000
+
+
+def test_merge_sketches_from_other_processes():
+    chunks = [[f"key{i}" for i in range(j, 40000, 4)] for j in range(4)]
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(2, mp_context=context) as executor:
+        hll_results = executor.map(
+            sketch_keys, [HyperLogLog(12)] * 4, chunks
+        )
+        cms_results = executor.map(
+            sketch_keys, [CountMinSketch(256, 4)] * 4, chunks
+        )
+        hlls = [pickle.loads(result) for result in hll_results]
+        cmss = [pickle.loads(result) for result in cms_results]
+    hll, cms = HyperLogLog(12), CountMinSketch(256, 4)
+    for chunk in chunks:
+        hll.add_many(chunk)
+        cms.add_many(chunk)
+    hlls[0].merge(*hlls[1:])
+    cmss[0].merge(*cmss[1:])
+    assert hlls[0]._registers == hll._registers
+    assert cmss[0]._counters == cms._counters
+    assert cmss[0].total == cms.total == 40000
+
+
+def test_merge_keyed_sketches():
+    # The str hashes a keyed hasher builds on differ between processes,
+    # so only sketches sharing the hasher object can be merged.
+    hasher = KeyedHasher(42)
+    hll = HyperLogLog(hasher=hasher)
+    hll.merge(HyperLogLog(hasher=hasher))
+    copy = pickle.loads(pickle.dumps(HyperLogLog(hasher=hasher)))
+    for other in (HyperLogLog(hasher=KeyedHasher(42)), copy):
+        with pytest.raises(ValueError):
+            hll.merge(other)
+    with pytest.raises(ValueError):
+        CountMinSketch(hasher=hasher).merge(
+            CountMinSketch(hasher=KeyedHasher(42))
+        )
+
+
+@pytest.mark.parametrize("hasher", [DeterministicHasher(3), KeyedHasher(5)])
+def test_int_arrays_hash_as_their_items(hasher):
+    np = pytest.importorskip("numpy")
+    rng = np.random.default_rng(0)
+    arrays = [
+        rng.integers(-(2**63), 2**63 - 1, 1000, dtype=np.int64),
+        rng.integers(0, 2**64 - 1, 1000, dtype=np.uint64),
+        np.array([0, 1, -1, -2, 2**61 - 1, 2**61, -(2**61)], np.int64),
+        np.array([[-128, -1], [0, 127]], dtype=np.int8),
+    ]
+    for keys in arrays:
+        hll, hll_items = HyperLogLog(hasher=hasher), HyperLogLog(hasher=hasher)
+        hll.add_many(keys)
+        for key in keys.ravel().tolist():
+            hll_items.add(key)
+        assert hll._registers == hll_items._registers
+        cms = CountMinSketch(64, 3, hasher=hll.hasher)
+        cms.add_many(keys, counts=np.arange(keys.size) % 3)
+        cms_items = CountMinSketch(64, 3, hasher=hll.hasher)
+        for i, key in enumerate(keys.ravel().tolist()):
+            cms_items.add(key, i % 3)
+        assert cms._counters == cms_items._counters
+    keys = np.array(["a", "b", "a"])
+    assert cms.estimate_many(keys) == cms_items.estimate_many(["a", "b", "a"])
+    # Other hashers go through the items of the array.
+    hll = HyperLogLog(hasher="sha256")
+    hll_items = HyperLogLog(hasher=hll.hasher)
+    hll.add_many(np.arange(100))
+    hll_items.add_many(range(100))
+    assert hll._registers == hll_items._registers
+
+
+def test_count_min_sketch_estimates(numpy):
+    stream = skewed_stream(20000)
+    counts = Counter(stream)
+    cms = CountMinSketch(512, 5)
+    cms.add_many(stream[:10000])
+    for key in stream[10000:]:
+        cms.add(key)
+    assert cms.total == 20000
+    keys = list(counts)
+    estimates = cms.estimate_many(keys)
+    assert estimates == [cms[key] for key in keys]
+    assert all(estimates[i] >= counts[key] for i, key in enumerate(keys))
+    # Estimates exceed the counts by more than e / width of the total
+    # for a fraction of the keys of about exp(-depth) at most.
+    bound = 2.72 / 512 * 20000
+    overestimated = sum(
+        estimates[i] - counts[key] > bound for i, key in enumerate(keys)
+    )
+    assert overestimated <= 0.01 * len(keys)
+    assert cms.estimate("missing") <= bound
+
+
+def test_count_min_sketch_counts(numpy):
+    cms = CountMinSketch(16, 2)
+    assert cms.add("a", 5) == 5 and cms.add("a", 0) == 5
+    cms.add_many(["b", "c"], counts=[2, 3])
+    cms.add_many([])
+    assert cms.estimate_many([]) == []
+    assert cms.total == 10 and cms["a"] >= 5
+    assert repr(cms) == "<CountMinSketch: 10 total, width=16, depth=2>"
+
+
+def test_heavy_hitters(numpy):
+    stream = skewed_stream(50000)
+    top_keys = [key for key, _ in Counter(stream).most_common(5)]
+    hh = HeavyHitters(5, 1024, 4)
+    hh.add_many(stream[:25000])
+    for key in stream[25000:]:
+        hh.add(key)
+    top = hh.top()
+    assert [key for key, _ in top] == top_keys
+    assert [count for _, count in top] == [hh.sketch[key] for key in top_keys]
+    assert len(hh._heap) <= 4 * hh.k + 64
+
+
+def test_heavy_hitters_merge():
+    stream = skewed_stream(40000)
+    first, second, whole = (HeavyHitters(3, 512, 4) for _ in range(3))
+    first.add_many(stream[:20000])
+    second.add_many(stream[20000:])
+    whole.add_many(stream)
+    first.merge(second)
+    assert first.top() == whole.top()
+    with pytest.raises(ValueError):
+        first.merge(HeavyHitters(4, 512, 4))
+    with pytest.raises(ValueError):
+        first.merge(HeavyHitters(3, 256, 4))
+    with pytest.raises(TypeError):
+        first.merge(whole.sketch)
+
+
+@pytest.mark.parametrize(
+    ("other", "error"),
+    [
+        (CountMinSketch(), TypeError),
+        (HyperLogLog(12), ValueError),
+        (HyperLogLog(hasher="keyed"), ValueError),
+        (HyperLogLog(hasher=DeterministicHasher(1)), ValueError),
+    ],
+)
+def test_merge_incompatible_sketches(other, error):
+    hll = HyperLogLog()
+    with pytest.raises(error):
+        hll.merge(HyperLogLog(), other)
+    # Nothing is merged when one of the sketches is incompatible.
+    assert hll.count() == 0
+    hll.merge(HyperLogLog(hasher=DeterministicHasher()))
+    hasher = KeyedHasher()
+    HyperLogLog(hasher=hasher).merge(HyperLogLog(hasher=hasher))
+
+
+@pytest.mark.parametrize(
+    ("factory", "error"),
+    [
+        (lambda: HyperLogLog(3), ValueError),
+        (lambda: HyperLogLog(19), ValueError),
+        (lambda: HyperLogLog(10.0), TypeError),
+        (lambda: CountMinSketch(0), ValueError),
+        (lambda: CountMinSketch(10, True), TypeError),
+        (lambda: HeavyHitters(0), ValueError),
+        (lambda: CountMinSketch().add("a", -1), ValueError),
+        (lambda: CountMinSketch().add("a", 1.0), TypeError),
+        (lambda: CountMinSketch().add_many("ab", [1]), ValueError),
+        (lambda: HyperLogLog().add([]), TypeError),
+        (lambda: HyperLogLog().add_many(["a", None]), ValueError),
+        (lambda: CountMinSketch().estimate_many(1), TypeError),
+    ],
+)
+def test_wrong_arguments(factory, error):
+    with pytest.raises(error):
+        factory()
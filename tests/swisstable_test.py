@@ -0,0 +1,104 @@
+from secrets import randbelow
+import pytest
+
+from src.algoandds.hashmap import HashMap, SwissHashMap, KeyedHasher
+from src.algoandds.hashmap import swisstable
+from src.algoandds.hashmap.swisstable import DELETED, EMPTY, GROUP_SIZE
+
+
+class ConstantHasher(KeyedHasher):
+    # Puts every key in the same group, with the same h2.
+    def prehash(self, key):
+        return 7
+
+
+@pytest.fixture
+def sw0():
+    return SwissHashMap()
+
+
+@pytest.fixture
+def sw4():
+    return SwissHashMap([(i, i * 2) for i in range(40)])
+
+
+def assert_control_bytes_match_slots(sw: SwissHashMap):
+    for ctrl, key, prehash in zip(sw._ctrl, sw._keys, sw._hashes):
+        if key is None:
+            assert ctrl in (EMPTY, DELETED)
+        else:
+            assert ctrl == prehash & 0x7F
+
+
+def test_is_a_hashmap(sw4: SwissHashMap):
+    assert isinstance(sw4, HashMap)
+    assert dict(sw4.items()) == {i: i * 2 for i in range(40)}
+    assert len(sw4) == sw4._size == 40
+    assert sw4._capacity % GROUP_SIZE == 0
+    assert sw4._capacity == sw4._hash_ceiling == 80
+
+
+@pytest.mark.parametrize("map_size", [16, 17, 100])
+def test_create_new_list_rounds_to_groups(sw0: SwissHashMap, map_size):
+    sw0._create_new_list(map_size)
+    assert sw0._capacity == sw0._hash_ceiling
+    assert sw0._capacity == -(-map_size // GROUP_SIZE) * GROUP_SIZE
+
+
+def test_getitem_setitem_delitem(sw0: SwissHashMap):
+    reference = {}
+    for _ in range(20000):
+        key = randbelow(3000)
+        action = randbelow(3)
+        if action == 0:
+            sw0[key] = reference[key] = randbelow(100)
+        elif action == 1 and key in reference:
+            del sw0[key]
+            del reference[key]
+        elif key in reference:
+            assert sw0[key] == reference[key]
+        else:
+            with pytest.raises(KeyError):
+                sw0[key]
+    assert dict(sw0.items()) == reference
+    assert_control_bytes_match_slots(sw0)
+
+
+def test_tombstones_in_full_groups():
+    sw = SwissHashMap(hasher=ConstantHasher(), load_factor=0.95)
+    sw._create_new_list(64)
+    for i in range(40):
+        sw[i] = i
+    # The first two groups are full, so their slots leave tombstones.
+    for i in range(0, 40, 2):
+        del sw[i]
+    assert sw._number_of_tombstones > 0
+    assert dict(sw.items()) == {i: i for i in range(1, 40, 2)}
+    for i in range(40, 50):
+        sw[i] = i
+    assert all(sw[i] == i for i in range(40, 50))
+    assert_control_bytes_match_slots(sw)
+
+
+def test_get_many(sw4: SwissHashMap):
+    keys = [0, 39, 40, "a", 20, 5]
+    assert sw4.get_many(keys) == [0, 78, None, None, 40, 10]
+    assert sw4.get_many(iter(keys), "x") == [0, 78, "x", "x", 40, 10]
+    assert sw4.get_many([]) == []
+    with pytest.raises(TypeError):
+        sw4.get_many(1)
+    with pytest.raises(TypeError):
+        sw4.get_many([(1, 2)])
+
+
+def test_get_many_without_numpy(sw4: SwissHashMap, monkeypatch):
+    monkeypatch.setattr(swisstable, "np", None)
+    assert sw4.get_many([1, 41, 2]) == [2, None, 4]
+
+
+def test_get_many_colliding_keys():
+    sw = SwissHashMap(
+        {i: str(i) for i in range(100)}, hasher=ConstantHasher()
+    )
+    keys = list(range(-20, 120))
+    assert sw.get_many(keys) == [sw.get(key) for key in keys]